@@ -0,0 +1,46 @@
+"""Channel ingestion cursor
+
+Revision ID: ce4e087c69b3
+Revises: 891b249c70ee
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ce4e087c69b3"
+down_revision: Union[str, None] = "891b249c70ee"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("channels", sa.Column("last_message_id", sa.BIGINT(), nullable=True))
+    op.add_column(
+        "channels", sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+    # Resume already ingested channels from the greatest numeric message ID stored for them
+    op.execute(
+        """
+        UPDATE channels
+        SET last_message_id = stored.max_message_id
+        FROM (
+            SELECT channel_id, max(message_id::bigint) AS max_message_id
+            FROM vacancies
+            WHERE message_id ~ '^[0-9]{1,18}$'
+            GROUP BY channel_id
+        ) AS stored
+        WHERE channels.id = stored.channel_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("channels", "last_message_at")
+    op.drop_column("channels", "last_message_id")
@@ -0,0 +1,31 @@
+"""Vacancy message_id unique per channel
+
+Revision ID: 57fd1b853407
+Revises: ce4e087c69b3
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "57fd1b853407"
+down_revision: Union[str, None] = "ce4e087c69b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("vacancies_message_id_key", "vacancies", type_="unique")
+    op.create_unique_constraint(
+        "uq_vacancies_channel_id_message_id", "vacancies", ["channel_id", "message_id"]
+    )
+
+
+def downgrade() -> None:
+    # Fails if the same message ID has been stored for several channels in the meantime
+    op.drop_constraint("uq_vacancies_channel_id_message_id", "vacancies", type_="unique")
+    op.create_unique_constraint("vacancies_message_id_key", "vacancies", ["message_id"])
@@ -0,0 +1,35 @@
+"""Channel ingestion lease
+
+Revision ID: a3c51e7d02f4
+Revises: 57fd1b853407
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c51e7d02f4"
+down_revision: Union[str, None] = "57fd1b853407"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("channels", sa.Column("leased_by", sa.String(length=100), nullable=True))
+    op.add_column(
+        "channels", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_channels_lease_expires_at"), "channels", ["lease_expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_channels_lease_expires_at"), table_name="channels")
+    op.drop_column("channels", "lease_expires_at")
+    op.drop_column("channels", "leased_by")
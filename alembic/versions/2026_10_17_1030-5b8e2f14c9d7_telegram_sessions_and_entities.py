@@ -0,0 +1,86 @@
+"""Telegram sessions and entities
+
+Revision ID: 5b8e2f14c9d7
+Revises: a3c51e7d02f4
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e2f14c9d7"
+down_revision: Union[str, None] = "a3c51e7d02f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "telegram_sessions",
+        sa.Column("session", postgresql.VARCHAR(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index(
+        op.f("ix_telegram_sessions_created_at"), "telegram_sessions", ["created_at"], unique=False
+    )
+    op.create_index(op.f("ix_telegram_sessions_id"), "telegram_sessions", ["id"], unique=False)
+    op.create_table(
+        "telegram_entities",
+        sa.Column("telegram_id", sa.String(), nullable=False),
+        sa.Column("peer_id", sa.BIGINT(), nullable=False),
+        sa.Column("access_hash", sa.BIGINT(), nullable=True),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "telegram_id", name="uq_telegram_entities_user_id_telegram_id"
+        ),
+    )
+    op.create_index(
+        op.f("ix_telegram_entities_created_at"), "telegram_entities", ["created_at"], unique=False
+    )
+    op.create_index(op.f("ix_telegram_entities_id"), "telegram_entities", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_telegram_entities_id"), table_name="telegram_entities")
+    op.drop_index(op.f("ix_telegram_entities_created_at"), table_name="telegram_entities")
+    op.drop_table("telegram_entities")
+    op.drop_index(op.f("ix_telegram_sessions_id"), table_name="telegram_sessions")
+    op.drop_index(op.f("ix_telegram_sessions_created_at"), table_name="telegram_sessions")
+    op.drop_table("telegram_sessions")
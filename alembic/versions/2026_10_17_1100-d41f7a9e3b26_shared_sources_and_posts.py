@@ -0,0 +1,190 @@
+"""Shared sources and posts
+
+Revision ID: d41f7a9e3b26
+Revises: 5b8e2f14c9d7
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d41f7a9e3b26"
+down_revision: Union[str, None] = "5b8e2f14c9d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    # Sources: one per Telegram channel, with the ingestion cursor of its channel.
+    # Leases are not carried over, the workers claim the sources anew.
+    op.create_table(
+        "sources",
+        sa.Column("telegram_id", sa.String(), nullable=False),
+        sa.Column("last_message_id", sa.BIGINT(), nullable=True),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("leased_by", sa.String(length=100), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("telegram_id"),
+    )
+    op.create_index(op.f("ix_sources_created_at"), "sources", ["created_at"], unique=False)
+    op.create_index(op.f("ix_sources_id"), "sources", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_sources_lease_expires_at"), "sources", ["lease_expires_at"], unique=False
+    )
+    op.execute(
+        """
+        INSERT INTO sources (id, telegram_id, last_message_id, last_message_at)
+        SELECT gen_random_uuid(), telegram_id, last_message_id, last_message_at
+        FROM channels
+        """
+    )
+
+    # Channels become subscriptions to sources
+    op.add_column("channels", sa.Column("source_id", sa.Uuid(), nullable=True))
+    op.execute(
+        """
+        UPDATE channels
+        SET source_id = sources.id
+        FROM sources
+        WHERE sources.telegram_id = channels.telegram_id
+        """
+    )
+    op.alter_column("channels", "source_id", nullable=False)
+    op.create_foreign_key(
+        "channels_source_id_fkey", "channels", "sources", ["source_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_index(op.f("ix_channels_source_id"), "channels", ["source_id"], unique=False)
+    op.drop_constraint("channels_telegram_id_key", "channels", type_="unique")
+    op.create_unique_constraint(
+        "uq_channels_user_id_telegram_id", "channels", ["user_id", "telegram_id"]
+    )
+    op.drop_index(op.f("ix_channels_lease_expires_at"), table_name="channels")
+    op.drop_column("channels", "lease_expires_at")
+    op.drop_column("channels", "leased_by")
+    op.drop_column("channels", "last_message_at")
+    op.drop_column("channels", "last_message_id")
+
+    # Posts: the messages, stored once per source. Every vacancy becomes a post of the same ID.
+    op.create_table(
+        "posts",
+        sa.Column("message_id", sa.String(), nullable=False),
+        sa.Column("content", postgresql.VARCHAR(), nullable=False),
+        sa.Column("contact", sa.String(), nullable=True),
+        sa.Column("source_id", sa.Uuid(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["source_id"], ["sources.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("source_id", "message_id", name="uq_posts_source_id_message_id"),
+    )
+    op.create_index(op.f("ix_posts_created_at"), "posts", ["created_at"], unique=False)
+    op.create_index(op.f("ix_posts_id"), "posts", ["id"], unique=False)
+    op.execute(
+        """
+        INSERT INTO posts (id, source_id, message_id, content, contact, created_at, updated_at)
+        SELECT vacancies.id, channels.source_id, vacancies.message_id, vacancies.content,
+               vacancies.contact, vacancies.created_at, vacancies.updated_at
+        FROM vacancies
+        JOIN channels ON channels.id = vacancies.channel_id
+        """
+    )
+
+    # Vacancies keep only the subscriber's state
+    op.add_column("vacancies", sa.Column("post_id", sa.Uuid(), nullable=True))
+    op.execute("UPDATE vacancies SET post_id = id")
+    op.alter_column("vacancies", "post_id", nullable=False)
+    op.create_foreign_key(
+        "vacancies_post_id_fkey", "vacancies", "posts", ["post_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_index(op.f("ix_vacancies_post_id"), "vacancies", ["post_id"], unique=False)
+    op.drop_constraint("uq_vacancies_channel_id_message_id", "vacancies", type_="unique")
+    op.create_unique_constraint(
+        "uq_vacancies_channel_id_post_id", "vacancies", ["channel_id", "post_id"]
+    )
+    op.drop_column("vacancies", "contact")
+    op.drop_column("vacancies", "content")
+    op.drop_column("vacancies", "message_id")
+
+
+def downgrade() -> None:
+    # Every vacancy gets a copy of its post again
+    op.add_column("vacancies", sa.Column("message_id", sa.String(), nullable=True))
+    op.add_column("vacancies", sa.Column("content", postgresql.VARCHAR(), nullable=True))
+    op.add_column("vacancies", sa.Column("contact", sa.String(), nullable=True))
+    op.execute(
+        """
+        UPDATE vacancies
+        SET message_id = posts.message_id, content = posts.content, contact = posts.contact
+        FROM posts
+        WHERE posts.id = vacancies.post_id
+        """
+    )
+    op.alter_column("vacancies", "message_id", nullable=False)
+    op.alter_column("vacancies", "content", nullable=False)
+    op.drop_constraint("uq_vacancies_channel_id_post_id", "vacancies", type_="unique")
+    op.create_unique_constraint(
+        "uq_vacancies_channel_id_message_id", "vacancies", ["channel_id", "message_id"]
+    )
+    op.drop_index(op.f("ix_vacancies_post_id"), table_name="vacancies")
+    op.drop_constraint("vacancies_post_id_fkey", "vacancies", type_="foreignkey")
+    op.drop_column("vacancies", "post_id")
+    op.drop_index(op.f("ix_posts_id"), table_name="posts")
+    op.drop_index(op.f("ix_posts_created_at"), table_name="posts")
+    op.drop_table("posts")
+
+    # Fails if several users subscribe to the same Telegram channel in the meantime
+    op.add_column("channels", sa.Column("last_message_id", sa.BIGINT(), nullable=True))
+    op.add_column(
+        "channels", sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column("channels", sa.Column("leased_by", sa.String(length=100), nullable=True))
+    op.add_column(
+        "channels", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        op.f("ix_channels_lease_expires_at"), "channels", ["lease_expires_at"], unique=False
+    )
+    op.execute(
+        """
+        UPDATE channels
+        SET last_message_id = sources.last_message_id, last_message_at = sources.last_message_at
+        FROM sources
+        WHERE sources.id = channels.source_id
+        """
+    )
+    op.drop_constraint("uq_channels_user_id_telegram_id", "channels", type_="unique")
+    op.create_unique_constraint("channels_telegram_id_key", "channels", ["telegram_id"])
+    op.drop_index(op.f("ix_channels_source_id"), table_name="channels")
+    op.drop_constraint("channels_source_id_fkey", "channels", type_="foreignkey")
+    op.drop_column("channels", "source_id")
+
+    op.drop_index(op.f("ix_sources_lease_expires_at"), table_name="sources")
+    op.drop_index(op.f("ix_sources_id"), table_name="sources")
+    op.drop_index(op.f("ix_sources_created_at"), table_name="sources")
+    op.drop_table("sources")
@@ -0,0 +1,99 @@
+"""Query shaped indexes
+
+Revision ID: 7c2e95b1d8a3
+Revises: d41f7a9e3b26
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e95b1d8a3"
+down_revision: Union[str, None] = "d41f7a9e3b26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every primary key got a second, identical index on `id`
+TABLES = (
+    "users",
+    "sources",
+    "channels",
+    "posts",
+    "vacancies",
+    "telegram_sessions",
+    "telegram_entities",
+)
+
+# Checked against the query plans in tests/integration/crud/test_query_plans.py
+INDEXES = (
+    # The channels of a user, newest first (keyset pages); the cascade from users
+    ("ix_channels_user_id_created_at_id", "channels", ["user_id", "created_at DESC", "id DESC"]),
+    # The vacancies of a channel, newest first (keyset pages); the cascade from channels
+    (
+        "ix_vacancies_channel_id_created_at_id",
+        "vacancies",
+        ["channel_id", "created_at DESC", "id DESC"],
+    ),
+    # The latest posts of a source
+    ("ix_posts_source_id_created_at", "posts", ["source_id", "created_at DESC"]),
+)
+
+
+def drop_invalid_index(name: str, table: str) -> None:
+    """
+    Drop what a failed concurrent build of the index left behind. Such an index is
+    invalid: it is never used by the planner, but `IF NOT EXISTS` would keep it.
+    """
+    invalid = op.get_bind().scalar(
+        sa.text(
+            "SELECT NOT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:name) AND indrelid = to_regclass(:table)"
+        ),
+        {"name": name, "table": table},
+    )
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # Built without locking the tables against writes. CONCURRENTLY cannot run
+    # in a transaction, so a re-run after a failure drops the invalid leftovers first.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            drop_invalid_index(name, table)
+            op.create_index(
+                name,
+                table,
+                [sa.text(column) for column in columns],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for table in TABLES:
+            op.drop_index(
+                op.f(f"ix_{table}_id"),
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            drop_invalid_index(op.f(f"ix_{table}_id"), table)
+            op.create_index(
+                op.f(f"ix_{table}_id"),
+                table,
+                ["id"],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
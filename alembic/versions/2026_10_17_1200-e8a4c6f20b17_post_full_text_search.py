@@ -0,0 +1,75 @@
+"""Post full-text search
+
+Revision ID: e8a4c6f20b17
+Revises: 7c2e95b1d8a3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8a4c6f20b17"
+down_revision: Union[str, None] = "7c2e95b1d8a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A trusted extension since PostgreSQL 13, the database owner may create it
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Computing the stored column rewrites the table under an exclusive lock
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('russian', content)", persisted=True),
+            nullable=False,
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_search_vector",
+            "posts",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_posts_content_trgm",
+            "posts",
+            ["content"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_content_trgm",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_posts_search_vector",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("posts", "search_vector")
+    # The pg_trgm extension is left in place, it may be used outside of the app
@@ -0,0 +1,51 @@
+"""Vacancy state partial indexes
+
+Revision ID: 3f9d0b6a5e42
+Revises: e8a4c6f20b17
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9d0b6a5e42"
+down_revision: Union[str, None] = "e8a4c6f20b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# As VACANCY_SCREENS in db/models.py at this revision
+SCREENS = {
+    "unviewed": "NOT is_viewed",
+    "opportunities": "is_opportunity",
+    "applied": "is_applied",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, condition in SCREENS.items():
+            op.create_index(
+                f"ix_vacancies_{name}",
+                "vacancies",
+                ["channel_id", sa.text("created_at DESC"), sa.text("id DESC")],
+                unique=False,
+                postgresql_where=sa.text(condition),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in SCREENS:
+            op.drop_index(
+                f"ix_vacancies_{name}",
+                table_name="vacancies",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,101 @@
+"""Packed vacancy state
+
+Revision ID: 5b7e1c9d2f60
+Revises: 3f9d0b6a5e42
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e1c9d2f60"
+down_revision: Union[str, None] = "3f9d0b6a5e42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# As VacancyState in db/models.py at this revision
+FLAGS = {
+    "is_viewed": 1,
+    "is_opportunity": 2,
+    "is_applied": 4,
+    "is_rejected": 8,
+}
+
+# As VACANCY_SCREENS in the previous revision
+SCREENS = {
+    "unviewed": "NOT is_viewed",
+    "opportunities": "is_opportunity",
+    "applied": "is_applied",
+}
+
+
+def upgrade() -> None:
+    # The server default fills the existing rows until they are converted below
+    op.add_column(
+        "vacancies",
+        sa.Column("state", sa.SmallInteger(), server_default="0", nullable=False),
+    )
+    op.execute(
+        "UPDATE vacancies SET state = "
+        + " | ".join(f"(CASE WHEN {field} THEN {bit} ELSE 0 END)" for field, bit in FLAGS.items())
+    )
+    op.alter_column("vacancies", "state", server_default=None)
+    op.create_check_constraint(
+        "ck_vacancies_state", "vacancies", f"state & ~{sum(FLAGS.values())} = 0"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_vacancies_channel_id_state_created_at_id",
+            "vacancies",
+            ["channel_id", "state", sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name in SCREENS:
+            op.drop_index(
+                f"ix_vacancies_{name}",
+                table_name="vacancies",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    for field in FLAGS:
+        op.drop_column("vacancies", field)
+
+
+def downgrade() -> None:
+    for field, bit in FLAGS.items():
+        op.add_column(
+            "vacancies",
+            sa.Column(field, sa.Boolean(), server_default=sa.false(), nullable=False),
+        )
+        op.execute(f"UPDATE vacancies SET {field} = state & {bit} != 0")
+        op.alter_column("vacancies", field, server_default=None)
+
+    with op.get_context().autocommit_block():
+        for name, condition in SCREENS.items():
+            op.create_index(
+                f"ix_vacancies_{name}",
+                "vacancies",
+                ["channel_id", sa.text("created_at DESC"), sa.text("id DESC")],
+                unique=False,
+                postgresql_where=sa.text(condition),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.drop_index(
+            "ix_vacancies_channel_id_state_created_at_id",
+            table_name="vacancies",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_constraint("ck_vacancies_state", "vacancies", type_="check")
+    op.drop_column("vacancies", "state")
@@ -0,0 +1,160 @@
+"""Vacancies monthly partitions
+
+Revision ID: a9c3e7f15d28
+Revises: 5b7e1c9d2f60
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+
+from datetime import datetime, UTC
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9c3e7f15d28"
+down_revision: Union[str, None] = "5b7e1c9d2f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, created_at, updated_at, state, channel_id, post_id"
+
+# As PARTITION_MONTHS_AHEAD in core/config.py, the worker keeps them ready from now on
+MONTHS_AHEAD = 2
+
+# Index names are unique per schema, those of the old table have to give way
+INDEXES = (
+    "ix_vacancies_created_at",
+    "ix_vacancies_post_id",
+    "ix_vacancies_channel_id_created_at_id",
+    "ix_vacancies_channel_id_state_created_at_id",
+)
+# So do the names of the other constraints, to be generated the same for the new table
+CONSTRAINTS = (
+    ("vacancies_channel_id_fkey", "foreignkey"),
+    ("vacancies_post_id_fkey", "foreignkey"),
+    ("ck_vacancies_state", "check"),
+    ("vacancies_pkey", "primary"),
+)
+
+
+def free_names(table: str, unique_constraint: str) -> None:
+    for index in INDEXES:
+        op.drop_index(index, table_name=table, if_exists=True)
+    for name, type_ in (*CONSTRAINTS, (unique_constraint, "unique")):
+        op.drop_constraint(name, table, type_=type_)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def create_table(name: str, *constraints: sa.Constraint, **kwargs) -> None:  # NOQA: ANN003
+    op.create_table(
+        name,
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("state", sa.SmallInteger(), nullable=False),
+        sa.Column("channel_id", sa.Uuid(), nullable=False),
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.CheckConstraint("state & ~15 = 0", name="ck_vacancies_state"),
+        sa.ForeignKeyConstraint(["channel_id"], ["channels.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        *constraints,
+        **kwargs,
+    )
+
+
+def upgrade() -> None:
+    # The table is copied within the transaction, writes to the vacancies wait meanwhile
+    op.rename_table("vacancies", "vacancies_unpartitioned")
+    free_names("vacancies_unpartitioned", "uq_vacancies_channel_id_post_id")
+
+    create_table(
+        "vacancies",
+        sa.PrimaryKeyConstraint("id", "created_at", name="vacancies_pkey"),
+        sa.UniqueConstraint(
+            "channel_id",
+            "post_id",
+            "created_at",
+            name="uq_vacancies_channel_id_post_id_created_at",
+        ),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute("CREATE TABLE vacancies_default PARTITION OF vacancies DEFAULT")
+
+    # A partition for every month with vacancies, up to the coming months
+    first = op.get_bind().scalar(
+        sa.text("SELECT date_trunc('month', min(created_at), 'UTC') FROM vacancies_unpartitioned")
+    )
+    current = datetime.now(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month = min(first.astimezone(UTC), current) if first is not None else current
+    while month <= add_months(current, MONTHS_AHEAD):
+        end = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE vacancies_{month:%Y_%m} PARTITION OF vacancies "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    op.execute(f"INSERT INTO vacancies ({COLUMNS}) SELECT {COLUMNS} FROM vacancies_unpartitioned")
+    op.drop_table("vacancies_unpartitioned")
+
+    # Created on every partition, the ones attached later included
+    op.create_index(op.f("ix_vacancies_post_id"), "vacancies", ["post_id"], unique=False)
+    op.create_index(
+        "ix_vacancies_channel_id_created_at_id",
+        "vacancies",
+        ["channel_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_vacancies_channel_id_state_created_at_id",
+        "vacancies",
+        ["channel_id", "state", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    # Archived partitions are not brought back, restore them with retention.py beforehand
+    op.rename_table("vacancies", "vacancies_partitioned")
+    free_names("vacancies_partitioned", "uq_vacancies_channel_id_post_id_created_at")
+
+    create_table(
+        "vacancies",
+        sa.PrimaryKeyConstraint("id", name="vacancies_pkey"),
+        sa.UniqueConstraint("channel_id", "post_id", name="uq_vacancies_channel_id_post_id"),
+    )
+    op.execute(f"INSERT INTO vacancies ({COLUMNS}) SELECT {COLUMNS} FROM vacancies_partitioned")
+    # The partitions go along with the table
+    op.drop_table("vacancies_partitioned")
+
+    op.create_index(op.f("ix_vacancies_created_at"), "vacancies", ["created_at"], unique=False)
+    op.create_index(op.f("ix_vacancies_post_id"), "vacancies", ["post_id"], unique=False)
+    op.create_index(
+        "ix_vacancies_channel_id_created_at_id",
+        "vacancies",
+        ["channel_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_vacancies_channel_id_state_created_at_id",
+        "vacancies",
+        ["channel_id", "state", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
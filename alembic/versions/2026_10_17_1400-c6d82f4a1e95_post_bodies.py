@@ -0,0 +1,112 @@
+"""Post bodies
+
+Revision ID: c6d82f4a1e95
+Revises: a9c3e7f15d28
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c6d82f4a1e95"
+down_revision: Union[str, None] = "a9c3e7f15d28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "post_bodies",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("content", postgresql.VARCHAR(), nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('russian', content)", persisted=True),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["id"], ["posts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_post_bodies_created_at"), "post_bodies", ["created_at"], unique=False)
+    op.execute(
+        """
+        INSERT INTO post_bodies (id, content, created_at, updated_at)
+        SELECT id, content, created_at, updated_at FROM posts
+        """
+    )
+    # Built once the table is filled, which is faster than maintaining them row by row
+    op.create_index(
+        "ix_post_bodies_search_vector",
+        "post_bodies",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_post_bodies_content_trgm",
+        "post_bodies",
+        ["content"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"content": "gin_trgm_ops"},
+    )
+
+    op.drop_index("ix_posts_content_trgm", table_name="posts")
+    op.drop_index("ix_posts_search_vector", table_name="posts")
+    # The space is reused by new rows. Run VACUUM FULL (or pg_repack) on posts
+    # to compact the existing ones right away.
+    op.drop_column("posts", "search_vector")
+    op.drop_column("posts", "content")
+
+
+def downgrade() -> None:
+    op.add_column("posts", sa.Column("content", postgresql.VARCHAR(), nullable=True))
+    op.execute(
+        "UPDATE posts SET content = post_bodies.content "
+        "FROM post_bodies WHERE post_bodies.id = posts.id"
+    )
+    op.alter_column("posts", "content", nullable=False)
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('russian', content)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_posts_search_vector", "posts", ["search_vector"], unique=False, postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_posts_content_trgm",
+        "posts",
+        ["content"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"content": "gin_trgm_ops"},
+    )
+
+    op.drop_index("ix_post_bodies_content_trgm", table_name="post_bodies")
+    op.drop_index("ix_post_bodies_search_vector", table_name="post_bodies")
+    op.drop_index(op.f("ix_post_bodies_created_at"), table_name="post_bodies")
+    op.drop_table("post_bodies")
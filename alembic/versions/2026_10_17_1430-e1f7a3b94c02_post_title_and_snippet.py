@@ -0,0 +1,66 @@
+"""Post title and snippet
+
+Revision ID: e1f7a3b94c02
+Revises: c6d82f4a1e95
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.text import make_snippet, make_title
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f7a3b94c02"
+down_revision: Union[str, None] = "c6d82f4a1e95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column(
+        "posts", sa.Column("title", sa.String(length=200), server_default="", nullable=False)
+    )
+    op.add_column(
+        "posts", sa.Column("snippet", sa.String(length=1000), server_default="", nullable=False)
+    )
+
+    # Made by the same code as on ingestion, batch by batch over the primary key
+    bind = op.get_bind()
+    posts = sa.table(
+        "posts", sa.column("id", sa.Uuid()), sa.column("title"), sa.column("snippet")
+    )
+    last_id = None
+    while True:
+        batch = bind.execute(
+            sa.text(
+                "SELECT id, content FROM post_bodies "
+                + ("WHERE id > :last_id " if last_id else "")
+                + "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not batch:
+            break
+        bind.execute(
+            posts.update().where(posts.c.id == sa.bindparam("post_id")),
+            [
+                {"post_id": post_id, "title": make_title(content), "snippet": make_snippet(content)}
+                for post_id, content in batch
+            ],
+        )
+        last_id = batch[-1].id
+
+    op.alter_column("posts", "title", server_default=None)
+    op.alter_column("posts", "snippet", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "snippet")
+    op.drop_column("posts", "title")
@@ -0,0 +1,42 @@
+"""Channel background deletion
+
+Revision ID: 3d5f8b2a6c71
+Revises: e1f7a3b94c02
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3d5f8b2a6c71"
+down_revision: Union[str, None] = "e1f7a3b94c02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("channels", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+    # No channel is deleted yet, the partial index is empty and built right away
+    op.create_index(
+        "ix_channels_deleted_at",
+        "channels",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    # The channels waiting to be purged are removed along with their vacancies
+    op.execute("DELETE FROM channels WHERE deleted_at IS NOT NULL")
+    op.drop_index(
+        "ix_channels_deleted_at",
+        table_name="channels",
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+    op.drop_column("channels", "deleted_at")
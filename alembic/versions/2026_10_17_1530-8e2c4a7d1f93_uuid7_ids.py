@@ -0,0 +1,29 @@
+"""UUIDv7 IDs
+
+Revision ID: 8e2c4a7d1f93
+Revises: 3d5f8b2a6c71
+Create Date: 2026-10-17 15:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from db.base_model import UUID7_FUNCTION
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2c4a7d1f93"
+down_revision: Union[str, None] = "3d5f8b2a6c71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The existing random IDs stay valid as they are, only the new IDs are time-ordered
+    op.execute(UUID7_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
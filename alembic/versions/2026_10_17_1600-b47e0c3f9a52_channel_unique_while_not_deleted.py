@@ -0,0 +1,44 @@
+"""Channel unique while not deleted
+
+Revision ID: b47e0c3f9a52
+Revises: 8e2c4a7d1f93
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b47e0c3f9a52"
+down_revision: Union[str, None] = "8e2c4a7d1f93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The channels waiting to be purged no longer hold the slot of a new subscription
+    op.drop_constraint("uq_channels_user_id_telegram_id", "channels", type_="unique")
+    op.create_index(
+        "uq_channels_user_id_telegram_id",
+        "channels",
+        ["user_id", "telegram_id"],
+        unique=True,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    # They could clash with the new subscriptions, so they are removed along with their vacancies
+    op.execute("DELETE FROM channels WHERE deleted_at IS NOT NULL")
+    op.drop_index(
+        "uq_channels_user_id_telegram_id",
+        table_name="channels",
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_unique_constraint(
+        "uq_channels_user_id_telegram_id", "channels", ["user_id", "telegram_id"]
+    )
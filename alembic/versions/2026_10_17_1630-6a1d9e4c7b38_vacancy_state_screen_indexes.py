@@ -0,0 +1,51 @@
+"""Vacancy state screen indexes
+
+Revision ID: 6a1d9e4c7b38
+Revises: b47e0c3f9a52
+Create Date: 2026-10-17 16:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1d9e4c7b38"
+down_revision: Union[str, None] = "b47e0c3f9a52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# As VACANCY_SCREENS in db/models.py at this revision
+SCREENS = {
+    "unviewed": "state & 1 = 0",
+    "opportunities": "state & 2 = 2",
+    "applied": "state & 4 = 4",
+}
+
+
+def upgrade() -> None:
+    # The table is partitioned, so the indexes cannot be built concurrently
+    for name, condition in SCREENS.items():
+        op.create_index(
+            f"ix_vacancies_{name}",
+            "vacancies",
+            ["channel_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_where=sa.text(condition),
+        )
+    # An IN list of states cannot be read in the order of `created_at`, every page was sorted
+    op.drop_index("ix_vacancies_channel_id_state_created_at_id", table_name="vacancies")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_vacancies_channel_id_state_created_at_id",
+        "vacancies",
+        ["channel_id", "state", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    for name in SCREENS:
+        op.drop_index(f"ix_vacancies_{name}", table_name="vacancies")
@@ -1,14 +1,16 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from core.config import settings
 from core.security import current_user
 from db.connect import get_session
 from db.models import UserORM
 from schemas.channel import ChannelCreate, ChannelUpdate, ChannelResponse
+from schemas.fields import Fields, fields_query
 from schemas.response import Response
 from services.channel import ChannelService
 
@@ -21,6 +23,7 @@ async def get_user_channel(
     db_session: Annotated[AsyncSession, Depends(get_session)],
     user: Annotated[UserORM, Depends(current_user)],
     channel_service: Annotated[ChannelService, Depends()],
+    fields: Annotated[Fields | None, Depends(fields_query(ChannelResponse))],
 ) -> Response:
     """
     Retrieve a specific channel by ID.
@@ -30,14 +33,14 @@ async def get_user_channel(
         db_session (AsyncSession): The database session.
         user (UserORM): The current user.
         channel_service (ChannelService): The channel service.
+        fields (Fields | None): Only these fields of the channel, all of them if None.
     """
-    channel = await channel_service.get_by_id(db_session, user, channel_id)
-    channel_response = ChannelResponse.model_validate(channel)
+    channel = await channel_service.get_by_id(db_session, user, channel_id, fields=fields)
 
     return Response(
         status_code=status.HTTP_200_OK,
         message="Successfully fetched channel",
-        data=channel_response.model_dump(),
+        data=channel.model_dump(),
     )
 
 
@@ -46,22 +49,31 @@ async def get_user_channels(
     db_session: Annotated[AsyncSession, Depends(get_session)],
     user: Annotated[UserORM, Depends(current_user)],
     channel_service: Annotated[ChannelService, Depends()],
+    fields: Annotated[Fields | None, Depends(fields_query(ChannelResponse))],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE)] = settings.PAGE_SIZE,
 ) -> Response:
     """
-    Retrieve all channels associated with the current user.
+    Retrieve a page of the channels associated with the current user, newest first.
 
     Args:
         db_session (AsyncSession): The database session.
         user (UserORM): The current user.
         channel_service (ChannelService): The channel service.
+        fields (Fields | None): Only these fields of the channels, all of them if None.
+        cursor (str | None): The `next_cursor` of the previous page, None for the first one.
+        limit (int): The maximum number of channels on the page.
     """
-    channels = await channel_service.get_user_channels(db_session, user)
-    channels_res = [ChannelResponse.model_validate(channel).model_dump() for channel in channels]
+    channels, next_cursor = await channel_service.get_user_channels(
+        db_session, user, fields=fields, cursor=cursor, limit=limit
+    )
+    channels_res = [channel.model_dump() for channel in channels]
 
     return Response(
         status_code=status.HTTP_200_OK,
         message="Successfully fetched channels",
         data=channels_res,
+        next_cursor=next_cursor,
     )
 
 
@@ -128,6 +140,7 @@ async def delete_channel(
     user: Annotated[UserORM, Depends(current_user)],
     db_session: Annotated[AsyncSession, Depends(get_session)],
     channel_service: Annotated[ChannelService, Depends()],
+    background: bool = False,
 ) -> Response:
     """
     Delete a channel by ID.
@@ -137,10 +150,19 @@ async def delete_channel(
         user (UserORM): The current user.
         db_session (AsyncSession): The database session.
         channel_service (ChannelService): The channel service.
+        background (bool): Hide the channel right away and remove its vacancies later on,
+            for channels with too many vacancies to be removed within the request.
     """
-    deleted_channel = await channel_service.delete_user_channel(db_session, user, channel_id)
-
+    deleted_channel = await channel_service.delete_user_channel(
+        db_session, user, channel_id, background=background
+    )
 
+    if background:
+        return Response(
+            status_code=status.HTTP_202_ACCEPTED,
+            message="Channel scheduled for deletion",
+            data={"id": str(deleted_channel)},
+        )
     return Response(
         status_code=status.HTTP_204_NO_CONTENT,
         message="Successfully deleted channel",
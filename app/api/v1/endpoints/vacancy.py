@@ -1,16 +1,24 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from core.exceptions import AccessForbiddenException
+from core.config import settings
 from core.security import current_user
 from db.connect import get_session
 from db.models import UserORM
+from schemas.fields import Fields, fields_query
 from schemas.response import Response
-from schemas.vacancy import VacancyCreate, VacancyUpdate, VacancyResponse
+from schemas.vacancy import (
+    VacancyBulkUpdate,
+    VacancyCreate,
+    VacancyFilter,
+    VacancyResponse,
+    VacancySummary,
+    VacancyUpdate,
+)
 from services.vacancy import VacancyService
 
 router = APIRouter()
@@ -21,17 +29,55 @@ async def get_user_vacancies(
     db_session: Annotated[AsyncSession, Depends(get_session)],
     user: Annotated[UserORM, Depends(current_user)],
     vacancy_service: Annotated[VacancyService, Depends()],
+    filters: Annotated[VacancyFilter, Depends()],
+    fields: Annotated[Fields | None, Depends(fields_query(VacancySummary))],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE)] = settings.PAGE_SIZE,
 ) -> Response:
     """
-    Retrieve all vacancies associated with the current user.
+    Retrieve a page of the vacancies associated with the current user, newest first,
+    optionally only the ones in the given states (e.g. `is_viewed=false` for the inbox)
+    and collected within the given dates. The content is returned by `GET /{vacancy_id}`.
+    The next page is requested with the `next_cursor` of the response.
+    `fields` picks the fields to return, e.g. `fields=id,is_viewed` to sync the badges.
     """
-    vacancies = await vacancy_service.get_user_vacancies(db_session, user)
-    vacancies_res = [VacancyResponse.model_validate(vacancy).model_dump() for vacancy in vacancies]
+    vacancies, next_cursor = await vacancy_service.get_user_vacancies(
+        db_session, user, filters=filters, fields=fields, cursor=cursor, limit=limit
+    )
+    vacancies_res = [vacancy.model_dump() for vacancy in vacancies]
 
     return Response(
         status_code=status.HTTP_200_OK,
         message="Successfully fetched vacancies",
         data=vacancies_res,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/search", response_model=Response)
+async def search_vacancies(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    db_session: Annotated[AsyncSession, Depends(get_session)],
+    user: Annotated[UserORM, Depends(current_user)],
+    vacancy_service: Annotated[VacancyService, Depends()],
+    fuzzy: bool = False,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE)] = settings.PAGE_SIZE,
+) -> Response:
+    """
+    Full-text search over the vacancies of the current user, the most relevant first.
+    Russian and English words are matched in any form, e.g. "разработчики" finds "разработчик".
+    The query supports "quoted phrases", OR and -exclusions, `fuzzy` tolerates typos.
+    """
+    results, next_cursor = await vacancy_service.search(
+        db_session, user, q, fuzzy=fuzzy, cursor=cursor, limit=limit
+    )
+
+    return Response(
+        status_code=status.HTTP_200_OK,
+        message="Successfully searched vacancies",
+        data=[result.model_dump() for result in results],
+        next_cursor=next_cursor,
     )
 
 
@@ -41,22 +87,32 @@ async def get_channel_vacancies(
     db_session: Annotated[AsyncSession, Depends(get_session)],
     user: Annotated[UserORM, Depends(current_user)],
     vacancy_service: Annotated[VacancyService, Depends()],
+    filters: Annotated[VacancyFilter, Depends()],
+    fields: Annotated[Fields | None, Depends(fields_query(VacancySummary))],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=settings.MAX_PAGE_SIZE)] = settings.PAGE_SIZE,
 ) -> Response:
-    """Retrieve all vacancies associated with a specific channel."""
-    vacancies = await vacancy_service.get_channel_vacancies(db_session, user, channel_id)
-
-    # Check permission to access the vacancies
-    channel_ids = [channel.id for channel in user.channels]
-    for vacancy in vacancies:
-        if vacancy.channel_id not in channel_ids:
-            raise AccessForbiddenException
-
-    vacancies_res = [VacancyResponse.model_validate(vacancy).model_dump() for vacancy in vacancies]
+    """
+    Retrieve a page of the vacancies associated with a specific channel, newest first,
+    optionally only the ones in the given states and dates, and only the given `fields`.
+    """
+    # The permission to access the channel is checked by the service
+    vacancies, next_cursor = await vacancy_service.get_channel_vacancies(
+        db_session,
+        user,
+        channel_id,
+        filters=filters,
+        fields=fields,
+        cursor=cursor,
+        limit=limit,
+    )
+    vacancies_res = [vacancy.model_dump() for vacancy in vacancies]
 
     return Response(
         status_code=status.HTTP_200_OK,
         message="Successfully fetched vacancies",
         data=vacancies_res,
+        next_cursor=next_cursor,
     )
 
 
@@ -66,28 +122,19 @@ async def get_vacancy(
     db_session: Annotated[AsyncSession, Depends(get_session)],
     user: Annotated[UserORM, Depends(current_user)],
     vacancy_service: Annotated[VacancyService, Depends()],
+    fields: Annotated[Fields | None, Depends(fields_query(VacancyResponse))],
 ) -> Response:
     """
-    Retrieve a specific vacancy by ID.
+    Retrieve a specific vacancy by ID, optionally only the given `fields`.
     """
-    vacancy = await vacancy_service.get_by_id(db_session, user, vacancy_id)
-
-    # If the vacancy is not found, it will raise ResourceNotFoundException.
-    # Otherwise, it will return the vacancy, that's mean that channel_id should not be empty.
-    # If channel_ids is empty, we should raise AccessForbiddenException.
-
-    # Check permission to access the vacancy
-    # TODO: Perhaps we should move this logic to the service layer
-    channel_ids = [channel.id for channel in user.channels]
-    if vacancy.channel_id not in channel_ids:  # Assert channel_id is not empty
-        raise AccessForbiddenException
-
-    channel_vacancy = VacancyResponse.model_validate(vacancy)
+    # Raises ResourceNotFoundException, or AccessForbiddenException for the vacancies
+    # of the channels of other users
+    vacancy = await vacancy_service.get_by_id(db_session, user, vacancy_id, fields=fields)
 
     return Response(
         status_code=status.HTTP_200_OK,
         message="Successfully fetched vacancy",
-        data=channel_vacancy.model_dump(),
+        data=vacancy.model_dump(),
     )
 
 
@@ -111,6 +158,29 @@ async def create_vacancy(
     )
 
 
+@router.patch("/bulk", response_model=Response)
+async def update_vacancies(
+    bulk_data: VacancyBulkUpdate,
+    db_session: Annotated[AsyncSession, Depends(get_session)],
+    user: Annotated[UserORM, Depends(current_user)],
+    vacancy_service: Annotated[VacancyService, Depends()],
+) -> Response:
+    """
+    Set or clear the flags of many vacancies at once: the ones with the given `ids`
+    (e.g. a page), or all the ones matching the `filters` (`{}` for "mark all as viewed").
+    The vacancies of other users are skipped, the IDs of the updated ones are returned.
+    """
+    updated_ids = await vacancy_service.update_user_vacancies(
+        db_session, user=user, bulk_data=bulk_data
+    )
+
+    return Response(
+        status_code=status.HTTP_200_OK,
+        message="Successfully updated vacancies",
+        data={"ids": [str(vacancy_id) for vacancy_id in updated_ids]},
+    )
+
+
 @router.put("/{vacancy_id}", response_model=Response)
 async def update_vacancy(
     vacancy_id: UUID,
@@ -59,6 +59,8 @@ class Settings(BaseSettings):
 
     BASE_HOST: AnyHttpUrl = "http://localhost:8000"
     API_V1_STR: str = "/api/v1"
+    PAGE_SIZE: int = 100  # records per page of a listing by default
+    MAX_PAGE_SIZE: int = 1000
 
     DB_HOST: str = "db"
     DB_PORT: int = 5432
@@ -130,6 +132,62 @@ class Settings(BaseSettings):
 
         return False
 
+    # Telegram ingestion
+    TELEGRAM_SOURCE: str = "telethon"
+    # Sessions are stored in the database, session files found here are imported once
+    TELEGRAM_SESSIONS_DIR: pathlib.Path = BASE_ROOT.parent / ".sessions"
+    TELEGRAM_ENTITY_CACHE_SIZE: int = 10000  # resolved channels kept in memory
+    TELEGRAM_ACCOUNT_CONCURRENCY: int = 3  # parallel fetches over one account
+    TELEGRAM_GLOBAL_CONCURRENCY: int = 50  # parallel fetches over all accounts
+
+    INGESTION_POLL_INTERVAL: int = 60  # seconds between two polls of a new source
+    INGESTION_BATCH_SIZE: int = 500  # posts written per transaction
+    INGESTION_CONCURRENCY: int = 20  # sources fetched in parallel
+    INGESTION_CHANNELS_CHUNK: int = 500  # sources loaded from the database at once
+    INGESTION_BACKFILL_CHUNK: int = 5000  # messages fetched per source per cycle
+
+    # Seen messages: a Bloom filter keeps already stored messages away from the post upserts
+    SEEN_FILTER_MEMORY_MB: int = 16  # the filter is reset once it holds as many keys as it fits
+    SEEN_FILTER_ERROR_RATE: float = 0.01  # false positives cost a lookup of the stored posts
+    SEEN_FILTER_PRELOAD: int = 1000  # latest posts per source loaded on its first batch
+
+    # Adaptive polling: every channel interval follows its posting rate within these bounds
+    SCHEDULER_MIN_INTERVAL: int = 10  # seconds
+    SCHEDULER_MAX_INTERVAL: int = 60 * 60 * 6  # seconds
+    SCHEDULER_SYNC_INTERVAL: int = 60  # seconds between two reloads of the active sources
+
+    # Ingestion workers (worker.py) poll only the sources they hold a lease on
+    WORKER_ID: str | None = None  # unique per worker process, <hostname>-<pid> by default
+    WORKER_LEASE_TTL: int = 90  # seconds a lease is valid without a heartbeat
+    WORKER_HEARTBEAT_INTERVAL: int = 30  # seconds between two lease renewals
+    WORKER_MAX_SOURCES: int = 5000  # sources leased by one worker
+
+    # Push mode: new posts are received as events and written by a single writer
+    TELEGRAM_LISTENER_ENABLED: bool = False
+    LISTENER_QUEUE_SIZE: int = 10000  # messages buffered between the events and the writer
+    LISTENER_PUT_TIMEOUT: float = 1.0  # seconds to wait for a free slot before dropping a message
+    LISTENER_BATCH_SIZE: int = 500  # posts written per transaction
+    LISTENER_FLUSH_INTERVAL: float = 1.0  # seconds a partial batch may wait before it is written
+    LISTENER_REFRESH_INTERVAL: int = 300  # seconds between two subscription refreshes
+    LISTENER_WRITE_ATTEMPTS: int = 8  # attempts to store a batch before it is skipped
+
+    # Vacancies are partitioned by month, the old months are archived to compressed files
+    PARTITION_MONTHS_AHEAD: int = 2  # empty partitions kept ready for the coming months
+    PARTITION_RETENTION_MONTHS: int = 0  # months kept in the database, 0 keeps them all
+    PARTITION_ARCHIVE_DIR: pathlib.Path = BASE_ROOT.parent / ".archive"
+    PARTITION_MAINTENANCE_INTERVAL: int = 60 * 60 * 6  # seconds between two maintenance runs
+    PARTITION_LOCK_TIMEOUT: int = 5  # seconds to wait for the table lock to detach a partition
+
+    # Background deletion of channels, see services/purge.py
+    CHANNEL_PURGE_CHUNK: int = 5000  # vacancies removed per transaction
+    CHANNEL_PURGE_INTERVAL: int = 60  # seconds between two runs once nothing is left to purge
+
+    @field_validator("TELEGRAM_SOURCE", mode="before")
+    def set_telegram_source(cls, value: str) -> str:  # NOQA: N805
+        if value not in ("telethon", "fake"):
+            raise ValueError("Invalid Telegram message source")
+        return value
+
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of origins
     BACKEND_CORS_ORIGINS: list[AnyHttpUrl] = [
         "http://localhost",
@@ -6,6 +6,10 @@ class BaseCustomException(Exception):
     pass
 
 
+class TelegramSourceException(BaseCustomException):
+    pass
+
+
 class BaseHTTPException(HTTPException):
     def __init__(self, status_code: int, detail: str, **kwargs) -> None:
         super().__init__(status_code=status_code, detail=detail, **kwargs)
@@ -44,6 +48,22 @@ class ResourceNotFoundException(BaseHTTPException):
         )
 
 
+class InvalidCursorException(BaseHTTPException):
+    def __init__(self, msg: str | None = None) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=msg or "Invalid pagination cursor.",
+        )
+
+
+class InvalidFieldsException(BaseHTTPException):
+    def __init__(self, msg: str | None = None) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=msg or "Invalid fields.",
+        )
+
+
 class InactiveUserException(BaseHTTPException):
     def __init__(self, msg: str | None = None) -> None:
         super().__init__(
@@ -0,0 +1,52 @@
+import re
+
+# Bounds of the precomputed title and snippet of a post, as shown in the vacancy listings
+TITLE_LENGTH = 100
+SNIPPET_LENGTH = 280
+
+# Telegram markdown: bold, italic, underline, strikethrough, spoilers, code
+MARKUP = re.compile(r"\*\*|__|~~|\|\||`+")
+# Bullets, emoji and punctuation decorating the start of a line
+LEADING_DECORATION = re.compile(r"^[\W_]+")
+# A line of hashtags only, e.g. "#vacancy #python #remote"
+HASHTAGS = re.compile(r"^(#\w+[\s,;]*)+$")
+
+
+def normalize_line(line: str) -> str:
+    """A line without markup and decorations, with the whitespace collapsed."""
+    line = " ".join(MARKUP.sub("", line).split())
+    if HASHTAGS.match(line):
+        return line
+    return LEADING_DECORATION.sub("", line)
+
+
+def truncate(text: str, length: int) -> str:
+    """Cut the text to the length at a word boundary, marking the cut with an ellipsis."""
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if " " in cut[length // 2:]:
+        cut = cut.rsplit(" ", 1)[0]
+    return f"{cut.rstrip(' ,.;:-')}…"
+
+
+def split_title(content: str) -> tuple[str, str]:
+    """
+    Split a post into the title line and the text after it.
+    The title is the first line with words in it, the hashtag lines before it are dropped.
+    """
+    lines = [line for line in map(normalize_line, content.splitlines()) if line]
+    for position, line in enumerate(lines):
+        if not HASHTAGS.match(line):
+            return line, " ".join(lines[position + 1:])
+    return (lines[0], " ".join(lines[1:])) if lines else ("", "")
+
+
+def make_title(content: str) -> str:
+    return truncate(split_title(content)[0], TITLE_LENGTH)
+
+
+def make_snippet(content: str) -> str:
+    """The beginning of the post after the title."""
+    title, rest = split_title(content)
+    return truncate(rest or title, SNIPPET_LENGTH)
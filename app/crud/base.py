@@ -1,13 +1,21 @@
-from collections.abc import Sequence
+import base64
+import json
+from collections.abc import Collection, Mapping, Sequence
+from datetime import datetime
 from typing import Any, Generic, TypeVar
 from uuid import UUID
 
 from pydantic import BaseModel
+from sqlalchemy import ColumnElement, delete, inspect, literal, Row, Select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import Mapped
 
-from core.exceptions import ResourceNotFoundException
+from core.exceptions import (
+    AccessForbiddenException,
+    InvalidCursorException,
+    ResourceNotFoundException,
+)
 from db.base_model import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -15,10 +23,28 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def encode_cursor(created_at: datetime, obj_id: UUID, rank: float | None = None) -> str:
+    """Make an opaque page cursor pointing right after the record (and its search rank)."""
+    key = [created_at.isoformat(), str(obj_id)] + ([rank] if rank is not None else [])
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID, float | None]:
+    try:
+        created_at, obj_id, *rank = json.loads(base64.urlsafe_b64decode(cursor))
+        if len(rank) > 1 or not all(isinstance(value, float | int) for value in rank):
+            raise ValueError("Invalid rank")
+        return datetime.fromisoformat(created_at), UUID(obj_id), rank[0] if rank else None
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorException from e
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: type[ModelType]) -> None:
         """
         CRUD object with default async methods to Create, Read, Update, Delete (CRUD).
+        The methods flush their writes and never commit, the caller commits once
+        for all of them (see `db.connect.unit_of_work`).
         Args:
             model (type[ModelType]): The SQLAlchemy model to use for CRUD operations.
         """
@@ -35,13 +61,61 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db_session.execute(select(self.model).filter(self.model.id == obj_id))
         return result.scalars().first()
 
-    async def get_or_404(self, db_session: AsyncSession, obj_id: UUID) -> ModelType:
-        """Returns the object if found, otherwise raises HTTPException(404)."""
-        obj = await self.get(db_session, obj_id)
+    async def get_fields(
+        self, db_session: AsyncSession, obj_id: UUID, fields: Collection[str]
+    ) -> Row | None:
+        """
+        Retrieve only the fields of a single record by its ID, see `select_fields`.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_id (Any): The ID of the record to retrieve.
+            fields (Collection[str]): The names of the fields to retrieve.
+        """
+        result = await db_session.execute(
+            self.select_fields(fields).where(self.model.id == obj_id)
+        )
+        return result.first()
+
+    async def get_or_404(
+        self,
+        db_session: AsyncSession,
+        obj_id: UUID,
+        fields: Collection[str] | None = None,
+    ) -> ModelType | Row:
+        """
+        Returns the object (or only its fields) if found, otherwise raises HTTPException(404).
+        """
+        if fields is None:
+            obj = await self.get(db_session, obj_id)
+        else:
+            obj = await self.get_fields(db_session, obj_id, fields)
         if not obj:
             raise ResourceNotFoundException(msg=f"{self.model.__name__} with id {obj_id} not found")
         return obj
 
+    def field_columns(self) -> dict[str, ColumnElement]:
+        """
+        The SQL expressions of the fields selectable by `select_fields`, by name:
+        the columns of the model. Extended by the models with computed or joined fields.
+        """
+        return {
+            attr.key: getattr(self.model, attr.key) for attr in inspect(self.model).column_attrs
+        }
+
+    def select_fields(self, fields: Collection[str]) -> Select:
+        """
+        Select only the fields of the records, as named rows instead of ORM objects,
+        so the database reads, and the application hydrates, nothing else.
+        The ID and the creation time are always selected, pages are keyed on them.
+
+        Args:
+            fields (Collection[str]): The names of the fields, see `field_columns`.
+        """
+        columns = self.field_columns()
+        names = dict.fromkeys(("id", "created_at", *fields))
+        return select(*(columns[name].label(name) for name in names)).select_from(self.model)
+
     async def get_multi(
         self,
         db_session: AsyncSession,
@@ -49,7 +123,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         limit: int = 1000,
     ) -> Sequence[ModelType]:
         """
-        Retrieve multiple records with optional offset and limit.
+        Retrieve multiple records with optional offset and limit, by ID: oldest first,
+        as the IDs are time-ordered (see `db.base_model.uuid7`), except the random IDs
+        of the records made before.
 
         Args:
             db_session (AsyncSession): The database session.
@@ -61,9 +137,54 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return result.scalars().all()
 
+    async def get_page(
+        self,
+        db_session: AsyncSession,
+        stmt: Select,
+        *,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[Sequence[ModelType | Row], str | None]:
+        """
+        Retrieve a page of the records selected by the statement, newest first,
+        with the cursor of the next page (None on the last page).
+
+        Pages are keyed on (created_at, id) instead of an offset, so the database seeks
+        right to the page over the index and a deep page costs as much as the first one.
+        Records added meanwhile do not shift the pages either.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            stmt (Select): Selects the records of the model, e.g. filtered by the owner,
+                or their fields with `select_fields`.
+            cursor (str | None): The `next_cursor` of the previous page, None for the first one.
+            limit (int): The maximum number of records on the page.
+        """
+        if cursor is not None:
+            created_at, obj_id, _ = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(self.model.created_at, self.model.id)
+                < tuple_(
+                    literal(created_at, self.model.created_at.type),
+                    literal(obj_id, self.model.id.type),
+                )
+            )
+
+        result = await db_session.execute(
+            stmt.order_by(self.model.created_at.desc(), self.model.id.desc()).limit(limit + 1)
+        )
+        # The records themselves, or the rows of `select_fields` (never a single column)
+        objs = result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all()
+        if len(objs) <= limit:
+            return objs, None
+
+        objs = objs[:limit]
+        return objs, encode_cursor(objs[-1].created_at, objs[-1].id)
+
     async def create(self, db_session: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """
-        Create a new record.
+        Create a new record with a single `INSERT ... RETURNING` of the server defaults.
+        The record is flushed, the caller commits (see `db.connect.unit_of_work`).
 
         Args:
             db_session (AsyncSession): The database session.
@@ -72,8 +193,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db_session.add(db_obj)
-        await db_session.commit()
-        await db_session.refresh(db_obj)
+        await db_session.flush()
         return db_obj
 
     async def update(
@@ -84,7 +204,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: UpdateSchemaType | dict[str, Any],
     ) -> ModelType:
         """
-        Update an existing record.
+        Update an existing record with a single `UPDATE ... RETURNING` of `updated_at`.
 
         Args:
             db_session (AsyncSession): The database session.
@@ -98,10 +218,84 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in obj_data:
                 setattr(db_obj, field, update_data[field])
 
-        await db_session.commit()
-        await db_session.refresh(db_obj)
+        await db_session.flush()
+        return db_obj
+
+    def owned_by(self, user_id: UUID) -> ColumnElement[bool]:
+        """
+        The condition of the records belonging to a user, for `update_owned` and `remove_owned`:
+        the ones of the user by `user_id` (see UserRelationMixin) unless overridden.
+
+        Args:
+            user_id (UUID): The ID of the user.
+        """
+        if not hasattr(self.model, "user_id"):
+            raise NotImplementedError(f"{self.model.__name__} has no owner")
+        return self.model.user_id == user_id
+
+    async def update_owned(
+        self,
+        db_session: AsyncSession,
+        *,
+        obj_id: UUID,
+        user_id: UUID,
+        values: Mapping[str, Any],
+    ) -> ModelType:
+        """
+        Update a record of a user with a single `UPDATE ... WHERE id = :id AND <owned by>
+        RETURNING *`, instead of loading, checking, flushing and refreshing it.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_id (UUID): The ID of the record to update.
+            user_id (UUID): The ID of the user the record must belong to.
+            values (Mapping[str, Any]): The new values (or SQL expressions) of the columns.
+
+        Raises:
+            ResourceNotFoundException: If there is no such record.
+            AccessForbiddenException: If the record belongs to another user.
+        """
+        result = await db_session.execute(
+            update(self.model)
+            .where(self.model.id == obj_id, self.owned_by(user_id))
+            .values(values)
+            .returning(self.model)
+        )
+        db_obj = result.scalars().first()
+        if db_obj is None:
+            await self._raise_not_owned(db_session, obj_id)
         return db_obj
 
+    async def remove_owned(self, db_session: AsyncSession, *, obj_id: UUID, user_id: UUID) -> UUID:
+        """
+        Remove a record of a user with a single `DELETE ... WHERE id = :id AND <owned by>`.
+        The dependent records are removed by the foreign keys of the database.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_id (UUID): The ID of the record to remove.
+            user_id (UUID): The ID of the user the record must belong to.
+
+        Raises:
+            ResourceNotFoundException: If there is no such record.
+            AccessForbiddenException: If the record belongs to another user.
+        """
+        result = await db_session.execute(
+            delete(self.model)
+            .where(self.model.id == obj_id, self.owned_by(user_id))
+            .returning(self.model.id)
+        )
+        if result.scalar() is None:
+            await self._raise_not_owned(db_session, obj_id)
+        return obj_id
+
+    async def _raise_not_owned(self, db_session: AsyncSession, obj_id: UUID) -> None:
+        # Only on the failure path: tell a missing (or hidden, see `get`) record
+        # from a record of another user
+        if await self.get(db_session, obj_id) is None:
+            raise ResourceNotFoundException(msg=f"{self.model.__name__} with id {obj_id} not found")
+        raise AccessForbiddenException
+
     async def remove(self, db_session: AsyncSession, *, obj_id: UUID) -> Mapped[UUID] | None:
         """
         Remove a record by its ID.
@@ -112,5 +306,5 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         db_obj = await self.get_or_404(db_session, obj_id)
         await db_session.delete(db_obj)
-        await db_session.commit()
+        await db_session.flush()
         return db_obj.id
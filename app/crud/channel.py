@@ -1,40 +1,152 @@
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import and_, ColumnElement, func, Row, select, Select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
 from crud.base import CRUDBase
+from crud.source import source_crud
 from db.models import ChannelORM, UserORM
 from schemas.channel import ChannelCreate, ChannelUpdate
 
+# The channels deleted in the background are hidden until they are purged, see services/purge.py
+NOT_DELETED = ChannelORM.deleted_at.is_(None)
+
 
 class CRUDChannel(CRUDBase[ChannelORM, ChannelCreate, ChannelUpdate]):
+    async def get(self, db_session: AsyncSession, obj_id: UUID) -> ChannelORM | None:
+        """
+        Retrieve a single channel by its ID, unless it is being deleted.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_id (UUID): The ID of the channel to retrieve.
+        """
+        result = await db_session.execute(
+            select(self.model).where(self.model.id == obj_id, NOT_DELETED)
+        )
+        return result.scalars().first()
+
+    def select_fields(self, fields: Collection[str]) -> Select:
+        return super().select_fields(fields).where(NOT_DELETED)
+
+    def owned_by(self, user_id: UUID) -> ColumnElement[bool]:
+        """The channels of the user, except the ones being deleted."""
+        return and_(super().owned_by(user_id), NOT_DELETED)
+
     async def get_user_channels(
         self,
         db_session: AsyncSession,
         user: UserORM,
-        offset: int = 0,
-        limit: int = 1000,
-    ) -> Sequence[ChannelORM]:
+        fields: Collection[str] | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[Sequence[ChannelORM | Row], str | None]:
         """
-        Retrieve all channels associated with a specific user.
+        Retrieve a page of the channels associated with a specific user, newest first.
 
         Args:
             db_session (AsyncSession): The database session.
             user (UserORM): The user whose channels are to be retrieved.
-            offset (int): The number of records to skip.
+            fields (Collection[str] | None): Only these fields of the channels, as rows,
+                see `select_fields`.
+            cursor (str | None): The cursor of the page, None for the first one.
             limit (int): The maximum number of records to retrieve.
         """
+        if fields is None:
+            stmt = select(self.model).where(NOT_DELETED)
+        else:
+            stmt = self.select_fields(fields)
+        return await self.get_page(
+            db_session,
+            stmt.where(self.model.user_id == user.id),
+            cursor=cursor,
+            limit=limit,
+        )
+
+    async def create(self, db_session: AsyncSession, *, obj_in: ChannelCreate) -> ChannelORM:
+        """
+        Subscribe a user to a Telegram channel, creating its source on the first subscription.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_in (ChannelCreate): The data to create the channel with.
+        """
+        source_id = await source_crud.get_or_create_id(db_session, telegram_id=obj_in.telegram_id)
+        db_obj = self.model(**obj_in.model_dump(), source_id=source_id)
+        db_session.add(db_obj)
+        await db_session.flush()
+        return db_obj
+
+    async def mark_deleted(
+        self, db_session: AsyncSession, *, obj_id: UUID, user_id: UUID
+    ) -> UUID:
+        """
+        Delete a channel of a user in the background: the channel is hidden and deactivated
+        right away, its vacancies are purged in chunks later on, then the channel itself.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_id (UUID): The ID of the channel to delete.
+            user_id (UUID): The ID of the user the channel must belong to.
+
+        Raises:
+            ResourceNotFoundException: If there is no such channel.
+            AccessForbiddenException: If the channel belongs to another user.
+        """
         result = await db_session.execute(
+            update(self.model)
+            .where(self.model.id == obj_id, self.owned_by(user_id))
+            .values(deleted_at=func.now(), is_active=False)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await self._raise_not_owned(db_session, obj_id)
+        return obj_id
+
+    async def get_fetch_channels(
+        self,
+        db_session: AsyncSession,
+        *,
+        after_source_id: UUID | None = None,
+        source_ids: Sequence[UUID] | None = None,
+        limit: int = 500,
+    ) -> Sequence[ChannelORM]:
+        """
+        Retrieve a page of active sources, ordered by source ID, as one active subscription
+        per source: a source is fetched on behalf of its oldest active subscriber.
+        The subscriber with their Telegram session and the source are loaded together
+        with the channel, since they are required to fetch the source.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            after_source_id (UUID | None): Only sources with a greater ID are retrieved
+                (keyset paging).
+            source_ids (Sequence[UUID] | None): Only these sources are retrieved.
+            limit (int): The maximum number of records to retrieve.
+        """
+        stmt = (
             select(self.model)
-            .where(self.model.user_id == user.id)
-            .offset(offset)
+            .join(self.model.user)
+            .join(self.model.source)
+            .options(
+                contains_eager(self.model.user).joinedload(UserORM.telegram_session),
+                contains_eager(self.model.source),
+            )
+            .where(self.model.is_active.is_(True), UserORM.is_active.is_(True))
+            .distinct(self.model.source_id)
+            .order_by(self.model.source_id, self.model.created_at)
             .limit(limit)
         )
+        if after_source_id is not None:
+            stmt = stmt.where(self.model.source_id > after_source_id)
+        if source_ids is not None:
+            stmt = stmt.where(self.model.source_id.in_(source_ids))
 
+        result = await db_session.execute(stmt)
         return result.scalars().all()
 
-        # TODO: Perhaps we can use `return user.channels` instead
-
 
 channel_crud = CRUDChannel(ChannelORM)
@@ -0,0 +1,156 @@
+from collections.abc import Sequence
+from uuid import UUID
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from crud.base import CRUDBase
+from db.models import PostBodyORM, PostORM
+from schemas.post import PostBulkResult, PostCreate, PostUpdate
+
+# The PostgreSQL protocol limits a statement to 32767 bind parameters
+MAX_BIND_PARAMS = 32767
+
+# A post is identified by the source and the Telegram message ID
+PostKey = tuple[UUID, str]
+
+
+class CRUDPost(CRUDBase[PostORM, PostCreate, PostUpdate]):
+    async def get_or_create(self, db_session: AsyncSession, *, obj_in: PostCreate) -> PostORM:
+        """
+        Get the stored post of the message with its body, storing the post if there is none.
+        Both rows come back with the `INSERT ... RETURNING` statements themselves,
+        the stored body of an existing post is read on that path only. The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_in (PostCreate): The post.
+        """
+        stmt = insert(self.model).values(obj_in.model_dump(exclude={"content"}))
+        post = await db_session.scalar(
+            # A no-op update, so the existing row is returned as well
+            stmt.on_conflict_do_update(
+                index_elements=[self.model.source_id, self.model.message_id],
+                set_={"message_id": stmt.excluded.message_id},
+            )
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        body = await db_session.scalar(
+            insert(PostBodyORM)
+            .values(id=post.id, content=obj_in.content)
+            .on_conflict_do_nothing(index_elements=[PostBodyORM.id])
+            .returning(PostBodyORM)
+        )
+        if body is None:
+            body = await db_session.get(PostBodyORM, post.id)
+        # The relationship raises on lazy loads, see PostORM.body
+        set_committed_value(post, "body", body)
+        return post
+
+    async def bulk_upsert(
+        self,
+        db_session: AsyncSession,
+        *,
+        objs_in: Sequence[PostCreate],
+    ) -> PostBulkResult:
+        """
+        Insert many posts with a single `INSERT ... ON CONFLICT DO NOTHING RETURNING` statement
+        (or a few of them, if the batch exceeds the bind parameter limit), then the bodies
+        of the inserted ones. Posts with an already stored (source_id, message_id) pair
+        are skipped. The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            objs_in (Sequence[PostCreate]): The posts to insert.
+        """
+        rows = [obj_in.model_dump(exclude={"content"}) for obj_in in objs_in]
+        # The first of duplicates within the batch is the one inserted
+        contents: dict[PostKey, str] = {}
+        for obj_in in objs_in:
+            contents.setdefault((obj_in.source_id, obj_in.message_id), obj_in.content)
+        inserted_ids: list[UUID] = []
+        bodies: list[dict] = []
+
+        if rows:
+            chunk_size = MAX_BIND_PARAMS // (len(rows[0]) + 1)  # +1 for the generated `id`
+            for start in range(0, len(rows), chunk_size):
+                stmt = (
+                    insert(self.model)
+                    .values(rows[start:start + chunk_size])
+                    .on_conflict_do_nothing(
+                        index_elements=[self.model.source_id, self.model.message_id]
+                    )
+                    .returning(self.model.id, self.model.source_id, self.model.message_id)
+                )
+                result = await db_session.execute(stmt)
+                for post_id, source_id, message_id in result.tuples():
+                    inserted_ids.append(post_id)
+                    bodies.append({"id": post_id, "content": contents[(source_id, message_id)]})
+
+            chunk_size = MAX_BIND_PARAMS // 2
+            for start in range(0, len(bodies), chunk_size):
+                await db_session.execute(
+                    insert(PostBodyORM).values(bodies[start:start + chunk_size])
+                )
+
+        return PostBulkResult(
+            inserted=len(inserted_ids),
+            skipped=len(rows) - len(inserted_ids),
+            ids=inserted_ids,
+        )
+
+    async def get_stored_keys(
+        self, db_session: AsyncSession, *, keys: Sequence[PostKey]
+    ) -> set[PostKey]:
+        """
+        Get the (source_id, message_id) pairs of the given ones which are already stored.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            keys (Sequence[PostKey]): The (source_id, message_id) pairs to look up.
+        """
+        stored: set[PostKey] = set()
+        chunk_size = MAX_BIND_PARAMS // 2
+        for start in range(0, len(keys), chunk_size):
+            result = await db_session.execute(
+                select(self.model.source_id, self.model.message_id).where(
+                    tuple_(self.model.source_id, self.model.message_id).in_(
+                        keys[start:start + chunk_size]
+                    )
+                )
+            )
+            stored.update(result.tuples())
+        return stored
+
+    async def get_latest_keys(
+        self, db_session: AsyncSession, *, source_ids: Sequence[UUID], per_source: int
+    ) -> Sequence[PostKey]:
+        """
+        Get the (source_id, message_id) pairs of the latest stored posts of every source.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            source_ids (Sequence[UUID]): The sources.
+            per_source (int): The maximum number of posts per source.
+        """
+        latest = (
+            select(
+                self.model.source_id,
+                self.model.message_id,
+                func.row_number()
+                .over(partition_by=self.model.source_id, order_by=self.model.created_at.desc())
+                .label("position"),
+            )
+            .where(self.model.source_id.in_(source_ids))
+            .subquery()
+        )
+        result = await db_session.execute(
+            select(latest.c.source_id, latest.c.message_id).where(latest.c.position <= per_source)
+        )
+        return result.tuples().all()
+
+
+post_crud = CRUDPost(PostORM)
@@ -0,0 +1,164 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import CRUDBase
+from db.models import ChannelORM, SourceORM, UserORM
+from schemas.source import SourceCreate, SourceUpdate
+
+# A source is active while an active user has an active subscription to it
+HAS_ACTIVE_SUBSCRIBERS = (
+    exists()
+    .where(
+        ChannelORM.source_id == SourceORM.id,
+        ChannelORM.is_active.is_(True),
+        ChannelORM.user_id == UserORM.id,
+        UserORM.is_active.is_(True),
+    )
+    .correlate(SourceORM)
+)
+
+
+class CRUDSource(CRUDBase[SourceORM, SourceCreate, SourceUpdate]):
+    async def get_or_create_id(self, db_session: AsyncSession, *, telegram_id: str) -> UUID:
+        """
+        Get the ID of the source with the Telegram ID, creating the source if there is none.
+        Safe against concurrent calls. The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            telegram_id (str): A username, a link or an ID of the Telegram channel.
+        """
+        await db_session.execute(
+            insert(self.model)
+            .values(SourceCreate(telegram_id=telegram_id).model_dump())
+            .on_conflict_do_nothing(index_elements=[self.model.telegram_id])
+        )
+        result = await db_session.execute(
+            select(self.model.id).where(self.model.telegram_id == telegram_id)
+        )
+        return result.scalar_one()
+
+    async def get_active_source_ids(self, db_session: AsyncSession) -> Sequence[UUID]:
+        """Get the IDs of all sources with active subscribers."""
+        result = await db_session.execute(select(self.model.id).where(HAS_ACTIVE_SUBSCRIBERS))
+        return result.scalars().all()
+
+    async def advance_cursor(
+        self,
+        db_session: AsyncSession,
+        *,
+        source_id: UUID,
+        message_id: int,
+        message_at: datetime,
+    ) -> None:
+        """
+        Move the ingestion cursor of a source forward to the given message.
+        The cursor never moves backwards. The caller commits, along with the ingested posts.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            source_id (UUID): The ID of the source.
+            message_id (int): The ID of the last ingested Telegram message.
+            message_at (datetime): The date of the last ingested Telegram message.
+        """
+        await db_session.execute(
+            update(self.model)
+            .where(
+                self.model.id == source_id,
+                or_(
+                    self.model.last_message_id.is_(None),
+                    self.model.last_message_id < message_id,
+                ),
+            )
+            .values(last_message_id=message_id, last_message_at=message_at)
+        )
+
+    async def claim_sources(
+        self,
+        db_session: AsyncSession,
+        *,
+        worker_id: str,
+        ttl: float,
+        limit: int,
+    ) -> Sequence[UUID]:
+        """
+        Lease active sources which are not leased or whose lease has expired to a worker.
+        Rows locked by a concurrent claim are skipped, so workers never wait for each other
+        and never claim the same source. The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            worker_id (str): The claiming worker.
+            ttl (float): Seconds the lease is valid without a renewal.
+            limit (int): The maximum number of sources to claim.
+
+        Returns:
+            Sequence[UUID]: The IDs of the claimed sources.
+        """
+        now = func.now()
+        claimable = (
+            select(self.model.id)
+            .where(
+                HAS_ACTIVE_SUBSCRIBERS,
+                or_(self.model.lease_expires_at.is_(None), self.model.lease_expires_at < now),
+            )
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db_session.execute(
+            update(self.model)
+            .where(self.model.id.in_(claimable))
+            .values(leased_by=worker_id, lease_expires_at=now + timedelta(seconds=ttl))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalars().all()
+
+    async def renew_leases(
+        self,
+        db_session: AsyncSession,
+        *,
+        worker_id: str,
+        ttl: float,
+    ) -> Sequence[UUID]:
+        """
+        Extend the leases a worker still holds on active sources. Leases of sources
+        without active subscribers are not renewed and run out. The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            worker_id (str): The worker holding the leases.
+            ttl (float): Seconds the leases are valid without another renewal.
+
+        Returns:
+            Sequence[UUID]: The IDs of the sources whose leases were renewed.
+        """
+        result = await db_session.execute(
+            update(self.model)
+            .where(self.model.leased_by == worker_id, HAS_ACTIVE_SUBSCRIBERS)
+            .values(lease_expires_at=func.now() + timedelta(seconds=ttl))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalars().all()
+
+    async def release_leases(self, db_session: AsyncSession, *, worker_id: str) -> None:
+        """
+        Give up all leases of a worker, so other workers can claim the sources at once.
+        The caller commits.
+        """
+        await db_session.execute(
+            update(self.model)
+            .where(self.model.leased_by == worker_id)
+            .values(leased_by=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+
+source_crud = CRUDSource(SourceORM)
@@ -0,0 +1,105 @@
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.base import CRUDBase
+from db.models import TelegramEntityORM, TelegramSessionORM
+from schemas.telegram import (
+    TelegramEntityCreate,
+    TelegramEntityUpdate,
+    TelegramSessionCreate,
+    TelegramSessionUpdate,
+)
+
+
+class CRUDTelegramSession(
+    CRUDBase[TelegramSessionORM, TelegramSessionCreate, TelegramSessionUpdate]
+):
+    async def save(self, db_session: AsyncSession, *, obj_in: TelegramSessionCreate) -> None:
+        """
+        Store the Telethon session of an account, replacing the previous one. The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_in (TelegramSessionCreate): The account and its session.
+        """
+        stmt = insert(self.model).values(**obj_in.model_dump())
+        await db_session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[self.model.user_id],
+                set_={"session": stmt.excluded.session, "updated_at": stmt.excluded.updated_at},
+            )
+        )
+
+
+class CRUDTelegramEntity(CRUDBase[TelegramEntityORM, TelegramEntityCreate, TelegramEntityUpdate]):
+    async def get_entity(
+        self,
+        db_session: AsyncSession,
+        *,
+        user_id: UUID,
+        telegram_id: str,
+    ) -> TelegramEntityORM | None:
+        """
+        Retrieve the peer an account has resolved the Telegram ID to.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            user_id (UUID): The ID of the account owner.
+            telegram_id (str): A username, a link or an ID, as in `ChannelORM.telegram_id`.
+        """
+        result = await db_session.execute(
+            select(self.model).where(
+                self.model.user_id == user_id, self.model.telegram_id == telegram_id
+            )
+        )
+        return result.scalars().first()
+
+    async def save(self, db_session: AsyncSession, *, obj_in: TelegramEntityCreate) -> None:
+        """
+        Store a resolved peer, replacing the previous resolution of the Telegram ID.
+        The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_in (TelegramEntityCreate): The resolved peer.
+        """
+        stmt = insert(self.model).values(**obj_in.model_dump())
+        await db_session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[self.model.user_id, self.model.telegram_id],
+                set_={
+                    "peer_id": stmt.excluded.peer_id,
+                    "access_hash": stmt.excluded.access_hash,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+        )
+
+    async def remove_entity(
+        self,
+        db_session: AsyncSession,
+        *,
+        user_id: UUID,
+        telegram_id: str,
+    ) -> None:
+        """
+        Forget the resolved peer of a Telegram ID, e.g. when its access hash is rejected.
+        The caller commits.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            user_id (UUID): The ID of the account owner.
+            telegram_id (str): A username, a link or an ID, as in `ChannelORM.telegram_id`.
+        """
+        await db_session.execute(
+            delete(self.model).where(
+                self.model.user_id == user_id, self.model.telegram_id == telegram_id
+            )
+        )
+
+
+telegram_session_crud = CRUDTelegramSession(TelegramSessionORM)
+telegram_entity_crud = CRUDTelegramEntity(TelegramEntityORM)
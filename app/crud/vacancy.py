@@ -1,20 +1,71 @@
-from collections.abc import Sequence
+import logging
+from collections.abc import Collection, Sequence
+from typing import Any, TypeVar
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import (
+    any_,
+    ColumnElement,
+    func,
+    literal,
+    literal_column,
+    REAL,
+    Row,
+    Select,
+    select,
+    SmallInteger,
+    tuple_,
+    Update,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, Insert, insert, REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, contains_eager, joinedload
 
+from core.config import settings
 from core.exceptions import AccessForbiddenException
-from crud.base import CRUDBase
-from db.models import ChannelORM, VacancyORM, UserORM
-from schemas.vacancy import VacancyCreate, VacancyUpdate
+from crud.base import CRUDBase, decode_cursor, encode_cursor
+from crud.channel import channel_crud
+from crud.post import post_crud
+from db.models import (
+    ChannelORM,
+    PostBodyORM,
+    PostORM,
+    SEARCH_CONFIG,
+    UserORM,
+    VacancyORM,
+    VacancyState,
+)
+from schemas.post import PostCreate
+from schemas.vacancy import VacancyCreate, VacancyFilter, VacancyUpdate
+
+logger = logging.getLogger(__name__)
+
+# The flags of VacancyBase, packed into VacancyORM.state
+STATE_FLAGS = ("is_viewed", "is_opportunity", "is_applied", "is_rejected")
+
+StatementType = TypeVar("StatementType", Select, Update)
+
+# The listings show the title and the snippet of the post only
+LIST_OPTIONS = (joinedload(VacancyORM.post).load_only(PostORM.title, PostORM.snippet),)
+
+# The fields of a vacancy taken from its post and from the body of the post
+POST_FIELDS = {
+    "message_id": PostORM.message_id,
+    "title": PostORM.title,
+    "snippet": PostORM.snippet,
+    "contact": PostORM.contact,
+}
+BODY_FIELDS = {"content": PostBodyORM.content}
+
+# ts_headline options: up to two fragments of the post around the matches
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=8"
 
 
 class CRUDVacancy(CRUDBase[VacancyORM, VacancyCreate, VacancyUpdate]):
     async def get(self, db_session: AsyncSession, obj_id: UUID) -> VacancyORM | None:
         """
-        Retrieve a single record by its ID.
+        Retrieve a single record by its ID, with the body of the post (listings go without).
 
         Args:
             db_session (AsyncSession): The database session.
@@ -22,63 +73,163 @@ class CRUDVacancy(CRUDBase[VacancyORM, VacancyCreate, VacancyUpdate]):
         """
         result = await db_session.execute(
             select(VacancyORM)
-            .options(selectinload(VacancyORM.channel))
+            .options(joinedload(VacancyORM.post).joinedload(PostORM.body, innerjoin=True))
             .where(VacancyORM.id == obj_id)
         )
         return result.scalars().first()
 
+    def field_columns(self) -> dict[str, ColumnElement]:
+        """The columns of the vacancy, its flags and the fields of its post, by name."""
+        return (
+            super().field_columns()
+            | {field: getattr(self.model, field) for field in STATE_FLAGS}
+            | POST_FIELDS
+            | BODY_FIELDS
+        )
+
+    def select_fields(self, fields: Collection[str]) -> Select:
+        """
+        Select only the fields of the vacancies, see `CRUDBase.select_fields`.
+        The post, and the body of the post, are joined only when their fields are selected.
+
+        Args:
+            fields (Collection[str]): The names of the fields, see `field_columns`.
+        """
+        stmt = super().select_fields(fields)
+        if not POST_FIELDS.keys().isdisjoint(fields) or not BODY_FIELDS.keys().isdisjoint(fields):
+            stmt = stmt.join(self.model.post)
+        if not BODY_FIELDS.keys().isdisjoint(fields):
+            stmt = stmt.join(PostORM.body)
+        return stmt
+
     async def get_channel_vacancies(
         self,
         db_session: AsyncSession,
         *,
         user: UserORM,
         channel_id: UUID,
-        offset: int = 0,
-        limit: int = 1000,
-    ) -> Sequence[VacancyORM]:
+        filters: VacancyFilter | None = None,
+        fields: Collection[str] | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[Sequence[VacancyORM | Row], str | None]:
         """
-        Retrieve all vacancies associated with a specific channel.
+        Retrieve a page of the vacancies associated with a specific channel, newest first.
 
         Args:
             db_session (AsyncSession): The database session.
             user (UserORM): The user whose vacancies are to be retrieved.
             channel_id (UUID): The UUID of the channel whose vacancies are to be retrieved.
-            offset (int): The number of records to skip.
+            filters (VacancyFilter | None): Only the vacancies in these states and dates.
+            fields (Collection[str] | None): Only these fields of the vacancies, as rows,
+                see `select_fields`. None for the vacancies with the title and the snippet.
+            cursor (str | None): The cursor of the page, None for the first one.
             limit (int): The maximum number of records to retrieve.
         """
         # Permission check
-        if channel_id not in [channel.id for channel in user.channels]:
+        if channel_id not in user.channel_ids:
             raise AccessForbiddenException
 
-        result = await db_session.execute(
-            select(self.model)
-            .where(self.model.channel_id == channel_id)
-            .offset(offset)
-            .limit(limit)
+        stmt = self._select_list(fields).where(self.model.channel_id == channel_id)
+        return await self.get_page(
+            db_session, self._filter(stmt, filters), cursor=cursor, limit=limit
         )
-        return result.scalars().all()
 
     async def get_user_vacancies(
-        self, db_session: AsyncSession, user_id: UUID, offset: int = 0, limit: int = 1000
-    ) -> Sequence[VacancyORM]:
+        self,
+        db_session: AsyncSession,
+        user_id: UUID,
+        filters: VacancyFilter | None = None,
+        fields: Collection[str] | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[Sequence[VacancyORM | Row], str | None]:
         """
-        Retrieve all vacancies associated with a specific user.
+        Retrieve a page of the vacancies associated with a specific user, newest first.
 
         Args:
             db_session (AsyncSession): The database session.
             user_id (UUID): The UUID of the user whose vacancies are to be retrieved.
-            offset (int): The number of records to skip.
+            filters (VacancyFilter | None): Only the vacancies in these states and dates.
+            fields (Collection[str] | None): Only these fields of the vacancies, as rows,
+                see `select_fields`. None for the vacancies with the title and the snippet.
+            cursor (str | None): The cursor of the page, None for the first one.
+            limit (int): The maximum number of records to retrieve.
+        """
+        stmt = self._select_list(fields).where(self.owned_by(user_id))
+
+        return await self.get_page(
+            db_session, self._filter(stmt, filters), cursor=cursor, limit=limit
+        )
+
+    async def search(
+        self,
+        db_session: AsyncSession,
+        *,
+        user_id: UUID,
+        query: str,
+        fuzzy: bool = False,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> tuple[Sequence[tuple[VacancyORM, float, str]], str | None]:
+        """
+        Full-text search over the vacancies of a user, the most relevant first.
+        Returns a page of (vacancy, rank, snippet) rows with the cursor of the next page.
+
+        The query is parsed like a web search: words, "quoted phrases", OR and -exclusions.
+        Matching goes over the GIN index of the post search vectors, so only matching posts
+        are ranked. Snippets are built for the rows of the page only. The bodies themselves
+        are not loaded.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            user_id (UUID): The UUID of the user whose vacancies are searched.
+            query (str): The search query.
+            fuzzy (bool): Match the words of the query with typos as well (pg_trgm),
+                ranking such matches by their similarity.
+            cursor (str | None): The cursor of the page, None for the first one.
             limit (int): The maximum number of records to retrieve.
         """
-        stmt = select(self.model).where(
-                self.model.channel_id.in_(
-                    select(ChannelORM.id).where(ChannelORM.user_id == user_id)
+        ts_query = func.websearch_to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), query)
+        matches = PostBodyORM.search_vector.bool_op("@@")(ts_query)
+        rank = func.ts_rank_cd(PostBodyORM.search_vector, ts_query, type_=REAL)
+        if fuzzy:
+            matches |= literal(query).bool_op("<%")(PostBodyORM.content)
+            rank += func.word_similarity(query, PostBodyORM.content, type_=REAL)
+        snippet = func.ts_headline(
+            literal(SEARCH_CONFIG, REGCONFIG), PostBodyORM.content, ts_query, SNIPPET_OPTIONS
+        )
+
+        stmt = (
+            select(self.model, rank.label("rank"), snippet.label("snippet"))
+            .join(self.model.post)
+            .join(PostORM.body)
+            .options(contains_eager(self.model.post))
+            .where(self.owned_by(user_id), matches)
+        )
+        if cursor is not None:
+            created_at, obj_id, last_rank = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(rank, self.model.created_at, self.model.id)
+                < tuple_(
+                    literal(last_rank or 0.0, REAL),
+                    literal(created_at, self.model.created_at.type),
+                    literal(obj_id, self.model.id.type),
                 )
-        ).offset(offset).limit(limit)
+            )
 
-        result = await db_session.execute(stmt)
+        result = await db_session.execute(
+            stmt.order_by(
+                rank.desc(), self.model.created_at.desc(), self.model.id.desc()
+            ).limit(limit + 1)
+        )
+        rows = result.tuples().all()
+        if len(rows) <= limit:
+            return rows, None
 
-        return result.scalars().all()
+        rows = rows[:limit]
+        vacancy, last_rank, _ = rows[-1]
+        return rows, encode_cursor(vacancy.created_at, vacancy.id, last_rank)
 
     async def get_user_vacancies_ids(
         self, db_session: AsyncSession, user_id: UUID
@@ -109,5 +260,250 @@ class CRUDVacancy(CRUDBase[VacancyORM, VacancyCreate, VacancyUpdate]):
         result = await db_session.execute(stmt)
         return result.scalars().all()
 
+    async def create(self, db_session: AsyncSession, *, obj_in: VacancyCreate) -> VacancyORM:
+        """
+        Create a vacancy for the post of the message, storing the post if it is new.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_in (VacancyCreate): The data to create the vacancy with.
+        """
+        channel = await channel_crud.get_or_404(db_session, obj_in.channel_id)
+        post = await post_crud.get_or_create(
+            db_session,
+            obj_in=PostCreate(
+                source_id=channel.source_id,
+                **obj_in.model_dump(include={"message_id", "content", "contact"}),
+            ),
+        )
+        db_obj = self.model(
+            created_at=post.created_at,  # Dated as the post, see VacancyORM
+            channel_id=obj_in.channel_id,
+            state=VacancyState.pack(obj_in.model_dump(include=set(STATE_FLAGS))),
+            post=post,
+        )
+        db_session.add(db_obj)
+        await db_session.flush()
+        # With the post and its body in hand, as from `get`
+        return db_obj
+
+    async def fan_out(
+        self,
+        db_session: AsyncSession,
+        *,
+        post_ids: Sequence[UUID] | None = None,
+        channel_ids: Sequence[UUID] | None = None,
+    ) -> int:
+        """
+        Deliver posts to the active subscribers of their sources as vacancies, with a single
+        `INSERT ... SELECT` statement. Already delivered posts are skipped. The caller commits.
+        With PARTITION_RETENTION_MONTHS set, posts older than the retention horizon are
+        not delivered either, their number is logged.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            post_ids (Sequence[UUID] | None): Only these posts are delivered, e.g. the new ones.
+            channel_ids (Sequence[UUID] | None): Only to these channels, e.g. a new subscription.
+
+        Returns:
+            int: The number of created vacancies.
+        """
+        deliveries = (
+            select(
+                # Python-side defaults do not apply to INSERT ... SELECT
+                func.uuid_generate_v7().label("id"),
+                ChannelORM.id.label("channel_id"),
+                PostORM.id.label("post_id"),
+                PostORM.created_at,  # Dated as the post, see VacancyORM
+                literal_column("0", SmallInteger).label("state"),  # No VacancyState bits set
+            )
+            .select_from(PostORM)
+            .join(ChannelORM, ChannelORM.source_id == PostORM.source_id)
+            .join(ChannelORM.user)
+            .where(ChannelORM.is_active.is_(True), UserORM.is_active.is_(True))
+        )
+        if post_ids is not None:
+            deliveries = deliveries.where(PostORM.id.in_(post_ids))
+        if channel_ids is not None:
+            deliveries = deliveries.where(ChannelORM.id.in_(channel_ids))
+
+        if not settings.PARTITION_RETENTION_MONTHS:
+            result = await db_session.execute(self._insert_deliveries(deliveries))
+            return result.rowcount
+
+        # Older posts would be archived right away, e.g. the backlog of a new subscription.
+        # They are counted by the same statement, so that they are not skipped silently.
+        horizon = func.date_trunc("month", func.now(), "UTC") - func.make_interval(
+            0, settings.PARTITION_RETENTION_MONTHS
+        )
+        candidates = deliveries.cte("deliveries")
+        inserted = (
+            self._insert_deliveries(select(candidates).where(candidates.c.created_at >= horizon))
+            .returning(self.model.id)
+            .cte("inserted")
+        )
+        result = await db_session.execute(
+            select(
+                select(func.count()).select_from(inserted).scalar_subquery(),
+                select(func.count())
+                .select_from(candidates)
+                .where(candidates.c.created_at < horizon)
+                .scalar_subquery(),
+            )
+        )
+        created, skipped = result.one()
+        if skipped:
+            logger.warning(
+                f"Skipped {skipped} deliveries of posts older than the retention horizon "
+                f"of {settings.PARTITION_RETENTION_MONTHS} months"
+            )
+        return created
+
+    def _insert_deliveries(self, deliveries: Select) -> Insert:
+        return (
+            insert(self.model)
+            .from_select(["id", "channel_id", "post_id", "created_at", "state"], deliveries)
+            .on_conflict_do_nothing(
+                index_elements=[self.model.channel_id, self.model.post_id, self.model.created_at]
+            )
+        )
+
+    async def update(
+        self,
+        db_session: AsyncSession,
+        *,
+        db_obj: VacancyORM,
+        obj_in: VacancyUpdate | dict[str, Any],
+    ) -> VacancyORM:
+        """
+        Update the state of a vacancy: the given flags are set or cleared, the others are kept.
+        The post of the vacancy, and its body if loaded (see `get`), stay as they are.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            db_obj (VacancyORM): The vacancy to update.
+            obj_in (VacancyUpdate | dict[str, Any]): The flags to update.
+        """
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        flags = {field: update_data.pop(field) for field in STATE_FLAGS if field in update_data}
+        update_data["state"] = VacancyState.pack(flags, db_obj.state)
+        return await super().update(db_session, db_obj=db_obj, obj_in=update_data)
+
+    async def bulk_update_state(
+        self,
+        db_session: AsyncSession,
+        *,
+        user_id: UUID,
+        state: VacancyUpdate,
+        ids: Sequence[UUID] | None = None,
+        filters: VacancyFilter | None = None,
+    ) -> Sequence[UUID]:
+        """
+        Set or clear the given flags of many vacancies of a user with a single `UPDATE`.
+        The vacancies of the channels of other users are left alone, as are the unknown IDs.
+        Returns the IDs of the updated vacancies.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            user_id (UUID): The UUID of the user whose vacancies are updated.
+            state (VacancyUpdate): The flags to update, the unset ones are kept.
+            ids (Sequence[UUID] | None): Only these vacancies.
+            filters (VacancyFilter | None): Only the vacancies in these states and dates.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.owned_by(user_id))
+            .values(state=self._update_state(state))
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        if ids is not None:
+            # A single array parameter, however many IDs
+            stmt = stmt.where(self.model.id == any_(literal(list(ids), ARRAY(self.model.id.type))))
+
+        result = await db_session.execute(self._filter(stmt, filters))
+        return result.scalars().all()
+
+    async def update_owned_state(
+        self,
+        db_session: AsyncSession,
+        *,
+        obj_id: UUID,
+        user_id: UUID,
+        state: VacancyUpdate,
+    ) -> VacancyORM:
+        """
+        Set or clear the given flags of a vacancy of a user, see `CRUDBase.update_owned`.
+        Returns the vacancy with the body of the post, as `get`, from a single statement:
+        the `UPDATE ... RETURNING` goes into a CTE joined with the post and the body.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            obj_id (UUID): The ID of the vacancy to update.
+            user_id (UUID): The ID of the user the vacancy must belong to.
+            state (VacancyUpdate): The flags to update, the unset ones are kept.
+
+        Raises:
+            ResourceNotFoundException: If there is no such vacancy.
+            AccessForbiddenException: If the vacancy belongs to another user.
+        """
+        updated = (
+            update(self.model)
+            .where(self.model.id == obj_id, self.owned_by(user_id))
+            .values(state=self._update_state(state))
+            .returning(*self.model.__table__.columns)
+            .cte("updated")
+        )
+        vacancy = aliased(self.model, updated)
+        result = await db_session.execute(
+            select(vacancy)
+            .join(vacancy.post)
+            .join(PostORM.body)
+            .options(contains_eager(vacancy.post).contains_eager(PostORM.body))
+            .execution_options(populate_existing=True)
+        )
+        db_obj = result.scalars().first()
+        if db_obj is None:
+            await self._raise_not_owned(db_session, obj_id)
+        return db_obj
+
+    def owned_by(self, user_id: UUID) -> ColumnElement[bool]:
+        """The vacancies of the channels of the user."""
+        return self.model.channel_id.in_(
+            select(ChannelORM.id).where(channel_crud.owned_by(user_id))
+        )
+
+    def _update_state(self, state: VacancyUpdate) -> ColumnElement[int]:
+        flags = state.model_dump(include=set(STATE_FLAGS), exclude_unset=True)
+        # The bits of the flags are cleared, then the ones of the flags set are set again
+        mask = VacancyState.pack(dict.fromkeys(flags, True))
+        bits = VacancyState.pack(flags)
+        return self.model.state.op("&")(int(~mask)).op("|")(int(bits))
+
+    def _select_list(self, fields: Collection[str] | None) -> Select:
+        if fields is None:
+            return select(self.model).options(*LIST_OPTIONS)
+        return self.select_fields(fields)
+
+    def _filter(self, stmt: StatementType, filters: VacancyFilter | None) -> StatementType:
+        if filters is None:
+            return stmt
+
+        for field in STATE_FLAGS:
+            value = getattr(filters, field)
+            if value is not None:
+                # As state_condition, rendered inline rather than bound, so that the planner
+                # can pick the partial indexes
+                flag = VacancyState.flag(field)
+                stmt = stmt.where(
+                    self.model.state.op("&")(literal_column(str(flag.value)))
+                    == literal_column(str(flag.value if value else 0))
+                )
+        if filters.created_after is not None:
+            stmt = stmt.where(self.model.created_at >= filters.created_after)
+        if filters.created_before is not None:
+            stmt = stmt.where(self.model.created_at < filters.created_before)
+        return stmt
+
 
 vacancy_crud = CRUDVacancy(VacancyORM)
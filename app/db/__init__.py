@@ -3,10 +3,24 @@ __all__ = (
     "UserORM",
     "VacancyORM",
     "ChannelORM",
+    "SourceORM",
+    "PostORM",
+    "PostBodyORM",
+    "TelegramSessionORM",
+    "TelegramEntityORM",
 )
 
 
 # Import all the models, so that Base has them before being
 # imported by Alembic
 from db.base_model import Base
-from db.models import UserORM, VacancyORM, ChannelORM
+from db.models import (
+    UserORM,
+    VacancyORM,
+    ChannelORM,
+    SourceORM,
+    PostORM,
+    PostBodyORM,
+    TelegramSessionORM,
+    TelegramEntityORM,
+)
@@ -1,5 +1,6 @@
 import logging
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
@@ -26,14 +27,38 @@ AsyncSessionFactory = async_sessionmaker(
 )
 
 
-async def get_session() -> AsyncGenerator[AsyncSession | Any, Any]:
-    async with AsyncSessionFactory() as session:
-        logger.debug(f"Async Engine Pool Status: {async_engine.pool.status()}")
+@asynccontextmanager
+async def unit_of_work(
+    session_factory: Callable[[], AsyncSession] = AsyncSessionFactory,
+) -> AsyncIterator[AsyncSession]:
+    """
+    A session with a single transaction: committed once at the end, rolled back on exception.
+    The CRUD methods only flush, so all the writes within are applied together or not at all.
+
+    Args:
+        session_factory (Callable[[], AsyncSession]): Creates the session.
+    """
+    async with session_factory() as session:
         try:
             yield session
-        except SQLAlchemyError as e:
-            logger.error(f"Error getting database session: {e}")
-            raise
-        except BaseCustomException as e:
-            logger.error(f"Unhandled exception: {e}")
+        except BaseException:
+            await session.rollback()
             raise
+        await session.commit()
+
+
+async def get_session() -> AsyncGenerator[AsyncSession | Any, Any]:
+    """
+    The session of a request, as a unit of work. It is committed when the endpoint returns,
+    before the response is sent, so a failed commit is an error response.
+    """
+    try:
+        async with unit_of_work() as session:
+            logger.debug(f"Async Engine Pool Status: {async_engine.pool.status()}")
+            yield session
+    except SQLAlchemyError as e:
+        logger.error(f"Error getting database session: {e}")
+        raise
+    except BaseCustomException as e:
+        logger.error(f"Unhandled exception: {e}")
+        raise
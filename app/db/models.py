@@ -1,11 +1,33 @@
+from collections.abc import Mapping
+from datetime import datetime
+from enum import IntFlag
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import (
+    CheckConstraint,
+    ColumnElement,
+    Computed,
+    DDL,
+    event,
+    ForeignKey,
+    Index,
+    PrimaryKeyConstraint,
+    SmallInteger,
+    text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.sql import func
 
 from db.base_model import Base, str_100, Varchar, str_1000, str_200
 from db.mixins import UserRelationMixin
 
+# The full-text search configuration. Job channels mix Russian and English, and "russian"
+# stems Cyrillic words with the Russian stemmer and Latin words with the English one.
+SEARCH_CONFIG = "russian"
+
 
 class UserORM(Base):
     __tablename__ = "users"
@@ -20,11 +42,20 @@ class UserORM(Base):
     is_superuser: Mapped[bool] = mapped_column(default=False)
     is_confirmed: Mapped[bool] = mapped_column(default=False)
 
-    # One-to-many relationship with Channel
+    # One-to-many relationship with Channel, removed along with the user by the database
     channels: Mapped[list["ChannelORM"]] = relationship(
-        back_populates="user", cascade="all, delete-orphan"
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+    # One-to-one relationship with TelegramSession
+    telegram_session: Mapped["TelegramSessionORM | None"] = relationship(
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
 
+    @property
+    def channel_ids(self) -> list[UUID]:
+        """The IDs of the channels of the user, except the ones being deleted."""
+        return [channel.id for channel in self.channels if channel.deleted_at is None]
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.email})"
 
@@ -32,19 +63,83 @@ class UserORM(Base):
         return self.__str__()
 
 
+class SourceORM(Base):
+    """
+    A Telegram channel as a source of posts. It is fetched and stored once,
+    however many users subscribe to it.
+    """
+
+    __tablename__ = "sources"
+
+    telegram_id: Mapped[str] = mapped_column(unique=True)
+
+    # Ingestion cursor: the last ingested Telegram message. NULL until the first batch is stored.
+    last_message_id: Mapped[int | None]
+    last_message_at: Mapped[datetime | None]
+
+    # Ingestion lease: the worker polling the source, until the lease expires
+    leased_by: Mapped[str_100 | None]
+    lease_expires_at: Mapped[datetime | None] = mapped_column(index=True)
+
+    # One-to-many relationship with Channel (the subscriptions)
+    channels: Mapped[list["ChannelORM"]] = relationship(
+        back_populates="source", passive_deletes=True
+    )
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.telegram_id})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
 class ChannelORM(UserRelationMixin, Base):
+    """A user's subscription to a source."""
+
     __tablename__ = "channels"
+    __table_args__ = (
+        # A channel deleted in the background gives way to a new subscription right away
+        Index(
+            "uq_channels_user_id_telegram_id",
+            "user_id",
+            "telegram_id",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # The channels of a user, newest first (keyset pages)
+        Index(
+            "ix_channels_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        # The channels waiting for their vacancies to be purged, see services/purge.py
+        Index(
+            "ix_channels_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
     _user_back_populates = "channels"  # From UserRelationMixin
     # Relationship with User was defined in UserRelationMixin
 
     title: Mapped[str_100]
     description: Mapped[str_1000 | None]
-    telegram_id: Mapped[str] = mapped_column(unique=True)
+    telegram_id: Mapped[str]
     is_active: Mapped[bool] = mapped_column(default=True)
+    # Set when the channel is deleted in the background: it is hidden from then on,
+    # and removed once its vacancies are purged
+    deleted_at: Mapped[datetime | None]
+
+    # Relationship with Source
+    source_id: Mapped[UUID] = mapped_column(
+        ForeignKey("sources.id", ondelete="CASCADE"), index=True
+    )
+    source: Mapped[SourceORM] = relationship(back_populates="channels")
 
-    # One-to-many relationship with Vacancy
+    # One-to-many relationship with Vacancy, removed along with the channel by the database
     vacancies: Mapped[list["VacancyORM"]] = relationship(
-        back_populates="channel", cascade="all, delete-orphan"
+        back_populates="channel", cascade="all, delete-orphan", passive_deletes=True
     )
 
     def __str__(self) -> str:
@@ -54,23 +149,274 @@ class ChannelORM(UserRelationMixin, Base):
         return self.__str__()
 
 
+class PostORM(Base):
+    """
+    A Telegram message of a source, stored once for all subscribers.
+    The text is kept apart, in PostBodyORM, so listings scan narrow rows.
+    """
+
+    __tablename__ = "posts"
+    __table_args__ = (
+        # Telegram message IDs are unique only within a channel
+        UniqueConstraint("source_id", "message_id", name="uq_posts_source_id_message_id"),
+        # The latest posts of a source, e.g. to warm up the seen messages filter
+        Index("ix_posts_source_id_created_at", "source_id", text("created_at DESC")),
+    )
+
+    message_id: Mapped[str]
+    contact: Mapped[str | None]
+    # Made from the content on ingestion (core/text.py), shown in the listings
+    title: Mapped[str_200]
+    snippet: Mapped[str_1000]
+
+    # Relationship with Source
+    source_id: Mapped[UUID] = mapped_column(ForeignKey("sources.id", ondelete="CASCADE"))
+
+    # One-to-one relationship with PostBody, loaded only when asked for
+    body: Mapped["PostBodyORM"] = relationship(lazy="raise", passive_deletes=True)
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.id})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class PostBodyORM(Base):
+    """The text of a post, needed by the vacancy details and the search only."""
+
+    __tablename__ = "post_bodies"
+    __table_args__ = (
+        # Full-text search
+        Index("ix_post_bodies_search_vector", "search_vector", postgresql_using="gin"),
+        # Fuzzy search, tolerating typos (pg_trgm)
+        Index(
+            "ix_post_bodies_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+        ),
+    )
+
+    # Shares the primary key with the post
+    id: Mapped[UUID] = mapped_column(ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    content: Mapped[Varchar]
+    # Maintained by the database, loaded only when asked for
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', content)", persisted=True),
+        deferred=True,
+    )
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.id})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+# The trigram index needs the extension
+event.listen(
+    PostBodyORM.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class VacancyState(IntFlag):
+    """The workflow state of a vacancy, packed into a single smallint column."""
+
+    VIEWED = 1
+    OPPORTUNITY = 2
+    APPLIED = 4
+    REJECTED = 8
+
+    @classmethod
+    def flag(cls, field: str) -> "VacancyState":
+        """The bit of a flag field, e.g. `is_viewed`."""
+        return cls[field.removeprefix("is_").upper()]
+
+    @classmethod
+    def pack(cls, flags: Mapping[str, bool], state: int = 0) -> "VacancyState":
+        """
+        Set or clear the bits of the given flag fields in the state.
+
+        Args:
+            flags (Mapping[str, bool]): The flag fields and their values, e.g. `is_viewed=True`.
+            state (int): The state to change, none of the bits are set by default.
+        """
+        packed = cls(state)
+        for field, value in flags.items():
+            packed = packed | cls.flag(field) if value else packed & ~cls.flag(field)
+        return packed
+
+
+def state_flag(flag: VacancyState) -> hybrid_property:
+    """A boolean flag backed by a bit of the `state` column, both in Python and in SQL."""
+
+    def fget(self: "VacancyORM") -> bool:
+        return bool(self.state & flag)
+
+    def fset(self: "VacancyORM", value: bool) -> None:
+        state = VacancyState(self.state or 0)
+        self.state = state | flag if value else state & ~flag
+
+    def expr(cls: type["VacancyORM"]) -> ColumnElement[bool]:
+        return cls.state.op("&")(flag.value) != 0
+
+    return hybrid_property(fget, fset, expr=expr)
+
+
+def state_condition(field: str, value: bool) -> str:
+    """
+    The SQL condition on a flag of the state, e.g. `state & 1 = 0` for `is_viewed=False`.
+    A partial index is only used by the queries which repeat its condition in this form.
+    """
+    flag = VacancyState.flag(field)
+    return f"state & {flag.value} = {flag.value if value else 0}"
+
+
+# Partial indexes of the vacancy listings filtered by state: the inbox, opportunities, applied
+VACANCY_SCREENS = {
+    "unviewed": state_condition("is_viewed", False),
+    "opportunities": state_condition("is_opportunity", True),
+    "applied": state_condition("is_applied", True),
+}
+
+
 class VacancyORM(Base):
+    """
+    A post delivered to a subscriber, with the subscriber's own state.
+
+    The table is partitioned by month of `created_at` (see services/retention.py), and
+    the partition key has to be a part of the primary key and of the unique constraints.
+    A vacancy is dated as its post, so a post is still delivered to a channel only once.
+    """
+
     __tablename__ = "vacancies"
+    __table_args__ = (
+        # Leading with `id`, so a vacancy is found by its ID with an index probe per partition
+        PrimaryKeyConstraint("id", "created_at", name="vacancies_pkey"),
+        UniqueConstraint(
+            "channel_id",
+            "post_id",
+            "created_at",
+            name="uq_vacancies_channel_id_post_id_created_at",
+        ),
+        # The vacancies of a channel, newest first (keyset pages)
+        Index(
+            "ix_vacancies_channel_id_created_at_id",
+            "channel_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        # The same for the most common screens: each reads only its own slice
+        *(
+            Index(
+                f"ix_vacancies_{name}",
+                "channel_id",
+                text("created_at DESC"),
+                text("id DESC"),
+                postgresql_where=text(condition),
+            )
+            for name, condition in VACANCY_SCREENS.items()
+        ),
+        CheckConstraint(f"state & ~{int(~VacancyState(0))} = 0", name="ck_vacancies_state"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    message_id: Mapped[str] = mapped_column(unique=True)
-    content: Mapped[Varchar]
-    contact: Mapped[str | None]
-    is_viewed: Mapped[bool] = mapped_column(default=False)
-    is_opportunity: Mapped[bool] = mapped_column(default=False)
-    is_applied: Mapped[bool] = mapped_column(default=False)
-    is_rejected: Mapped[bool] = mapped_column(default=False)
+    # The partition key, not indexed by itself
+    created_at: Mapped[datetime] = mapped_column(
+        primary_key=True,
+        doc="Time of creation",
+        server_default=func.now(),
+    )
+
+    # VacancyState bits, exposed as the flags below
+    state: Mapped[int] = mapped_column(SmallInteger, default=0)
+
+    is_viewed = state_flag(VacancyState.VIEWED)
+    is_opportunity = state_flag(VacancyState.OPPORTUNITY)
+    is_applied = state_flag(VacancyState.APPLIED)
+    is_rejected = state_flag(VacancyState.REJECTED)
 
     # Relationship with Channel
     channel_id: Mapped[UUID] = mapped_column(ForeignKey("channels.id", ondelete="CASCADE"))
     channel: Mapped[ChannelORM] = relationship(back_populates="vacancies")
 
+    # Relationship with Post, always needed together with the vacancy
+    post_id: Mapped[UUID] = mapped_column(ForeignKey("posts.id", ondelete="CASCADE"), index=True)
+    post: Mapped[PostORM] = relationship(lazy="joined", innerjoin=True)
+
+    @property
+    def message_id(self) -> str:
+        return self.post.message_id
+
+    @property
+    def title(self) -> str:
+        return self.post.title
+
+    @property
+    def snippet(self) -> str:
+        return self.post.snippet
+
+    @property
+    def content(self) -> str:
+        # Only loaded for the details, see CRUDVacancy.get
+        return self.post.body.content
+
+    @property
+    def contact(self) -> str | None:
+        return self.post.contact
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.id})"
 
     def __repr__(self) -> str:
         return self.__str__()
+
+
+# Rows out of the range of the monthly partitions land here, so an insert never fails
+event.listen(
+    VacancyORM.__table__,
+    "after_create",
+    DDL("CREATE TABLE vacancies_default PARTITION OF vacancies DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+class TelegramSessionORM(UserRelationMixin, Base):
+    """The Telethon session of a user account: DC, server address and authorization key."""
+
+    __tablename__ = "telegram_sessions"
+    _user_id_unique = True  # From UserRelationMixin
+    _user_back_populates = "telegram_session"  # From UserRelationMixin
+
+    session: Mapped[Varchar]  # A Telethon StringSession
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.user_id})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class TelegramEntityORM(UserRelationMixin, Base):
+    """A peer resolved by a user account, so it is not resolved over MTProto again."""
+
+    __tablename__ = "telegram_entities"
+    __table_args__ = (
+        # Access hashes are valid only for the account which resolved the peer
+        UniqueConstraint("user_id", "telegram_id", name="uq_telegram_entities_user_id_telegram_id"),
+    )
+
+    telegram_id: Mapped[str]  # As in ChannelORM.telegram_id: a username, a link or an ID
+    peer_id: Mapped[int]  # Marked peer ID
+    access_hash: Mapped[int | None]  # Basic groups have none
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}({self.telegram_id})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
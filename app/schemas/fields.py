@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from functools import cache
+from typing import Annotated
+
+from fastapi import Query
+from pydantic import BaseModel, ConfigDict, create_model
+
+from core.exceptions import InvalidFieldsException
+
+Fields = frozenset[str]
+
+
+@cache
+def sparse_model(schema: type[BaseModel], fields: Fields) -> type[BaseModel]:
+    """
+    The schema restricted to the fields, e.g. to serialize the rows of
+    `CRUDBase.select_fields`. Made once per set of fields.
+
+    Args:
+        schema (type[BaseModel]): The full response schema.
+        fields (Fields): The names of the fields to keep.
+    """
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (info.annotation, info)
+            for name, info in schema.model_fields.items()
+            if name in fields
+        },
+    )
+
+
+def serializer(schema: type[BaseModel], fields: Fields | None) -> type[BaseModel]:
+    """The schema itself, or the schema restricted to the fields if any are given."""
+    return schema if fields is None else sparse_model(schema, fields)
+
+
+def fields_query(schema: type[BaseModel]) -> Callable[..., Fields | None]:
+    """
+    A dependency parsing the `fields` query parameter: a comma-separated list of
+    the fields of the schema to return, None when all of them are wanted.
+
+    Args:
+        schema (type[BaseModel]): The response schema the fields are picked from.
+    """
+    def get_fields(
+        fields: Annotated[
+            str | None,
+            Query(description=f"Comma-separated fields to return, of {schema.__name__}"),
+        ] = None,
+    ) -> Fields | None:
+        if fields is None:
+            return None
+
+        names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        if not names:
+            raise InvalidFieldsException
+        if unknown := names - schema.model_fields.keys():
+            raise InvalidFieldsException(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return names
+
+    return get_fields
@@ -0,0 +1,35 @@
+from uuid import UUID
+
+from pydantic import BaseModel, computed_field, Field
+
+from core.text import make_snippet, make_title
+
+
+class PostCreate(BaseModel):
+    message_id: str = Field(description="Telegram message ID")
+    content: str
+    contact: str | None = Field(default=None)
+    source_id: UUID
+
+    # Computed once on ingestion and stored, so the listings never read the content
+
+    @computed_field
+    @property
+    def title(self) -> str:
+        return make_title(self.content)
+
+    @computed_field
+    @property
+    def snippet(self) -> str:
+        return make_snippet(self.content)
+
+
+class PostUpdate(BaseModel):
+    content: str | None = Field(default=None)
+    contact: str | None = Field(default=None)
+
+
+class PostBulkResult(BaseModel):
+    inserted: int = Field(description="Posts written to the database")
+    skipped: int = Field(description="Posts skipped as already stored")
+    ids: list[UUID] = Field(default_factory=list, description="IDs of the inserted posts")
@@ -1,7 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Response(BaseModel):
     status_code: int
     message: str
     data: list | dict | None = None
+    next_cursor: str | None = Field(
+        default=None, description="Pass as `cursor` to get the next page, null on the last one"
+    )
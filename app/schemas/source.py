@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class SourceCreate(BaseModel):
+    telegram_id: str
+
+
+class SourceUpdate(BaseModel):
+    telegram_id: str
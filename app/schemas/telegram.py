@@ -0,0 +1,75 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class TelegramMessage(BaseModel):
+    id: int = Field(description="Telegram message ID, unique within a channel")
+    date: datetime
+    text: str
+
+
+class IngestionStats(BaseModel):
+    channels: int = Field(default=0, description="Sources fetched during the cycle")
+    failed_channels: int = Field(default=0)
+    fetched: int = Field(default=0, description="Messages received from Telegram")
+    stored: int = Field(default=0, description="New posts written to the database")
+    skipped: int = Field(default=0, description="Messages skipped as already stored")
+    delivered: int = Field(default=0, description="Vacancies created for the subscribers")
+
+    @property
+    def dedup_rate(self) -> float:
+        """The share of fetched messages which turned out to be already stored."""
+        return self.skipped / self.fetched if self.fetched else 0.0
+
+
+class ListenerStats(BaseModel):
+    received: int = Field(default=0, description="New messages put into the queue")
+    dropped: int = Field(default=0, description="Messages dropped because the queue was full")
+    stored: int = Field(default=0, description="New posts written to the database")
+    skipped: int = Field(default=0, description="Messages skipped as already stored")
+    delivered: int = Field(default=0, description="Vacancies created for the subscribers")
+    batches: int = Field(default=0, description="Batches written to the database")
+    failed: int = Field(default=0, description="Batches skipped as they could not be stored")
+    queue_high_watermark: int = Field(default=0, description="The largest queue size seen")
+
+
+class SeenFilterStats(BaseModel):
+    checked: int = Field(default=0, description="Posts checked against the filter")
+    hits: int = Field(default=0, description="Posts skipped as already stored")
+    false_positives: int = Field(default=0, description="New posts taken for stored ones")
+    loaded_sources: int = Field(default=0, description="Sources loaded into the filter")
+    resets: int = Field(default=0, description="Times the filter was full and started over")
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of checked posts which were skipped without an upsert."""
+        return self.hits / self.checked if self.checked else 0.0
+
+    @property
+    def false_positive_rate(self) -> float:
+        """The share of filter matches which turned out to be new posts."""
+        matches = self.hits + self.false_positives
+        return self.false_positives / matches if matches else 0.0
+
+
+class TelegramSessionCreate(BaseModel):
+    user_id: UUID
+    session: str = Field(description="Telethon StringSession")
+
+
+class TelegramSessionUpdate(BaseModel):
+    session: str = Field(description="Telethon StringSession")
+
+
+class TelegramEntityCreate(BaseModel):
+    user_id: UUID
+    telegram_id: str
+    peer_id: int = Field(description="Marked peer ID")
+    access_hash: int | None
+
+
+class TelegramEntityUpdate(BaseModel):
+    peer_id: int = Field(description="Marked peer ID")
+    access_hash: int | None
@@ -1,12 +1,12 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from core.config import settings
 
 
 class VacancyBase(BaseModel):
-    content: str
-    contact: str | None = Field(default=None)
     is_viewed: bool = Field(default=False)
     is_opportunity: bool = Field(default=False)
     is_applied: bool = Field(default=False)
@@ -15,23 +15,71 @@ class VacancyBase(BaseModel):
 
 class VacancyCreate(VacancyBase):
     message_id: str = Field(description="Telegram message ID")
+    content: str
+    contact: str | None = Field(default=None)
     channel_id: UUID
 
 
 class VacancyUpdate(VacancyBase):
-    content: str | None = Field(default=None)
+    # Only the user's state is updatable, the post itself is shared by all subscribers
+    pass
 
 
-class VacancyResponse(VacancyBase):
+class VacancySummary(VacancyBase):
+    # A vacancy in the listings: the flags, the title line and the snippet of the post
     id: UUID
-    message_id: str
-    created_at: datetime
-    updated_at: datetime
     channel_id: UUID
+    created_at: datetime
+    title: str = Field(description="The first line of the post, normalized and bounded")
+    snippet: str = Field(description="The beginning of the post after the title")
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class VacancyResponse(VacancySummary):
+    message_id: str
+    content: str
+    contact: str | None
+    updated_at: datetime
+
+
+class VacancyFilter(BaseModel):
+    is_viewed: bool | None = Field(default=None)
+    is_opportunity: bool | None = Field(default=None)
+    is_applied: bool | None = Field(default=None)
+    is_rejected: bool | None = Field(default=None)
+    created_after: datetime | None = Field(default=None, description="Collected at or after")
+    created_before: datetime | None = Field(default=None, description="Collected before")
+
+
+class VacancyBulkUpdate(BaseModel):
+    ids: list[UUID] | None = Field(
+        default=None,
+        max_length=settings.MAX_PAGE_SIZE,
+        description="The vacancies to update, e.g. the ones of a page",
+    )
+    filters: VacancyFilter | None = Field(
+        default=None,
+        description="Update all the vacancies matching, e.g. `{}` to mark all as viewed",
+    )
+    # Only the given flags are set or cleared
+    state: VacancyUpdate
+
+    @model_validator(mode="after")
+    def check_update(self) -> "VacancyBulkUpdate":
+        if self.ids is None and self.filters is None:
+            raise ValueError("Either ids or filters are required")
+        if not self.state.model_fields_set:
+            raise ValueError("No flags to update in state")
+        return self
+
+
+class VacancySearchResult(VacancySummary):
+    rank: float = Field(description="Relevance to the search query, the higher the better")
+    # Instead of the beginning of the post
+    snippet: str = Field(description="Fragments of the content with the matches in <mark> tags")
+
+
 # For Opportunities, since it is now handled by `is_opportunity` in Vacancy:
 class OpportunityResponse(VacancyResponse):
     model_config = ConfigDict(from_attributes=True)
@@ -1,11 +1,15 @@
 from uuid import UUID
 
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.exceptions import AccessForbiddenException
 from crud.channel import channel_crud
+from crud.vacancy import vacancy_crud
 from db.models import UserORM
 from schemas.channel import ChannelResponse, ChannelCreate, ChannelUpdate
+from schemas.fields import Fields, serializer
 
 
 class ChannelService:
@@ -14,9 +18,15 @@ class ChannelService:
         cls,
         db_session: AsyncSession,
         user: UserORM,
-    ) -> list[ChannelResponse]:
-        channels = await channel_crud.get_user_channels(db_session, user=user)
-        return [ChannelResponse.model_validate(channel) for channel in channels]
+        fields: Fields | None = None,
+        cursor: str | None = None,
+        limit: int = settings.PAGE_SIZE,
+    ) -> tuple[list[BaseModel], str | None]:
+        channels, next_cursor = await channel_crud.get_user_channels(
+            db_session, user=user, fields=fields, cursor=cursor, limit=limit
+        )
+        schema = serializer(ChannelResponse, fields)
+        return [schema.model_validate(channel) for channel in channels], next_cursor
 
     @classmethod
     async def get_by_id(
@@ -24,12 +34,18 @@ class ChannelService:
         db_session: AsyncSession,
         user: UserORM,
         channel_id: UUID,
-    ) -> ChannelResponse:
-        channel = await channel_crud.get_or_404(db_session, obj_id=channel_id)
+        fields: Fields | None = None,
+    ) -> BaseModel:
+        channel = await channel_crud.get_or_404(
+            db_session,
+            obj_id=channel_id,
+            # The owner is needed for the permission check, even if it is not returned
+            fields=None if fields is None else {"user_id", *fields},
+        )
         if channel.user_id != user.id:
             raise AccessForbiddenException
 
-        return ChannelResponse.model_validate(channel)
+        return serializer(ChannelResponse, fields).model_validate(channel)
 
     @classmethod
     async def create(
@@ -41,6 +57,8 @@ class ChannelService:
         new_channel = await channel_crud.create(
             db_session, obj_in=channel_data.model_copy(update={"user_id": user.id})
         )
+        # The source may already be collected for other subscribers, deliver its history
+        await vacancy_crud.fan_out(db_session, channel_ids=[new_channel.id])
 
         return ChannelResponse.model_validate(new_channel)
 
@@ -52,11 +70,13 @@ class ChannelService:
         user: UserORM,
         channel_data: ChannelUpdate,
     ) -> ChannelResponse:
-        channel = await channel_crud.get_or_404(db_session, obj_id=channel_id)
-        if channel.user_id != user.id:
-            raise AccessForbiddenException
-
-        update_channel = await channel_crud.update(db_session, db_obj=channel, obj_in=channel_data)
+        # Raises ResourceNotFoundException, or AccessForbiddenException for other users
+        update_channel = await channel_crud.update_owned(
+            db_session,
+            obj_id=channel_id,
+            user_id=user.id,
+            values=channel_data.model_dump(exclude_unset=True),
+        )
         return ChannelResponse.model_validate(update_channel)
 
     @classmethod
@@ -65,10 +85,10 @@ class ChannelService:
         db_session: AsyncSession,
         user: UserORM,
         channel_id: UUID,
+        background: bool = False,
     ) -> UUID:
-        channel = await channel_crud.get_or_404(db_session, obj_id=channel_id)
-        if channel.user_id != user.id:
-            raise AccessForbiddenException
-
-        await channel_crud.remove(db_session, obj_id=channel_id)
-        return channel_id
+        if background:
+            # Hidden right away, the vacancies are purged in chunks by services/purge.py
+            return await channel_crud.mark_deleted(db_session, obj_id=channel_id, user_id=user.id)
+        # The vacancies of the channel are removed by the database, see VacancyORM
+        return await channel_crud.remove_owned(db_session, obj_id=channel_id, user_id=user.id)
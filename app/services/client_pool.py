@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Callable
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from telethon.sessions import SQLiteSession, StringSession
+
+from core.config import settings
+from core.exceptions import TelegramSourceException
+from crud.telegram import telegram_session_crud
+from db.connect import AsyncSessionFactory
+from db.models import UserORM
+from schemas.telegram import TelegramSessionCreate
+
+logger = logging.getLogger(__name__)
+
+
+def stored_session(user: UserORM) -> str | None:
+    """
+    Returns the Telethon session of the account stored in the database.
+    Sessions used to be SQLite files, a file left in `TELEGRAM_SESSIONS_DIR` is imported
+    and saved to the database on the first connection.
+    """
+    if user.telegram_session is not None:
+        return user.telegram_session.session
+
+    path = settings.TELEGRAM_SESSIONS_DIR / f"{user.id}.session"
+    if not path.exists():
+        return None
+    file_session = SQLiteSession(str(path.with_suffix("")))
+    try:
+        return StringSession.save(file_session) or None
+    finally:
+        file_session.close()
+
+
+def make_client(user: UserORM) -> TelegramClient:
+    """
+    Create a Telegram client for the user account, with the session kept in memory.
+    The user's `telegram_session` must be loaded.
+
+    Every FloodWait is raised instead of being slept through inside Telethon,
+    so the pool can park the account without holding a global slot.
+    """
+    return TelegramClient(
+        StringSession(stored_session(user)),
+        int(user.api_id),
+        user.api_hash,
+        flood_sleep_threshold=0,
+    )
+
+
+class AccountClient:
+    """A long-lived client of one Telegram account and the account's throttling state."""
+
+    def __init__(self, client: TelegramClient, concurrency: int) -> None:
+        self.client = client
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.parked_until = 0.0
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def parked_for(self) -> float:
+        """Seconds left until the account may send requests again."""
+        return max(0.0, self.parked_until - asyncio.get_running_loop().time())
+
+    def park(self, seconds: float) -> None:
+        self.parked_until = max(self.parked_until, asyncio.get_running_loop().time() + seconds)
+
+    async def wait_unparked(self) -> None:
+        # The account may be parked again while sleeping, hence the loop
+        delay = self.parked_for
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self.parked_for
+
+    async def connect(self) -> bool:
+        """Returns whether a new connection has been established."""
+        async with self._connect_lock:
+            if self.client.is_connected():
+                return False
+            await self.client.connect()
+            if not await self.client.is_user_authorized():
+                await self.client.disconnect()
+                raise TelegramSourceException("Telegram session is not authorized")
+            return True
+
+
+class TelegramClientPool:
+    """
+    Keeps one connected client per Telegram account and multiplexes the account's channel
+    fetches over it.
+
+    Fetches are bounded per account and globally. When an account hits a FloodWait,
+    only this account is parked for the requested delay: its fetches wait without
+    occupying global slots, while fetches of other accounts go on.
+
+    Sessions are saved to the database after connecting and on close, so the
+    authorization survives restarts and does not depend on the node the worker runs on.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[UserORM], TelegramClient] = make_client,
+        session_factory: Callable[[], AsyncSession] | None = AsyncSessionFactory,
+        *,
+        account_concurrency: int = settings.TELEGRAM_ACCOUNT_CONCURRENCY,
+        global_concurrency: int = settings.TELEGRAM_GLOBAL_CONCURRENCY,
+    ) -> None:
+        """
+        Args:
+            client_factory (Callable[[UserORM], TelegramClient]): Creates a client for an account.
+            session_factory (Callable[[], AsyncSession] | None): Creates database sessions.
+                None does not save the Telethon sessions.
+            account_concurrency (int): The number of parallel fetches per account.
+            global_concurrency (int): The number of parallel fetches across all accounts.
+        """
+        self.client_factory = client_factory
+        self.session_factory = session_factory
+        self.account_concurrency = account_concurrency
+        self._global = asyncio.Semaphore(global_concurrency)
+        self._accounts: dict[UUID, AccountClient] = {}
+
+    def _account(self, user: UserORM) -> AccountClient:
+        account = self._accounts.get(user.id)
+        if account is None:
+            account = AccountClient(self.client_factory(user), self.account_concurrency)
+            self._accounts[user.id] = account
+        return account
+
+    async def _save_session(self, user_id: UUID, client: TelegramClient) -> None:
+        if self.session_factory is None:
+            return
+        session = client.session.save()
+        if not session:
+            return
+        async with self.session_factory() as db_session:
+            await telegram_session_crud.save(
+                db_session, obj_in=TelegramSessionCreate(user_id=user_id, session=session)
+            )
+            await db_session.commit()
+
+    def get(self, user_id: UUID) -> AccountClient | None:
+        """Returns the client of the account, if it has been created."""
+        return self._accounts.get(user_id)
+
+    def park(self, user: UserORM, seconds: float) -> None:
+        """Stop using the account for the given number of seconds."""
+        logger.warning(f"Telegram account of {user} is parked for {seconds}s")
+        self._account(user).park(seconds)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, user: UserORM) -> AsyncIterator[TelegramClient]:
+        """
+        Borrow the connected client of the user account.
+        A FloodWait raised while the client is borrowed parks the account and is re-raised.
+        """
+        account = self._account(user)
+        async with account.semaphore:
+            while True:
+                await account.wait_unparked()
+                await self._global.acquire()
+                if not account.parked_for:
+                    break
+                # The account was parked while we were waiting for a global slot
+                self._global.release()
+
+            try:
+                if await account.connect():
+                    await self._save_session(user.id, account.client)
+                yield account.client
+            except FloodWaitError as e:
+                self.park(user, e.seconds)
+                raise
+            finally:
+                self._global.release()
+
+    async def close(self) -> None:
+        """Save the sessions and disconnect all clients."""
+        accounts, self._accounts = self._accounts, {}
+        for user_id, account in accounts.items():
+            if account.client.is_connected():
+                # The authorization key changes when the account migrates to another DC
+                try:
+                    await self._save_session(user_id, account.client)
+                except Exception:
+                    logger.exception(f"Failed to save the Telegram session of account {user_id}")
+            await account.client.disconnect()
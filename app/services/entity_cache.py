@@ -0,0 +1,119 @@
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from telethon import utils
+from telethon.tl.types import (
+    InputPeerChannel,
+    InputPeerChat,
+    InputPeerUser,
+    PeerChannel,
+    PeerChat,
+    TypeInputPeer,
+)
+
+from core.config import settings
+from crud.telegram import telegram_entity_crud
+from db.connect import AsyncSessionFactory
+from schemas.telegram import TelegramEntityCreate
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[UUID, str]
+
+
+def peer_from_row(peer_id: int, access_hash: int | None) -> TypeInputPeer:
+    real_id, peer_type = utils.resolve_id(peer_id)
+    if peer_type is PeerChannel:
+        return InputPeerChannel(real_id, access_hash)
+    if peer_type is PeerChat:
+        return InputPeerChat(real_id)
+    return InputPeerUser(real_id, access_hash)
+
+
+class EntityCache:
+    """
+    Resolved Telegram peers per account: a process-local LRU in front of Postgres.
+
+    Resolving a username or an ID over MTProto costs a round trip and counts towards
+    the FloodWait limits, while a peer with its access hash can be used right away.
+    Peers are persisted, so they survive restarts and are shared by all workers.
+    A peer rejected by Telegram must be invalidated, it is resolved anew then.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] | None = AsyncSessionFactory,
+        *,
+        maxsize: int = settings.TELEGRAM_ENTITY_CACHE_SIZE,
+    ) -> None:
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession] | None): Creates database sessions.
+                None keeps the peers in memory only.
+            maxsize (int): The number of peers kept in memory.
+        """
+        self.session_factory = session_factory
+        self.maxsize = maxsize
+        self._peers: OrderedDict[CacheKey, TypeInputPeer] = OrderedDict()
+
+    async def get(self, user_id: UUID, telegram_id: str) -> TypeInputPeer | None:
+        """Returns the peer the account has resolved the Telegram ID to, if any."""
+        key = (user_id, telegram_id)
+        peer = self._peers.get(key)
+        if peer is not None:
+            self._peers.move_to_end(key)
+            return peer
+
+        if self.session_factory is None:
+            return None
+        async with self.session_factory() as db_session:
+            entity = await telegram_entity_crud.get_entity(
+                db_session, user_id=user_id, telegram_id=telegram_id
+            )
+        if entity is None:
+            return None
+
+        peer = peer_from_row(entity.peer_id, entity.access_hash)
+        self._remember(key, peer)
+        return peer
+
+    async def put(self, user_id: UUID, telegram_id: str, peer: TypeInputPeer) -> None:
+        """Remember the peer the account has resolved the Telegram ID to."""
+        if not isinstance(peer, InputPeerChannel | InputPeerChat | InputPeerUser):
+            return  # E.g. InputPeerSelf, there is nothing to save on it
+
+        self._remember((user_id, telegram_id), peer)
+        if self.session_factory is None:
+            return
+        async with self.session_factory() as db_session:
+            await telegram_entity_crud.save(
+                db_session,
+                obj_in=TelegramEntityCreate(
+                    user_id=user_id,
+                    telegram_id=telegram_id,
+                    peer_id=utils.get_peer_id(peer),
+                    access_hash=getattr(peer, "access_hash", None),
+                ),
+            )
+            await db_session.commit()
+
+    async def invalidate(self, user_id: UUID, telegram_id: str) -> None:
+        """Forget the peer, so the Telegram ID is resolved anew."""
+        logger.info(f"Invalidating the resolved peer of {telegram_id} for account {user_id}")
+        self._peers.pop((user_id, telegram_id), None)
+        if self.session_factory is None:
+            return
+        async with self.session_factory() as db_session:
+            await telegram_entity_crud.remove_entity(
+                db_session, user_id=user_id, telegram_id=telegram_id
+            )
+            await db_session.commit()
+
+    def _remember(self, key: CacheKey, peer: TypeInputPeer) -> None:
+        self._peers[key] = peer
+        self._peers.move_to_end(key)
+        if len(self._peers) > self.maxsize:
+            self._peers.popitem(last=False)
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from collections.abc import Callable
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from tenacity import (
+    AsyncRetrying,
+    before_sleep_log,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from core.config import settings
+from db.connect import AsyncSessionFactory
+from db.models import ChannelORM
+from schemas.post import PostCreate
+from schemas.telegram import ListenerStats, TelegramMessage
+from services.message_source import BaseMessageSource
+from services.seen_filter import SeenMessages
+from services.telegram import iter_fetch_channel_pages, message_to_post, store_posts
+
+logger = logging.getLogger(__name__)
+
+# The database is unavailable for now, the same batch may be stored later on
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, ConnectionError, TimeoutError)
+
+
+class TelegramListener:
+    """
+    Real-time ingestion: subscribes to new posts of all active sources and stores them
+    within seconds instead of waiting for the next polling cycle.
+
+    Event handlers only put messages into a bounded queue, a single writer task drains it
+    in batches bounded by size and time. When the database is slow and the queue is full,
+    a handler waits up to `put_timeout` for a free slot and then drops the message, so memory
+    stays bounded. Dropped messages are not lost: the listener never moves channel cursors,
+    so the polling engine picks them up on its next cycle. Every source is listened to
+    through one of its subscriptions, so a message is received once for all subscribers.
+    """
+
+    def __init__(
+        self,
+        source: BaseMessageSource,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionFactory,
+        *,
+        queue_size: int = settings.LISTENER_QUEUE_SIZE,
+        put_timeout: float = settings.LISTENER_PUT_TIMEOUT,
+        batch_size: int = settings.LISTENER_BATCH_SIZE,
+        flush_interval: float = settings.LISTENER_FLUSH_INTERVAL,
+        refresh_interval: float = settings.LISTENER_REFRESH_INTERVAL,
+        write_attempts: int = settings.LISTENER_WRITE_ATTEMPTS,
+        channel_filter: Callable[[ChannelORM], bool] | None = None,
+        seen: SeenMessages | None = None,
+    ) -> None:
+        """
+        Args:
+            source (BaseMessageSource): Where the new messages come from.
+            session_factory (Callable[[], AsyncSession]): Creates database sessions.
+            queue_size (int): The number of messages buffered before the writer.
+            put_timeout (float): Seconds to wait for a free queue slot before dropping a message.
+            batch_size (int): The maximum number of posts written per transaction.
+            flush_interval (float): Seconds a partial batch may wait for more messages.
+            refresh_interval (float): Seconds between two subscription refreshes.
+            write_attempts (int): Attempts to store a batch while the database is unavailable,
+                before the batch is skipped.
+            channel_filter (Callable[[ChannelORM], bool] | None): Selects the subscriptions
+                to listen through, e.g. the ones of the sources leased by the worker.
+                All of them by default.
+            seen (SeenMessages | None): Keeps already stored messages away from the upserts,
+                share it with the polling engine of the process.
+        """
+        self.source = source
+        self.session_factory = session_factory
+        self.put_timeout = put_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.write_attempts = write_attempts
+        self.channel_filter = channel_filter
+        self.seen = seen or SeenMessages()
+        self.queue: asyncio.Queue[PostCreate] = asyncio.Queue(maxsize=queue_size)
+        self.stats = ListenerStats()
+
+    async def run(self) -> None:
+        """Listen and write until cancelled."""
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._keep_subscribed())
+                tg.create_task(self._write_forever())
+        finally:
+            await self.source.close()
+
+    async def subscribe(self) -> None:
+        """(Re)subscribe to the active sources, dropping the ones without subscribers."""
+        channels: list[ChannelORM] = []
+        async for page in iter_fetch_channel_pages(self.session_factory):
+            channels.extend(filter(self.channel_filter, page) if self.channel_filter else page)
+        await self.source.subscribe(channels, self.on_message)
+        logger.info(f"Listening to {len(channels)} channels, {self.stats}")
+
+    async def on_message(self, channel: ChannelORM, message: TelegramMessage) -> None:
+        """Put a new message into the queue, dropping it if the queue stays full."""
+        try:
+            await asyncio.wait_for(
+                self.queue.put(message_to_post(channel, message)), self.put_timeout
+            )
+        except TimeoutError:
+            self.stats.dropped += 1
+            logger.warning(f"Listener queue is full, dropped message {message.id} of {channel}")
+            return
+
+        self.stats.received += 1
+        self.stats.queue_high_watermark = max(self.stats.queue_high_watermark, self.queue.qsize())
+
+    async def next_batch(self) -> list[PostCreate]:
+        """
+        Wait for the next message, then collect more until the batch is full
+        or `flush_interval` has passed since the first one.
+        """
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def write_batch(self, batch: list[PostCreate]) -> None:
+        """
+        Store the batch, retrying with a backoff while the database is unavailable.
+        A batch which cannot be stored is skipped, so the writer keeps draining the queue:
+        its messages are picked up by the polling engine, as the dropped ones.
+        """
+        try:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type(TRANSIENT_ERRORS),
+                stop=stop_after_attempt(self.write_attempts),
+                wait=wait_exponential(max=30),
+                before_sleep=before_sleep_log(logger, logging.WARNING),
+                reraise=True,
+            ):
+                with attempt:
+                    async with self.session_factory() as db_session:
+                        result, delivered = await store_posts(db_session, batch, self.seen)
+                        await db_session.commit()
+        except Exception:
+            self.stats.failed += 1
+            message_ids = ", ".join(f"{post.source_id}/{post.message_id}" for post in batch)
+            logger.exception(f"Failed to store a batch of {len(batch)} posts: {message_ids}")
+            return
+
+        self.stats.batches += 1
+        self.stats.stored += result.inserted
+        self.stats.skipped += result.skipped
+        self.stats.delivered += delivered
+
+    async def _write_forever(self) -> None:
+        while True:
+            batch = await self.next_batch()
+            await self.write_batch(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def _keep_subscribed(self) -> None:
+        while True:
+            try:
+                await self.subscribe()
+            except Exception:
+                logger.exception("Failed to refresh the listener subscriptions")
+            await asyncio.sleep(self.refresh_interval)
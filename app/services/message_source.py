@@ -0,0 +1,262 @@
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from datetime import datetime, UTC
+from uuid import UUID
+
+from telethon import events, TelegramClient, utils
+from telethon.errors import BadRequestError, FloodWaitError
+from telethon.tl.types import TypeInputPeer
+
+from core.config import settings
+from db.models import ChannelORM
+from schemas.telegram import TelegramMessage
+from services.client_pool import TelegramClientPool
+from services.entity_cache import EntityCache
+
+logger = logging.getLogger(__name__)
+
+MessageCallback = Callable[[ChannelORM, TelegramMessage], Awaitable[None]]
+
+
+def channel_entity(telegram_id: str) -> str | int:
+    """
+    Telethon accepts usernames, links and numeric peer IDs. Numeric IDs must be passed as `int`,
+    otherwise Telethon treats them as a username.
+    """
+    return int(telegram_id) if telegram_id.lstrip("-").isdigit() else telegram_id
+
+
+class BaseMessageSource(ABC):
+    """
+    A source of Telegram channel messages.
+    Messages are yielded one by one in ascending ID order, so a caller can consume
+    an arbitrarily long history without keeping it in memory.
+    """
+
+    @abstractmethod
+    def iter_messages(
+        self,
+        channel: ChannelORM,
+        *,
+        min_id: int = 0,
+        limit: int | None = None,
+    ) -> AsyncIterator[TelegramMessage]:
+        """
+        Iterate over channel messages with an ID greater than `min_id`.
+
+        Args:
+            channel (ChannelORM): The channel to read. Its `user` must be loaded.
+            min_id (int): Only messages with a greater ID are yielded.
+            limit (int | None): The maximum number of messages to yield.
+        """
+
+    @abstractmethod
+    async def subscribe(self, channels: Sequence[ChannelORM], callback: MessageCallback) -> None:
+        """
+        Call `callback` for every new message posted to the channels from now on.
+        A new subscription replaces the previous one.
+
+        Args:
+            channels (Sequence[ChannelORM]): The channels to listen to. Their `user` must be loaded.
+            callback (MessageCallback): Awaited with the channel and the new message.
+        """
+
+    async def close(self) -> None:  # NOQA: B027
+        """Release the resources held by the source."""
+
+
+class TelethonMessageSource(BaseMessageSource):
+    """
+    Reads channel history through the MTProto API on behalf of the channel owner.
+    The owner must have an authorized Telegram session stored in the database.
+
+    Clients are borrowed from a pool holding one connection per account. When the account
+    gets a FloodWait, the iteration waits until the pool unparks the account and resumes
+    after the last yielded message.
+
+    Channels are resolved once per account and the peers are cached. When Telegram rejects
+    a cached peer, it is invalidated and the channel is resolved anew.
+    """
+
+    def __init__(
+        self,
+        pool: TelegramClientPool | None = None,
+        entities: EntityCache | None = None,
+    ) -> None:
+        self.pool = pool or TelegramClientPool()
+        self.entities = entities or EntityCache()
+        self._handlers: dict[UUID, Callable] = {}
+
+    async def resolve(self, client: TelegramClient, channel: ChannelORM) -> TypeInputPeer:
+        """Returns the channel peer, resolving it over MTProto only on a cache miss."""
+        peer = await self.entities.get(channel.user.id, channel.telegram_id)
+        if peer is None:
+            peer = await client.get_input_entity(channel_entity(channel.telegram_id))
+            await self.entities.put(channel.user.id, channel.telegram_id, peer)
+        return peer
+
+    async def iter_messages(
+        self,
+        channel: ChannelORM,
+        *,
+        min_id: int = 0,
+        limit: int | None = None,
+    ) -> AsyncIterator[TelegramMessage]:
+        remaining = limit
+        invalidated = False
+        while remaining is None or remaining > 0:
+            try:
+                async with self.pool.acquire(channel.user) as client:
+                    async for message in client.iter_messages(
+                        await self.resolve(client, channel),
+                        min_id=min_id,
+                        limit=remaining,
+                        reverse=True,  # Oldest first, so the caller can checkpoint as it goes
+                    ):
+                        min_id = message.id
+                        if remaining is not None:
+                            remaining -= 1
+                        if not message.message:  # Service messages and media without caption
+                            continue
+                        yield TelegramMessage(
+                            id=message.id, date=message.date, text=message.message
+                        )
+                return
+            except FloodWaitError:
+                # The account is parked by the pool, the next `acquire` waits it out
+                continue
+            except (BadRequestError, ValueError):
+                # The cached peer may be stale, e.g. the channel was recreated under the username
+                if invalidated:
+                    raise
+                invalidated = True
+                await self.entities.invalidate(channel.user.id, channel.telegram_id)
+
+    async def subscribe(self, channels: Sequence[ChannelORM], callback: MessageCallback) -> None:
+        by_account: dict[UUID, list[ChannelORM]] = {}
+        for channel in channels:
+            by_account.setdefault(channel.user_id, []).append(channel)
+
+        for user_id in self._handlers.keys() - by_account.keys():
+            self._unsubscribe_account(user_id)
+
+        for account_channels in by_account.values():
+            try:
+                await self._subscribe_account(account_channels, callback)
+            except Exception:
+                logger.exception(f"Failed to subscribe to channels of {account_channels[0].user}")
+
+    async def _subscribe_account(
+        self, channels: list[ChannelORM], callback: MessageCallback
+    ) -> None:
+        user = channels[0].user
+        async with self.pool.acquire(user) as client:
+            # Updates carry marked peer IDs
+            peers = {
+                utils.get_peer_id(await self.resolve(client, channel)): channel
+                for channel in channels
+            }
+
+            async def handler(event: events.NewMessage.Event) -> None:
+                channel = peers.get(event.chat_id)
+                if channel is None or not event.message.message:
+                    return
+                message = TelegramMessage(
+                    id=event.message.id, date=event.message.date, text=event.message.message
+                )
+                await callback(channel, message)
+
+            old_handler = self._handlers.pop(user.id, None)
+            if old_handler is not None:
+                client.remove_event_handler(old_handler)
+            client.add_event_handler(handler, events.NewMessage(chats=list(peers)))
+            self._handlers[user.id] = handler
+
+    def _unsubscribe_account(self, user_id: UUID) -> None:
+        handler = self._handlers.pop(user_id)
+        account = self.pool.get(user_id)
+        if account is not None:
+            account.client.remove_event_handler(handler)
+
+    async def close(self) -> None:
+        self._handlers.clear()
+        await self.pool.close()
+
+
+class FakeMessageSource(BaseMessageSource):
+    """
+    An in-process message source for tests and local runs without network access.
+
+    Messages can be published explicitly with `publish`. Additionally, every channel
+    can be given `synthetic_messages` generated on the fly, which is handy for load runs:
+    they are never stored, so memory usage does not depend on the size of the "history".
+    """
+
+    def __init__(self, synthetic_messages: int = 0) -> None:
+        self.synthetic_messages = synthetic_messages
+        self._messages: dict[str, list[TelegramMessage]] = {}
+        self._subscribers: dict[str, ChannelORM] = {}
+        self._callback: MessageCallback | None = None
+
+    def publish(self, telegram_id: str, text: str, date: datetime | None = None) -> TelegramMessage:
+        """
+        Add a message to the channel history.
+
+        Args:
+            telegram_id (str): The Telegram ID of the channel.
+            text (str): The message text.
+            date (datetime | None): The message date, now by default.
+        """
+        history = self._messages.setdefault(telegram_id, [])
+        last_id = history[-1].id if history else self.synthetic_messages
+        message = TelegramMessage(id=last_id + 1, date=date or datetime.now(UTC), text=text)
+        history.append(message)
+        return message
+
+    async def push(self, telegram_id: str, text: str) -> TelegramMessage:
+        """Publish a message and deliver it to the subscriber of the channel, if any."""
+        message = self.publish(telegram_id, text)
+        channel = self._subscribers.get(telegram_id)
+        if channel is not None and self._callback is not None:
+            await self._callback(channel, message)
+        return message
+
+    def _synthesize(self, telegram_id: str) -> Iterator[TelegramMessage]:
+        return (
+            TelegramMessage(
+                id=message_id,
+                date=datetime.now(UTC),
+                text=f"Vacancy #{message_id} from {telegram_id}. Contact: @hr_{message_id}",
+            )
+            for message_id in range(1, self.synthetic_messages + 1)
+        )
+
+    async def iter_messages(
+        self,
+        channel: ChannelORM,
+        *,
+        min_id: int = 0,
+        limit: int | None = None,
+    ) -> AsyncIterator[TelegramMessage]:
+        history = itertools.chain(
+            self._synthesize(channel.telegram_id),
+            self._messages.get(channel.telegram_id, []),
+        )
+        newer = (message for message in history if message.id > min_id)
+
+        for message in itertools.islice(newer, limit):
+            yield message
+
+    async def subscribe(self, channels: Sequence[ChannelORM], callback: MessageCallback) -> None:
+        self._subscribers = {channel.telegram_id: channel for channel in channels}
+        self._callback = callback
+
+
+def get_message_source() -> BaseMessageSource:
+    """Returns the message source configured by `TELEGRAM_SOURCE`."""
+    if settings.TELEGRAM_SOURCE == "fake":
+        logger.warning("Using the fake Telegram message source, no real messages will be fetched")
+        return FakeMessageSource()
+    return TelethonMessageSource()
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.connect import AsyncSessionFactory
+from db.models import ChannelORM, VacancyORM
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelPurge:
+    """
+    Removes the channels deleted in the background (see `CRUDChannel.mark_deleted`).
+
+    The vacancies of such a channel are removed in chunks, each in a transaction of its own,
+    so no transaction holds locks or piles up dead rows for long, however many vacancies
+    the channel has. The channel itself is removed once it has no vacancies left.
+    Workers purge different channels at the same time, a channel is claimed with
+    `FOR UPDATE SKIP LOCKED` for every chunk.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionFactory,
+        *,
+        chunk_size: int = settings.CHANNEL_PURGE_CHUNK,
+        interval: float = settings.CHANNEL_PURGE_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Creates database sessions.
+            chunk_size (int): The number of vacancies removed per transaction.
+            interval (float): Seconds between two runs once nothing is left to purge.
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.interval = interval
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.purge()
+            except Exception:
+                # The channels stay hidden meanwhile, they are purged on the next run
+                logger.exception("Channel purge failed")
+            await asyncio.sleep(self.interval)
+
+    async def purge(self) -> int:
+        """Purge the deleted channels until none is left. Returns the number of removed ones."""
+        purged = 0
+        while (chunk := await self.purge_chunk()) is not None:
+            channel_id, done = chunk
+            if done:
+                logger.info(f"Purged the deleted channel {channel_id}")
+                purged += 1
+        return purged
+
+    async def purge_chunk(self) -> tuple[UUID, bool] | None:
+        """
+        Remove a chunk of the vacancies of a deleted channel, and the channel itself
+        once they are all gone. Returns the channel and whether it was removed,
+        None if no deleted channel is left.
+        """
+        async with self.session_factory() as db_session:
+            channel_id = await db_session.scalar(
+                select(ChannelORM.id)
+                .where(ChannelORM.deleted_at.is_not(None))
+                .order_by(ChannelORM.deleted_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if channel_id is None:
+                return None
+
+            # Keyed on the primary key, so every partition seeks right to the rows
+            chunk = (
+                select(VacancyORM.id, VacancyORM.created_at)
+                .where(VacancyORM.channel_id == channel_id)
+                .limit(self.chunk_size)
+            )
+            result = await db_session.execute(
+                delete(VacancyORM)
+                .where(tuple_(VacancyORM.id, VacancyORM.created_at).in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+            done = result.rowcount < self.chunk_size
+            if done:
+                await db_session.execute(delete(ChannelORM).where(ChannelORM.id == channel_id))
+            await db_session.commit()
+        return channel_id, done
@@ -0,0 +1,276 @@
+import asyncio
+import gzip
+import logging
+import re
+from collections.abc import Callable
+from datetime import datetime, UTC
+from pathlib import Path
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.connect import AsyncSessionFactory
+
+logger = logging.getLogger(__name__)
+
+TABLE = "vacancies"
+DEFAULT_PARTITION = f"{TABLE}_default"  # Created along with the table, see db/models.py
+PARTITION_NAME = re.compile(rf"^{TABLE}_(\d{{4}})_(\d{{2}})$")
+ARCHIVE_SUFFIX = ".csv.gz"
+# Partitions restored on demand stay attached until they are archived explicitly
+RESTORED = "restored from the archive"
+# Serializes the maintenance of all workers
+LOCK_KEY = 7_461_001
+
+
+def month_start(moment: datetime) -> datetime:
+    """The first moment of the month, in UTC."""
+    return moment.astimezone(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> datetime | None:
+    """The month of a partition (or of its archive) by the name, None if it is not one."""
+    match = PARTITION_NAME.match(name.removesuffix(ARCHIVE_SUFFIX))
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=UTC)
+
+
+class VacancyRetention:
+    """
+    Maintains the monthly partitions of the vacancies table.
+
+    The partitions of the current and the coming months are created ahead of time.
+    The partitions older than the retention horizon are archived: their rows are copied
+    into a compressed CSV file on disk, then the partition is detached and dropped.
+    An archived month is restored on demand (`python retention.py restore <file>`).
+
+    Listings read the newest partitions first and stop as soon as the page is full,
+    and vacuum and index maintenance deal with the recent partitions only, however
+    long the history grows.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionFactory,
+        *,
+        months_ahead: int = settings.PARTITION_MONTHS_AHEAD,
+        retention_months: int = settings.PARTITION_RETENTION_MONTHS,
+        archive_dir: Path = settings.PARTITION_ARCHIVE_DIR,
+        interval: float = settings.PARTITION_MAINTENANCE_INTERVAL,
+        lock_timeout: float = settings.PARTITION_LOCK_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Creates database sessions.
+            months_ahead (int): The number of coming months with a partition ready.
+            retention_months (int): The number of past months kept in the database,
+                0 keeps them all.
+            archive_dir (Path): Where the archives of the partitions are written.
+            interval (float): Seconds between two maintenance runs.
+            lock_timeout (float): Seconds to wait for the table lock to detach a partition.
+        """
+        self.session_factory = session_factory
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self.lock_timeout = lock_timeout
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception:
+                # Inserts fall back on the default partition meanwhile, nothing is lost
+                logger.exception("Vacancy partition maintenance failed")
+            await asyncio.sleep(self.interval)
+
+    async def maintain(self, now: datetime | None = None) -> list[Path]:
+        """
+        Create the partitions of the current and the coming months, archive the old ones.
+        Returns the written archives.
+
+        Args:
+            now (datetime | None): The current time, the system clock by default.
+        """
+        current = month_start(now or datetime.now(UTC))
+        for months in range(self.months_ahead + 1):
+            if await self.create_partition(add_months(current, months)):
+                logger.info(f"Created the partition {partition_name(add_months(current, months))}")
+
+        if not self.retention_months:
+            return []
+
+        horizon = add_months(current, -self.retention_months)
+        archives = []
+        for month, restored in await self.get_partitions():
+            if month < horizon and not restored:
+                archives.append(await self.archive(month))
+        return archives
+
+    async def get_partitions(self) -> list[tuple[datetime, bool]]:
+        """The months of the attached partitions, oldest first, and whether they were restored."""
+        async with self.session_factory() as db_session:
+            result = await db_session.execute(
+                text(
+                    "SELECT child.relname, obj_description(child.oid, 'pg_class') "
+                    "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+                ),
+                {"table": TABLE},
+            )
+            partitions = [
+                (month, comment == RESTORED)
+                for name, comment in result.tuples()
+                if (month := partition_month(name)) is not None
+            ]
+        return sorted(partitions)
+
+    async def create_partition(self, month: datetime, archive: Path | None = None) -> bool:
+        """
+        Create the partition of a month, unless it exists. Returns whether it was created.
+
+        Rows of the month which fell into the default partition are moved into the new one,
+        otherwise it could not be attached.
+
+        Args:
+            month (datetime): The first moment of the month, in UTC.
+            archive (Path | None): Fill the partition from this archive.
+        """
+        name = partition_name(month)
+        end = add_months(month, 1)
+        async with self.session_factory() as db_session:
+            await self._lock(db_session)
+            exists = await db_session.scalar(
+                text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+            )
+            if exists:
+                return False
+
+            await db_session.execute(
+                text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            )
+            if archive is not None:
+                await self._copy_in(db_session, name, archive)
+                await self._drop_orphans(db_session, name, archive)
+                await db_session.execute(text(f"COMMENT ON TABLE {name} IS '{RESTORED}'"))
+            # The table names are made up here, not taken from the input
+            await db_session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "  # NOQA: S608
+                    f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                {"start": month, "end": end},
+            )
+            # Attaching builds the indexes of the table on the partition
+            await db_session.execute(
+                text(
+                    f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+            await db_session.commit()
+        return True
+
+    async def archive(self, month: datetime) -> Path:
+        """
+        Copy the partition of a month into a compressed CSV file, then drop the partition.
+
+        Writes to the month wait until the partition is gone, so none of them is lost.
+        If anything fails, the partition is kept as it was.
+
+        Args:
+            month (datetime): The first moment of the month, in UTC.
+        """
+        name = partition_name(month)
+        path = self.archive_dir / f"{name}{ARCHIVE_SUFFIX}"
+        partial = path.with_name(f"{path.name}.partial")
+        await asyncio.to_thread(self.archive_dir.mkdir, parents=True, exist_ok=True)
+
+        async with self.session_factory() as db_session:
+            await self._lock(db_session)
+            await db_session.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+            connection = await self._driver_connection(db_session)
+            # asyncpg writes the file (and reads it in `_copy_in`) in a thread
+            with gzip.open(partial, "wb") as file:
+                status = await connection.copy_from_table(
+                    name, output=file, format="csv", header=True
+                )
+            await asyncio.to_thread(partial.replace, path)
+
+            # Detaching locks the whole table, do not hold up the readers for long
+            await db_session.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}s'"))
+            await db_session.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+            await db_session.execute(text(f"DROP TABLE {name}"))
+            await db_session.commit()
+
+        logger.info(f"Archived the partition {name} to {path}, {status.split()[-1]} rows")
+        return path
+
+    async def restore(self, path: Path) -> str:
+        """
+        Attach an archived partition again. It stays until it is archived explicitly.
+        Rows of the channels and posts deleted in the meantime are skipped.
+        Returns the name of the partition.
+
+        Args:
+            path (Path): The archive written by `archive`.
+        """
+        month = partition_month(path.name)
+        if month is None:
+            raise ValueError(f"{path} is not an archive of a partition")
+        if not await self.create_partition(month, archive=path):
+            raise ValueError(f"The partition {partition_name(month)} exists already")
+
+        logger.info(f"Restored the partition {partition_name(month)} from {path}")
+        return partition_name(month)
+
+    async def _copy_in(self, db_session: AsyncSession, name: str, archive: Path) -> None:
+        connection = await self._driver_connection(db_session)
+        with gzip.open(archive, "rb") as file:
+            # The header lists the columns, so archives survive new columns with defaults
+            header = await asyncio.to_thread(file.readline)
+            await connection.copy_to_table(
+                name,
+                source=file,
+                columns=header.decode().strip().split(","),
+                format="csv",
+            )
+
+    @staticmethod
+    async def _drop_orphans(db_session: AsyncSession, name: str, archive: Path) -> None:
+        # Channels and posts deleted since the archiving would fail the foreign keys on attach
+        result = await db_session.execute(
+            text(
+                f"DELETE FROM {name} AS vacancy "  # NOQA: S608
+                f"WHERE NOT EXISTS (SELECT FROM channels WHERE channels.id = vacancy.channel_id) "
+                f"OR NOT EXISTS (SELECT FROM posts WHERE posts.id = vacancy.post_id)"
+            )
+        )
+        if result.rowcount:
+            logger.warning(
+                f"Skipped {result.rowcount} rows of {archive}, their channels or posts are gone"
+            )
+
+    @staticmethod
+    async def _driver_connection(db_session: AsyncSession) -> asyncpg.Connection:
+        connection = await db_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    @staticmethod
+    async def _lock(db_session: AsyncSession) -> None:
+        await db_session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
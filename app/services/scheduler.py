@@ -0,0 +1,163 @@
+import heapq
+import random
+import time
+from collections.abc import Callable, Iterable
+from uuid import UUID
+
+from core.config import settings
+
+
+class ChannelSchedule:
+    __slots__ = ("due_at", "errors", "interval", "polled_at", "rate")
+
+    def __init__(self, due_at: float, interval: float) -> None:
+        self.due_at = due_at
+        self.interval = interval
+        self.polled_at: float | None = None
+        self.rate = 0.0  # Smoothed posting rate, messages per second
+        self.errors = 0
+
+
+class PollingScheduler:
+    """
+    Decides when every channel is polled next.
+
+    Channels are kept in a priority queue keyed by the next due time. After every poll
+    the channel interval is adapted to the observed posting rate: the rate is smoothed
+    with an exponential moving average and the channel is polled about when
+    `messages_per_poll` new posts are expected. Quiet channels therefore back off
+    exponentially (the average halves on every empty poll with the default smoothing),
+    busy ones are re-polled quickly. Failing channels back off exponentially as well.
+    All intervals stay within [min_interval, max_interval].
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_interval: float = settings.INGESTION_POLL_INTERVAL,
+        min_interval: float = settings.SCHEDULER_MIN_INTERVAL,
+        max_interval: float = settings.SCHEDULER_MAX_INTERVAL,
+        messages_per_poll: float = 1.0,
+        smoothing: float = 0.5,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            initial_interval (float): The interval of a channel without history, in seconds.
+            min_interval (float): The shortest interval, in seconds.
+            max_interval (float): The longest interval, in seconds.
+            messages_per_poll (float): The number of new posts a poll should find on average.
+            smoothing (float): The weight of the latest observation in the posting rate average.
+            jitter (float): The relative random spread of intervals, so polls do not bunch up.
+            clock (Callable[[], float]): Returns the current time in seconds.
+        """
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.messages_per_poll = messages_per_poll
+        self.smoothing = smoothing
+        self.jitter = jitter
+        self.clock = clock
+        self._heap: list[tuple[float, UUID]] = []
+        self._schedules: dict[UUID, ChannelSchedule] = {}
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, channel_id: UUID) -> bool:
+        return channel_id in self._schedules
+
+    def add(self, channel_id: UUID) -> None:
+        """Schedule a channel. New channels are due right away, spread over the jitter window."""
+        if channel_id in self._schedules:
+            return
+        due_at = self.clock() + self.initial_interval * self.jitter * random.random()  # NOQA: S311
+        self._schedules[channel_id] = ChannelSchedule(due_at, self.initial_interval)
+        heapq.heappush(self._heap, (due_at, channel_id))
+
+    def drop(self, channel_id: UUID) -> None:
+        """Stop polling a channel. Its queue entry is discarded lazily when it comes up."""
+        self._schedules.pop(channel_id, None)
+
+    def sync(self, channel_ids: Iterable[UUID]) -> None:
+        """Make the schedule contain exactly the given channels."""
+        channel_ids = set(channel_ids)
+        for channel_id in self._schedules.keys() - channel_ids:
+            self.drop(channel_id)
+        for channel_id in channel_ids:
+            self.add(channel_id)
+
+    def pop_due(self, limit: int | None = None) -> list[UUID]:
+        """
+        Take the channels which are due, most overdue first.
+        A taken channel is not due again until its poll is recorded with `record`.
+        """
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now and (limit is None or len(due) < limit):
+            due_at, channel_id = heapq.heappop(self._heap)
+            schedule = self._schedules.get(channel_id)
+            if schedule is None or schedule.due_at != due_at:
+                continue  # Dropped or rescheduled in the meantime
+            schedule.due_at = float("inf")
+            due.append(channel_id)
+        return due
+
+    def next_due_in(self) -> float | None:
+        """Seconds until the next channel is due, None if nothing is scheduled."""
+        while self._heap:
+            due_at, channel_id = self._heap[0]
+            schedule = self._schedules.get(channel_id)
+            if schedule is not None and schedule.due_at == due_at:
+                return max(0.0, due_at - self.clock())
+            heapq.heappop(self._heap)
+        return None
+
+    def record(
+        self,
+        channel_id: UUID,
+        new_messages: int,
+        *,
+        failed: bool = False,
+        behind: bool = False,
+    ) -> None:
+        """
+        Reschedule a polled channel.
+
+        Args:
+            channel_id (UUID): The polled channel.
+            new_messages (int): The number of new posts the poll found.
+            failed (bool): Whether the poll failed.
+            behind (bool): Whether the poll stopped before reaching the newest post,
+                e.g. during a backfill. Such a channel is polled again after `min_interval`.
+        """
+        schedule = self._schedules.get(channel_id)
+        if schedule is None:
+            return  # Dropped while being polled
+
+        now = self.clock()
+        if failed:
+            schedule.errors += 1
+            interval = self.initial_interval * 2 ** schedule.errors
+        elif behind:
+            schedule.errors = 0
+            interval = self.min_interval
+        else:
+            schedule.errors = 0
+            if schedule.polled_at is None:
+                # The first poll catches up on history and tells nothing about the posting rate
+                interval = schedule.interval
+            else:
+                observed = new_messages / max(now - schedule.polled_at, 1e-3)
+                schedule.rate += self.smoothing * (observed - schedule.rate)
+                if schedule.rate > 0:
+                    interval = self.messages_per_poll / schedule.rate
+                else:
+                    interval = schedule.interval * 2
+            schedule.polled_at = now
+
+        schedule.interval = min(self.max_interval, max(self.min_interval, interval))
+        spread = 1 + self.jitter * (2 * random.random() - 1)  # NOQA: S311
+        schedule.due_at = now + schedule.interval * spread
+        heapq.heappush(self._heap, (schedule.due_at, channel_id))
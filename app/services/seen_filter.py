@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import math
+from collections.abc import Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.post import post_crud, PostKey
+from schemas.post import PostCreate
+from schemas.telegram import SeenFilterStats
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    A Bloom filter over strings: a fixed-size bit array with no false negatives
+    and a false positive rate of about `error_rate` while it holds at most `capacity` keys.
+    """
+
+    def __init__(self, memory_bytes: int, error_rate: float) -> None:
+        """
+        Args:
+            memory_bytes (int): The size of the bit array.
+            error_rate (float): The false positive rate at full capacity.
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("The error rate must be between 0 and 1")
+
+        self.size = memory_bytes * 8
+        self.hashes = max(1, round(-math.log2(error_rate)))
+        self.capacity = int(self.size * math.log(2) ** 2 / -math.log(error_rate))
+        self.count = 0
+        self._bits = bytearray(memory_bytes)
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key)
+        )
+
+    def _positions(self, key: str) -> list[int]:
+        # Double hashing: k positions derived from two halves of a single digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+
+def post_key(post: PostCreate) -> PostKey:
+    return post.source_id, post.message_id
+
+
+class SeenMessages:
+    """
+    Remembers the stored posts, so already seen messages skip the upsert.
+
+    Re-polling a source mostly returns messages the listener has already stored, and
+    sending them to the database only to hit the unique constraint wastes the bandwidth
+    and the locks of the upsert. The filter answers "surely new" or "probably stored":
+    new posts go to the upsert right away, probable ones are checked with a single
+    lookup by key, so a false positive costs a query but never loses a message.
+
+    The filter is filled lazily with the latest posts of every source on its first batch
+    and with every stored batch. Once it holds `capacity` keys, its error rate would grow,
+    so it starts over empty and the sources are loaded again as they come.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_mb: int = settings.SEEN_FILTER_MEMORY_MB,
+        error_rate: float = settings.SEEN_FILTER_ERROR_RATE,
+        preload: int = settings.SEEN_FILTER_PRELOAD,
+    ) -> None:
+        """
+        Args:
+            memory_mb (int): The memory budget of the filter.
+            error_rate (float): The false positive rate at full capacity.
+            preload (int): The number of latest posts per source loaded into the filter.
+        """
+        self.memory_mb = memory_mb
+        self.error_rate = error_rate
+        self.preload = preload
+        self.stats = SeenFilterStats()
+        self._filter = BloomFilter(memory_mb * 1024 * 1024, error_rate)
+        self._loaded: set[UUID] = set()
+
+    async def filter_new(
+        self, db_session: AsyncSession, posts: Sequence[PostCreate]
+    ) -> list[PostCreate]:
+        """
+        Returns the posts which are not stored yet, as far as the database knows.
+
+        Args:
+            db_session (AsyncSession): The database session.
+            posts (Sequence[PostCreate]): The posts to check.
+        """
+        await self._load(db_session, {post.source_id for post in posts})
+
+        new: list[PostCreate] = []
+        probably_stored: list[PostCreate] = []
+        for post in posts:
+            if self._key(post_key(post)) in self._filter:
+                probably_stored.append(post)
+            else:
+                new.append(post)
+        self.stats.checked += len(posts)
+
+        if probably_stored:
+            stored = await post_crud.get_stored_keys(
+                db_session, keys=[post_key(post) for post in probably_stored]
+            )
+            false_positives = [post for post in probably_stored if post_key(post) not in stored]
+            self.stats.hits += len(probably_stored) - len(false_positives)
+            self.stats.false_positives += len(false_positives)
+            new.extend(false_positives)
+
+        return new
+
+    def add(self, keys: Sequence[PostKey]) -> None:
+        """Remember the stored posts."""
+        if self._filter.count + len(keys) > self._filter.capacity:
+            logger.info(f"Seen messages filter is full, starting over, {self.stats}")
+            self._filter = BloomFilter(self.memory_mb * 1024 * 1024, self.error_rate)
+            self._loaded.clear()
+            self.stats.resets += 1
+
+        for key in keys:
+            self._filter.add(self._key(key))
+
+    async def _load(self, db_session: AsyncSession, source_ids: set[UUID]) -> None:
+        missing = source_ids - self._loaded
+        if not missing:
+            return
+
+        keys = await post_crud.get_latest_keys(
+            db_session, source_ids=list(missing), per_source=self.preload
+        )
+        self.add(keys)
+        self._loaded |= missing
+        self.stats.loaded_sources += len(missing)
+
+    @staticmethod
+    def _key(key: PostKey) -> str:
+        source_id, message_id = key
+        return f"{source_id}:{message_id}"
@@ -1,6 +1,305 @@
-# from telethon import TelegramClient
-# from telethon.sessions import SQLiteSession
+import asyncio
+import logging
+import re
+from collections.abc import AsyncIterator, Callable, Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.channel import channel_crud
+from crud.post import post_crud
+from crud.source import source_crud
+from crud.vacancy import vacancy_crud
+from db.connect import AsyncSessionFactory
+from db.models import ChannelORM
+from schemas.post import PostBulkResult, PostCreate
+from schemas.telegram import IngestionStats, TelegramMessage
+from services.message_source import BaseMessageSource
+from services.scheduler import PollingScheduler
+from services.seen_filter import post_key, SeenMessages
+
+logger = logging.getLogger(__name__)
+
+# An e-mail, a t.me link or a @username, whichever comes first in the message
+CONTACT_RE = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.-]+|(?:https?://)?t\.me/[\w+/]+|@[A-Za-z]\w{3,31}\b"
+)
+
+
+def extract_contact(text: str) -> str | None:
+    match = CONTACT_RE.search(text)
+    return match.group() if match else None
+
+
+def message_to_post(channel: ChannelORM, message: TelegramMessage) -> PostCreate:
+    return PostCreate(
+        message_id=str(message.id),
+        content=message.text,
+        contact=extract_contact(message.text),
+        source_id=channel.source_id,
+    )
+
+
+async def store_posts(
+    db_session: AsyncSession,
+    posts: Sequence[PostCreate],
+    seen: SeenMessages | None = None,
+) -> tuple[PostBulkResult, int]:
+    """
+    Store the posts and deliver the new ones to the subscribers of their sources.
+    Returns the result of the insert and the number of delivered vacancies. The caller commits.
+
+    With `seen` given, already stored posts are skipped before the upsert.
+    """
+    new_posts = await seen.filter_new(db_session, posts) if seen is not None else posts
+    result = await post_crud.bulk_upsert(db_session, objs_in=new_posts)
+    result.skipped += len(posts) - len(new_posts)
+    if seen is not None:
+        # Remembered before the commit: if it fails, the lookup of the probable ones catches it
+        seen.add([post_key(post) for post in new_posts])
+
+    delivered = 0
+    if result.ids:
+        delivered = await vacancy_crud.fan_out(db_session, post_ids=result.ids)
+    return result, delivered
+
+
+async def iter_fetch_channel_pages(
+    session_factory: Callable[[], AsyncSession],
+    chunk_size: int = settings.INGESTION_CHANNELS_CHUNK,
+) -> AsyncIterator[Sequence[ChannelORM]]:
+    """
+    Iterate over all active sources page by page, as one subscription per source
+    with its owner and source loaded. Every page is loaded in its own short session,
+    so no connection is held between pages.
+    """
+    after_source_id = None
+    while True:
+        async with session_factory() as db_session:
+            channels = await channel_crud.get_fetch_channels(
+                db_session, after_source_id=after_source_id, limit=chunk_size
+            )
+        if not channels:
+            return
+        yield channels
+        after_source_id = channels[-1].source_id
 
 
 class TelegramService:
-    pass
+    """
+    The ingestion engine.
+
+    Polls every active source when the scheduler makes it due, streams the channel messages
+    newer than the source cursor from a message source, writes them as posts in batches
+    and delivers the new posts to all subscribers. A channel followed by many users
+    is fetched and stored once. At any moment at most `concurrency` sources with one
+    message stream and one batch each are kept in memory.
+    """
+
+    def __init__(
+        self,
+        source: BaseMessageSource,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionFactory,
+        *,
+        batch_size: int = settings.INGESTION_BATCH_SIZE,
+        concurrency: int = settings.INGESTION_CONCURRENCY,
+        channels_chunk: int = settings.INGESTION_CHANNELS_CHUNK,
+        backfill_chunk: int = settings.INGESTION_BACKFILL_CHUNK,
+        scheduler: PollingScheduler | None = None,
+        sync_interval: float = settings.SCHEDULER_SYNC_INTERVAL,
+        seen: SeenMessages | None = None,
+    ) -> None:
+        """
+        Args:
+            source (BaseMessageSource): Where the channel messages come from.
+            session_factory (Callable[[], AsyncSession]): Creates database sessions.
+            batch_size (int): The number of posts written per transaction.
+            concurrency (int): The number of sources fetched in parallel.
+            channels_chunk (int): The number of sources loaded from the database at once.
+            backfill_chunk (int): The maximum number of messages fetched per source per cycle.
+            scheduler (PollingScheduler | None): Decides when every source is polled.
+            sync_interval (float): Seconds between two reloads of the active sources.
+            seen (SeenMessages | None): Keeps already stored messages away from the upserts,
+                share it with the listener of the process.
+        """
+        self.source = source
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.channels_chunk = channels_chunk
+        self.backfill_chunk = backfill_chunk
+        self.scheduler = scheduler if scheduler is not None else PollingScheduler()
+        self.sync_interval = sync_interval
+        self.seen = seen or SeenMessages()
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_forever(self) -> None:
+        """
+        Poll sources whenever the scheduler makes them due, until cancelled.
+
+        The schedule is synced with the active sources every `sync_interval` seconds.
+        Sources which lost their subscribers in between are dropped as soon as they come up.
+        """
+        loop = asyncio.get_running_loop()
+        running: set[asyncio.Task] = set()
+        stats = IngestionStats()
+        synced_at = None
+        try:
+            while True:
+                if synced_at is None or loop.time() - synced_at >= self.sync_interval:
+                    try:
+                        await self.sync_schedule()
+                    except Exception:
+                        # The known sources are polled meanwhile, the sync is retried later on
+                        logger.exception("Failed to sync the polling schedule")
+                    synced_at = loop.time()
+                    logger.info(
+                        f"Ingestion: {len(self.scheduler)} sources scheduled, {stats}, "
+                        f"dedup rate {stats.dedup_rate:.1%}, "
+                        f"seen filter hit rate {self.seen.stats.hit_rate:.1%}"
+                    )
+                    stats = IngestionStats()
+
+                free_slots = self.concurrency - len(running)
+                due_ids = self.scheduler.pop_due(limit=free_slots) if free_slots > 0 else []
+                if due_ids:
+                    for channel in await self._load_due_channels(due_ids):
+                        running.add(asyncio.create_task(self._poll_channel(channel, stats)))
+                    continue
+
+                timeout = self.sync_interval - (loop.time() - synced_at)
+                next_due_in = self.scheduler.next_due_in()
+                if next_due_in is not None and free_slots > 0:
+                    timeout = min(timeout, next_due_in)
+
+                if running:
+                    _, running = await asyncio.wait(
+                        running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    await asyncio.sleep(timeout)
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            await self.source.close()
+
+    async def sync_schedule(self) -> None:
+        """Make the schedule contain exactly the active sources."""
+        async with self.session_factory() as db_session:
+            source_ids = await source_crud.get_active_source_ids(db_session)
+        self.scheduler.sync(source_ids)
+
+    async def run_once(self) -> IngestionStats:
+        """Fetch new messages of all active sources once, regardless of the schedule."""
+        stats = IngestionStats()
+        async for channels in iter_fetch_channel_pages(self.session_factory, self.channels_chunk):
+            async with asyncio.TaskGroup() as tg:
+                for channel in channels:
+                    tg.create_task(self._ingest_guarded(channel, stats))
+        return stats
+
+    async def ingest_channel(self, channel: ChannelORM, stats: IngestionStats) -> int:
+        """
+        Stream the messages newer than the source cursor and store them as posts.
+
+        At most `backfill_chunk` messages are fetched per call, so a new source with
+        a huge history is backfilled over several cycles, resuming from the last checkpoint.
+
+        Args:
+            channel (ChannelORM): The subscription the source is fetched through.
+                Its `user` and `source` must be loaded.
+            stats (IngestionStats): The statistics of the current cycle.
+
+        Returns:
+            int: The number of fetched messages.
+        """
+        messages = self.source.iter_messages(
+            channel,
+            min_id=channel.source.last_message_id or 0,
+            limit=self.backfill_chunk,
+        )
+
+        fetched = 0
+        batch: list[TelegramMessage] = []
+        async for message in messages:
+            fetched += 1
+            stats.fetched += 1
+            batch.append(message)
+            if len(batch) >= self.batch_size:
+                await self._write_batch(channel, batch, stats)
+                batch = []
+
+        if batch:
+            await self._write_batch(channel, batch, stats)
+
+        return fetched
+
+    async def _ingest_guarded(self, channel: ChannelORM, stats: IngestionStats) -> int | None:
+        """Returns the number of fetched messages, None if the channel failed."""
+        async with self._semaphore:
+            stats.channels += 1
+            try:
+                return await self.ingest_channel(channel, stats)
+            except Exception:
+                # A broken channel must not stop the whole cycle
+                stats.failed_channels += 1
+                logger.exception(f"Failed to ingest {channel}")
+                return None
+
+    async def _load_due_channels(self, source_ids: list[UUID]) -> Sequence[ChannelORM]:
+        try:
+            async with self.session_factory() as db_session:
+                channels = await channel_crud.get_fetch_channels(
+                    db_session, source_ids=source_ids, limit=len(source_ids)
+                )
+        except Exception:
+            logger.exception(f"Failed to load {len(source_ids)} due sources")
+            # Taken off the schedule by `pop_due`, they are put back with a backoff
+            for source_id in source_ids:
+                self.scheduler.record(source_id, 0, failed=True)
+            return []
+
+        # Sources which lost their subscribers since the last sync are dropped right away
+        for source_id in set(source_ids) - {channel.source_id for channel in channels}:
+            self.scheduler.drop(source_id)
+
+        return channels
+
+    async def _poll_channel(self, channel: ChannelORM, stats: IngestionStats) -> None:
+        fetched = await self._ingest_guarded(channel, stats)
+        if fetched is None:
+            self.scheduler.record(channel.source_id, 0, failed=True)
+        else:
+            self.scheduler.record(
+                channel.source_id, fetched, behind=fetched >= self.backfill_chunk
+            )
+
+    async def _write_batch(
+        self,
+        channel: ChannelORM,
+        messages: list[TelegramMessage],
+        stats: IngestionStats,
+    ) -> None:
+        """
+        Store the messages as posts, deliver them to the subscribers and move the source
+        cursor to the last of them in one transaction, so a crash can only make the engine
+        fetch this batch again.
+        """
+        posts = [message_to_post(channel, message) for message in messages]
+        last_message = messages[-1]  # Messages come in ascending order
+
+        async with self.session_factory() as db_session:
+            result, delivered = await store_posts(db_session, posts, self.seen)
+            await source_crud.advance_cursor(
+                db_session,
+                source_id=channel.source_id,
+                message_id=last_message.id,
+                message_at=last_message.date,
+            )
+            await db_session.commit()
+
+        stats.stored += result.inserted
+        stats.skipped += result.skipped
+        stats.delivered += delivered
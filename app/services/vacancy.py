@@ -1,11 +1,22 @@
 from uuid import UUID
 
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.exceptions import AccessForbiddenException
 from crud.vacancy import vacancy_crud
 from db.models import UserORM
-from schemas.vacancy import VacancyResponse, VacancyCreate, VacancyUpdate
+from schemas.fields import Fields, serializer
+from schemas.vacancy import (
+    VacancyBulkUpdate,
+    VacancyCreate,
+    VacancyFilter,
+    VacancyResponse,
+    VacancySearchResult,
+    VacancySummary,
+    VacancyUpdate,
+)
 
 
 class VacancyService:
@@ -14,9 +25,21 @@ class VacancyService:
         cls,
         db_session: AsyncSession,
         user: UserORM,
-    ) -> list[VacancyResponse]:
-        vacancies = await vacancy_crud.get_user_vacancies(db_session, user_id=user.id)
-        return [VacancyResponse.model_validate(vacancy) for vacancy in vacancies]
+        filters: VacancyFilter | None = None,
+        fields: Fields | None = None,
+        cursor: str | None = None,
+        limit: int = settings.PAGE_SIZE,
+    ) -> tuple[list[BaseModel], str | None]:
+        vacancies, next_cursor = await vacancy_crud.get_user_vacancies(
+            db_session,
+            user_id=user.id,
+            filters=filters,
+            fields=fields,
+            cursor=cursor,
+            limit=limit,
+        )
+        schema = serializer(VacancySummary, fields)
+        return [schema.model_validate(vacancy) for vacancy in vacancies], next_cursor
 
     @classmethod
     async def get_channel_vacancies(
@@ -24,23 +47,66 @@ class VacancyService:
         db_session: AsyncSession,
         user: UserORM,
         channel_id: UUID,
-    ) -> list[VacancyResponse]:
-        vacancies = await vacancy_crud.get_channel_vacancies(
+        filters: VacancyFilter | None = None,
+        fields: Fields | None = None,
+        cursor: str | None = None,
+        limit: int = settings.PAGE_SIZE,
+    ) -> tuple[list[BaseModel], str | None]:
+        vacancies, next_cursor = await vacancy_crud.get_channel_vacancies(
             db_session,
             user=user,
             channel_id=channel_id,
+            filters=filters,
+            fields=fields,
+            cursor=cursor,
+            limit=limit,
         )
-        return [VacancyResponse.model_validate(vacancy) for vacancy in vacancies]
+        schema = serializer(VacancySummary, fields)
+        return [schema.model_validate(vacancy) for vacancy in vacancies], next_cursor
+
+    @classmethod
+    async def search(
+        cls,
+        db_session: AsyncSession,
+        user: UserORM,
+        query: str,
+        fuzzy: bool = False,
+        cursor: str | None = None,
+        limit: int = settings.PAGE_SIZE,
+    ) -> tuple[list[VacancySearchResult], str | None]:
+        rows, next_cursor = await vacancy_crud.search(
+            db_session, user_id=user.id, query=query, fuzzy=fuzzy, cursor=cursor, limit=limit
+        )
+        results = [
+            VacancySearchResult(
+                **VacancySummary.model_validate(vacancy).model_dump(exclude={"snippet"}),
+                rank=rank,
+                snippet=snippet,
+            )
+            for vacancy, rank, snippet in rows
+        ]
+        return results, next_cursor
 
     @classmethod
     async def get_by_id(
         cls,
         db_session: AsyncSession,
-        user: UserORM,  # NOQA: ARG003
+        user: UserORM,
         vacancy_id: UUID,
-    ) -> VacancyResponse:
-        vacancy = await vacancy_crud.get_or_404(db_session, obj_id=vacancy_id)
-        return VacancyResponse.model_validate(vacancy)
+        fields: Fields | None = None,
+    ) -> BaseModel:
+        vacancy = await vacancy_crud.get_or_404(
+            db_session,
+            obj_id=vacancy_id,
+            # The channel is needed for the permission check, even if it is not returned
+            fields=None if fields is None else {"channel_id", *fields},
+        )
+
+        # Check permission to access the vacancy
+        if vacancy.channel_id not in user.channel_ids:
+            raise AccessForbiddenException
+
+        return serializer(VacancyResponse, fields).model_validate(vacancy)
 
     @classmethod
     async def create(
@@ -52,7 +118,7 @@ class VacancyService:
     ) -> VacancyResponse:
         # Check permission to access the channel
         channel_id = channel_id or vacancy_data.channel_id
-        if channel_id not in [channel.id for channel in user.channels]:
+        if channel_id not in user.channel_ids:
             raise AccessForbiddenException
 
         new_vacancy = await vacancy_crud.create(db_session, obj_in=vacancy_data)
@@ -67,15 +133,30 @@ class VacancyService:
         vacancy_id: UUID,
         vacancy_data: VacancyUpdate,
     ) -> VacancyResponse:
-        vacancy = await vacancy_crud.get_or_404(db_session, obj_id=vacancy_id)
-
-        # Check permission to access the vacancy
-        if vacancy.channel.user_id != user.id:
-            raise AccessForbiddenException
-
-        updated_vacancy = await vacancy_crud.update(db_session, db_obj=vacancy, obj_in=vacancy_data)
+        # Raises ResourceNotFoundException, or AccessForbiddenException for other users
+        updated_vacancy = await vacancy_crud.update_owned_state(
+            db_session, obj_id=vacancy_id, user_id=user.id, state=vacancy_data
+        )
         return VacancyResponse.model_validate(updated_vacancy)
 
+    @classmethod
+    async def update_user_vacancies(
+        cls,
+        db_session: AsyncSession,
+        *,
+        user: UserORM,
+        bulk_data: VacancyBulkUpdate,
+    ) -> list[UUID]:
+        # Ownership is a condition of the update, the vacancies of other users are skipped
+        updated_ids = await vacancy_crud.bulk_update_state(
+            db_session,
+            user_id=user.id,
+            state=bulk_data.state,
+            ids=bulk_data.ids,
+            filters=bulk_data.filters,
+        )
+        return list(updated_ids)
+
     @classmethod
     async def delete_user_vacancy(
         cls,
@@ -83,11 +164,5 @@ class VacancyService:
         user: UserORM,
         vacancy_id: UUID,
     ) -> UUID:
-        vacancy = await vacancy_crud.get_or_404(db_session, obj_id=vacancy_id)
-
-        # Check permission to access the vacancy
-        if vacancy.channel.user_id != user.id:
-            raise AccessForbiddenException
-
-        await vacancy_crud.remove(db_session, obj_id=vacancy_id)
-        return vacancy_id
+        # Raises ResourceNotFoundException, or AccessForbiddenException for other users
+        return await vacancy_crud.remove_owned(db_session, obj_id=vacancy_id, user_id=user.id)
@@ -0,0 +1,108 @@
+import logging
+import os
+import socket
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.source import source_crud
+from db.connect import AsyncSessionFactory
+from services.message_source import BaseMessageSource
+from services.telegram import TelegramService
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class IngestionWorker(TelegramService):
+    """
+    A horizontally scalable ingestion engine: polls only the sources it holds a lease on,
+    so any number of workers on any number of nodes never fetch a source twice.
+
+    On every heartbeat the worker renews its leases and claims more sources up to
+    `max_sources`, the sources of dead workers among them once their leases have expired.
+    On shutdown the leases are released, so other workers take the sources over at once.
+
+    If a stalled worker misses its heartbeats, its sources may be taken over while a poll
+    is still in flight. The two polls then overlap once, which is harmless: writes are
+    idempotent and source cursors never move backwards.
+    """
+
+    def __init__(
+        self,
+        source: BaseMessageSource,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionFactory,
+        *,
+        worker_id: str | None = settings.WORKER_ID,
+        lease_ttl: float = settings.WORKER_LEASE_TTL,
+        heartbeat_interval: float = settings.WORKER_HEARTBEAT_INTERVAL,
+        max_sources: int = settings.WORKER_MAX_SOURCES,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            source (BaseMessageSource): Where the channel messages come from.
+            session_factory (Callable[[], AsyncSession]): Creates database sessions.
+            worker_id (str | None): Identifies the worker in the leases, unique per process.
+            lease_ttl (float): Seconds a lease is valid without a heartbeat.
+            heartbeat_interval (float): Seconds between two lease renewals,
+                must be well below `lease_ttl`.
+            max_sources (int): The maximum number of sources leased by the worker.
+            **kwargs: Passed to TelegramService.
+        """
+        if heartbeat_interval >= lease_ttl:
+            raise ValueError("The heartbeat interval must be shorter than the lease TTL")
+
+        super().__init__(source, session_factory, sync_interval=heartbeat_interval, **kwargs)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_ttl = lease_ttl
+        self.max_sources = max_sources
+
+    async def run_forever(self) -> None:
+        logger.info(f"Ingestion worker {self.worker_id} started")
+        try:
+            await super().run_forever()
+        finally:
+            try:
+                await self.release()
+            except Exception:
+                # The leases expire on their own, the original error must not be masked
+                logger.exception(f"Worker {self.worker_id} failed to release its leases")
+            logger.info(f"Ingestion worker {self.worker_id} stopped")
+
+    async def sync_schedule(self) -> None:
+        """Renew the leases, claim free sources and schedule exactly the leased ones."""
+        try:
+            async with self.session_factory() as db_session:
+                leased = list(
+                    await source_crud.renew_leases(
+                        db_session, worker_id=self.worker_id, ttl=self.lease_ttl
+                    )
+                )
+                if len(leased) < self.max_sources:
+                    claimed = await source_crud.claim_sources(
+                        db_session,
+                        worker_id=self.worker_id,
+                        ttl=self.lease_ttl,
+                        limit=self.max_sources - len(leased),
+                    )
+                    leased.extend(claimed)
+                    if claimed:
+                        logger.info(f"Worker {self.worker_id} claimed {len(claimed)} sources")
+                await db_session.commit()
+        except Exception:
+            # Keep polling the known sources, the overlap is harmless if the leases run out
+            logger.exception(f"Worker {self.worker_id} failed to renew its leases")
+            return
+
+        self.scheduler.sync(leased)
+
+    async def release(self) -> None:
+        """Give up all leases of the worker."""
+        async with self.session_factory() as db_session:
+            await source_crud.release_leases(db_session, worker_id=self.worker_id)
+            await db_session.commit()
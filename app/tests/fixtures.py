@@ -21,7 +21,7 @@ from crud.channel import channel_crud
 from crud.user import user_crud
 from crud.vacancy import vacancy_crud
 from db import Base
-from db.connect import get_session
+from db.connect import get_session, unit_of_work
 from main import app
 from schemas.channel import ChannelResponse, ChannelCreate
 from schemas.user import UserResponse, UserCreate
@@ -91,18 +91,11 @@ async def session(
     transactions and keeping the database clean.
     This setup ensures consistent and clean database state for testing purposes.
     """
-    # TODO: I think we should use here the async session maker, like in the `get_session` function
-    # async_session_maker = async_sessionmaker(
-    #     bind=connection,
-    #     class_=AsyncSession,
-    #     expire_on_commit=False,
-    #     autocommit=False,
-    #     autoflush=False,
-    # )
-
+    # Not expiring on commit, as the sessions of `get_session`: the CRUD relies on it
     async_session = AsyncSession(
         bind=connection,
         join_transaction_mode="create_savepoint",  # it will make connection.begin_nested()
+        expire_on_commit=False,
     )
     # We aren't using context manager `async with async_session` here because we want
     # to roll back the transaction and close the session after the test
@@ -125,12 +118,16 @@ async def client(
     and once the test ends, the overall transaction will be rolled back, rolling back all nested
     transactions and keeping the database clean.
     """
-    async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
-        async_session = AsyncSession(
+    def create_session() -> AsyncSession:
+        return AsyncSession(
             bind=connection,
             join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
         )
-        async with async_session:  # Close the session after the test
+
+    async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
+        # A unit of work per request, as `get_session`, committing to a savepoint
+        async with unit_of_work(create_session) as async_session:
             yield async_session
 
     # Override the get_async_session dependency of the `app` with the test session
@@ -143,6 +140,25 @@ async def client(
     app.dependency_overrides.pop(get_session, None)
 
 
+@pytest_asyncio.fixture()
+async def session_factory(
+    connection: AsyncConnection,
+    transaction: AsyncTransaction,  # NOQA: ARG001
+) -> Callable[[], AsyncSession]:
+    """
+    This is a factory for sessions bound to the test transaction, for code that opens
+    its own sessions (e.g. the ingestion engine) instead of receiving one.
+    """
+    def create_session() -> AsyncSession:
+        return AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+
+    return create_session
+
+
 @pytest.fixture(scope="session")
 def fake() -> Faker:
     fake = Faker()
@@ -196,7 +212,11 @@ async def channel_factory(
     user_factory: Callable,
     fake: Faker,
 ) -> Callable:
-    async def create_channel(user: UserResponse | None = None) -> ChannelResponse | dict | None:
+    async def create_channel(
+        user: UserResponse | None = None,
+        is_active: bool = True,
+        telegram_id: str | None = None,
+    ) -> ChannelResponse | dict | None:
         """
         This fixture is used to create a channel in the database.
         """
@@ -207,7 +227,8 @@ async def channel_factory(
             obj_in=ChannelCreate(
                 title=fake.sentence(),
                 description=fake.text(),
-                telegram_id=str(uuid.uuid4()),
+                telegram_id=telegram_id or str(uuid.uuid4()),
+                is_active=is_active,
                 user_id=user['id'],
             ),
         )
@@ -226,7 +247,8 @@ async def vacancy_factory(
 ) -> Callable:
     async def create_vacancy(
         user: UserResponse | None = None,
-        channel: ChannelResponse | None = None
+        channel: ChannelResponse | None = None,
+        content: str | None = None,
     ) -> dict:
         """
         This fixture is used to create a vacancy in the database.
@@ -237,7 +259,7 @@ async def vacancy_factory(
             session,
             obj_in=VacancyCreate(
                 message_id=str(uuid.uuid4()),
-                content=fake.text(),
+                content=content or fake.text(),
                 contact=fake.email(),
                 channel_id=channel['id'],
             ),
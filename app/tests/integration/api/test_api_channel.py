@@ -58,6 +58,31 @@ async def test_get_user_channels(
     assert len(res_data["data"]) == 2
     assert res_data["data"][0]["user_id"] == str(user["id"])
     assert res_data["data"][1]["user_id"] == str(user["id"])
+    assert res_data["next_cursor"] is None
+
+
+async def test_sparse_channel_fields(
+    client: Callable,
+    user_factory: Callable,
+    channel_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+
+    async with await client(email, password) as auth_cl:
+        response = await auth_cl.get(TEST_PATH, params={"fields": "id,is_active"})
+        assert response.status_code == 200, response.text
+        assert response.json()["data"] == [{"is_active": True, "id": str(channel["id"])}]
+
+        response = await auth_cl.get(f"{TEST_PATH}/{channel['id']}", params={"fields": "title"})
+        assert response.status_code == 200, response.text
+        assert response.json()["data"] == {"title": channel["title"]}
+
+        response = await auth_cl.get(TEST_PATH, params={"fields": ","})
+        assert response.status_code == 400, response.text
 
 
 async def test_create_channel(
@@ -147,6 +172,104 @@ async def test_delete_channel(
     assert len(channels) == 0, "Channel not deleted from the database"
 
 
+async def test_delete_channel_in_background(
+    client: Callable,
+    session: AsyncSession,
+    user_factory: Callable,
+    channel_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+
+    async with await client(email, password) as auth_cl:
+        response = await auth_cl.delete(f"{TEST_PATH}/{channel['id']}?background=true")
+        assert response.status_code == 200, response.text
+        assert response.json()["status_code"] == 202
+
+        # Hidden right away
+        response = await auth_cl.get(f"{TEST_PATH}/{channel['id']}")
+        assert response.status_code == 404, response.text
+        response = await auth_cl.get(TEST_PATH)
+        assert response.json()["data"] == []
+        response = await auth_cl.delete(f"{TEST_PATH}/{channel['id']}?background=true")
+        assert response.status_code == 404, response.text
+
+    # Left for the purge, no longer fetched
+    db_channel = await session.get(ChannelORM, channel["id"])
+    assert db_channel.deleted_at is not None
+    assert not db_channel.is_active
+
+
+async def test_resubscribe_to_channel_deleted_in_background(
+    client: Callable,
+    session: AsyncSession,
+    user_factory: Callable,
+    channel_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+    channel_data = ChannelCreate(
+        title=channel["title"],
+        description=None,
+        telegram_id=channel["telegram_id"],
+        user_id=user["id"],
+    ).model_dump_json()
+
+    async with await client(email, password) as auth_cl:
+        response = await auth_cl.delete(f"{TEST_PATH}/{channel['id']}?background=true")
+        assert response.status_code == 200, response.text
+
+        # Before the old channel is purged
+        response = await auth_cl.post(TEST_PATH, content=channel_data)
+        assert response.status_code == 200, response.text
+        assert response.json()["status_code"] == 201
+        new_id = response.json()["data"]["id"]
+
+        response = await auth_cl.get(TEST_PATH)
+        assert [item["id"] for item in response.json()["data"]] == [new_id]
+
+    channels = await session.scalars(
+        select(ChannelORM).where(ChannelORM.telegram_id == channel["telegram_id"])
+    )
+    assert len(channels.all()) == 2
+
+
+async def test_update_and_delete_non_user_channel(
+    client: Callable,
+    session: AsyncSession,
+    user_factory: Callable,
+    channel_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    await user_factory(email=email, password=password)
+    channel = await channel_factory()
+    channel_update = ChannelUpdate(title="Updated Channel", description=None).model_dump_json()
+
+    async with await client(email, password) as auth_cl:
+        response = await auth_cl.put(f"{TEST_PATH}/{channel['id']}", content=channel_update)
+        assert response.status_code == 403, response.text
+        response = await auth_cl.delete(f"{TEST_PATH}/{channel['id']}")
+        assert response.status_code == 403, response.text
+
+        response = await auth_cl.put(f"{TEST_PATH}/{fake.uuid4()}", content=channel_update)
+        assert response.status_code == 404, response.text
+        response = await auth_cl.delete(f"{TEST_PATH}/{fake.uuid4()}")
+        assert response.status_code == 404, response.text
+
+    title = await session.scalar(select(ChannelORM.title).where(ChannelORM.id == channel["id"]))
+    assert title == channel["title"]
+
+
 async def test_get_non_user_channel(
     client: Callable,
     user_factory: Callable,
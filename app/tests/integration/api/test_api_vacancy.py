@@ -1,12 +1,15 @@
 from collections.abc import Callable
+from uuid import UUID
 
 import pytest
 from faker import Faker
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from core.text import make_title
 from db import VacancyORM
+from db.models import VacancyState
 from schemas.vacancy import VacancyCreate, VacancyUpdate
 
 pytestmark = pytest.mark.asyncio(loop_scope="session")
@@ -26,8 +29,7 @@ async def test_get_user_vacancies(
 
     user = await user_factory(email=email, password=password)
     channel = await channel_factory(user=user)
-    await vacancy_factory(user=user, channel=channel)
-    await vacancy_factory(user=user, channel=channel)
+    vacancies = [await vacancy_factory(user=user, channel=channel) for _ in range(2)]
 
     async with await client(email, password) as auth_cl:
         response = await auth_cl.get(f"{TEST_PATH}")
@@ -36,6 +38,165 @@ async def test_get_user_vacancies(
     res_data = response.json()
     assert res_data["message"] == "Successfully fetched vacancies"
     assert len(res_data["data"]) == 2
+    # The title line and the snippet only, the content is left to the details
+    assert {(vacancy["title"], vacancy["snippet"]) for vacancy in res_data["data"]} == {
+        (vacancy["title"], vacancy["snippet"]) for vacancy in vacancies
+    }
+    assert "content" not in res_data["data"][0]
+
+
+async def test_paginate_user_vacancies(
+    client: Callable,
+    user_factory: Callable,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+    # Created within one transaction, so they share `created_at` and are ordered by ID
+    vacancy_ids = {(await vacancy_factory(user=user, channel=channel))["id"] for _ in range(5)}
+
+    pages = []
+    cursor = None
+    async with await client(email, password) as auth_cl:
+        while True:
+            params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+            response = await auth_cl.get(f"{TEST_PATH}", params=params)
+            assert response.status_code == 200, response.text
+            res_data = response.json()
+            pages.append([vacancy["id"] for vacancy in res_data["data"]])
+            cursor = res_data["next_cursor"]
+            if cursor is None:
+                break
+
+        response = await auth_cl.get(f"{TEST_PATH}", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400, response.text
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert {UUID(vacancy_id) for page in pages for vacancy_id in page} == vacancy_ids
+
+
+async def test_filter_user_vacancies(
+    client: Callable,
+    session: AsyncSession,
+    user_factory: Callable,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+    unviewed = await vacancy_factory(channel=channel)
+    opportunity = await vacancy_factory(channel=channel)
+    await session.execute(
+        update(VacancyORM)
+        .where(VacancyORM.id == opportunity["id"])
+        .values(state=VacancyState.VIEWED | VacancyState.OPPORTUNITY)
+    )
+
+    async with await client(email, password) as auth_cl:
+        async def get_ids(**params: str | bool) -> list[str]:
+            response = await auth_cl.get(f"{TEST_PATH}", params=params)
+            assert response.status_code == 200, response.text
+            return [vacancy["id"] for vacancy in response.json()["data"]]
+
+        assert await get_ids(is_viewed=False) == [str(unviewed["id"])]
+        assert await get_ids(is_viewed=True, is_opportunity=True) == [str(opportunity["id"])]
+        assert await get_ids(is_applied=True) == []
+
+        created_at = unviewed["created_at"]
+        assert len(await get_ids(created_after=created_at.isoformat())) == 2
+        assert await get_ids(created_before=created_at.isoformat()) == []
+
+
+async def test_sparse_vacancy_fields(
+    client: Callable,
+    user_factory: Callable,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+    vacancy = await vacancy_factory(user=user, channel=channel)
+
+    async with await client(email, password) as auth_cl:
+        response = await auth_cl.get(f"{TEST_PATH}", params={"fields": "id,is_viewed"})
+        assert response.status_code == 200, response.text
+        assert response.json()["data"] == [{"is_viewed": False, "id": str(vacancy["id"])}]
+
+        response = await auth_cl.get(
+            f"{TEST_PATH}/channel/{channel['id']}", params={"fields": "title"}
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()["data"] == [{"title": vacancy["title"]}]
+
+        response = await auth_cl.get(f"{TEST_PATH}/{vacancy['id']}", params={"fields": "content"})
+        assert response.status_code == 200, response.text
+        assert response.json()["data"] == {"content": vacancy["content"]}
+
+        # The content is not a field of the listings
+        response = await auth_cl.get(f"{TEST_PATH}", params={"fields": "id,content"})
+        assert response.status_code == 400, response.text
+        assert response.json()["detail"] == "Unknown fields: content"
+
+
+async def test_search_vacancies(
+    client: Callable,
+    user_factory: Callable,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+    russian = await vacancy_factory(
+        channel=channel, content="Ищем Python разработчика в команду, пишите @hr_manager"
+    )
+    english = await vacancy_factory(
+        channel=channel, content="Senior Python developers wanted, remote"
+    )
+    await vacancy_factory(channel=channel, content="Java developer in the office")
+    # Vacancies of other users are never found
+    await vacancy_factory(content="Python developer, another user")
+
+    async def search(**params: str | int | bool) -> dict:
+        response = await auth_cl.get(f"{TEST_PATH}/search", params=params)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    async with await client(email, password) as auth_cl:
+        # Words are matched in any form, in both languages
+        res_data = await search(q="разработчики")
+        assert [result["id"] for result in res_data["data"]] == [str(russian["id"])]
+        assert "<mark>разработчика</mark>" in res_data["data"][0]["snippet"]
+
+        res_data = await search(q="python developer")
+        assert [result["id"] for result in res_data["data"]] == [str(english["id"])]
+
+        # Keyset pages over the ranked results
+        first_page = await search(q="python", limit=1)
+        assert len(first_page["data"]) == 1
+        second_page = await search(q="python", limit=1, cursor=first_page["next_cursor"])
+        assert len(second_page["data"]) == 1
+        assert second_page["next_cursor"] is None
+        assert {first_page["data"][0]["id"], second_page["data"][0]["id"]} == {
+            str(russian["id"]),
+            str(english["id"]),
+        }
+
+        # Typos are tolerated on demand only, above pg_trgm.word_similarity_threshold (0.6)
+        assert (await search(q="pythom"))["data"] == []
+        assert len((await search(q="pythom", fuzzy=True))["data"]) == 2
 
 
 async def test_get_channel_vacancies(
@@ -64,8 +225,9 @@ async def test_get_channel_vacancies(
     res_data = response.json()
     assert res_data["message"] == "Successfully fetched vacancies"
     assert len(res_data["data"]) == 2
-    assert res_data["data"][0]["id"] == str(vacancy_1_1["id"])
-    assert res_data["data"][1]["id"] == str(vacancy_1_2["id"])
+    # Newest first: dated as their posts, in the same transaction, so the later ID goes first
+    assert res_data["data"][0]["id"] == str(vacancy_1_2["id"])
+    assert res_data["data"][1]["id"] == str(vacancy_1_1["id"])
 
     # Attempt to access the channel with a different user
     async with await client(email, password) as auth_cl:
@@ -106,6 +268,7 @@ async def test_get_vacancy(
     res_data = response.json()
     assert res_data["message"] == "Successfully fetched vacancy"
     assert res_data["data"]["id"] == str(vacancy["id"])
+    assert res_data["data"]["content"] == vacancy["content"]
 
 
 async def test_get_non_user_vacancy(
@@ -162,17 +325,22 @@ async def test_create_vacancy(
     password = fake.password(length=8)
     user = await user_factory(email=email, password=password)
     channel = await channel_factory(user=user)
-    vacancy_data = VacancyCreate(
+    vacancy = VacancyCreate(
         message_id=fake.uuid4(),
         content=fake.text(),
         contact=fake.email(),
         channel_id=channel["id"],
-    ).model_dump_json()
+    )
 
     async with await client(email, password) as auth_cl:
-        response = await auth_cl.post(f"{TEST_PATH}", content=vacancy_data)
+        response = await auth_cl.post(f"{TEST_PATH}", content=vacancy.model_dump_json())
     assert response.status_code == 200, response.text
     assert response.json()["status_code"] == 201, response.text
+    # Built from the written rows, as the details of the vacancy
+    data = response.json()["data"]
+    assert data["content"] == vacancy.content
+    assert data["title"] == make_title(vacancy.content)
+    assert data["created_at"] is not None
 
     # Check the database for the created vacancy
     res = await session.scalars(select(VacancyORM))
@@ -199,16 +367,16 @@ async def test_update_vacancy(
         response = await auth_cl.put(
             f"{TEST_PATH}/{vacancy['id']}",
             content=VacancyUpdate(
-                content=fake.text(),
-                contact=fake.email(),
-                is_viewed=fake.boolean(),
+                is_viewed=True,
             ).model_dump_json()
         )
 
     assert response.status_code == 200, response.text
     res_data = response.json()
     assert res_data["message"] == "Successfully updated vacancy"
-    assert res_data["data"]["content"] == response.json()["data"]["content"]
+    assert res_data["data"]["is_viewed"] is True
+    # The post itself is shared by the subscribers and stays as it is
+    assert res_data["data"]["content"] == vacancy["content"]
 
     # Check with not existing vacancy
     async with await client(email, password) as auth_cl:
@@ -222,6 +390,52 @@ async def test_update_vacancy(
     assert response.status_code == 404, response.text
 
 
+async def test_bulk_update_vacancies(
+    client: Callable,
+    session: AsyncSession,
+    user_factory: Callable,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+    fake: Faker,
+) -> None:
+    email = fake.email(safe=True, domain="example.com")
+    password = fake.password(length=8)
+    user = await user_factory(email=email, password=password)
+    channel = await channel_factory(user=user)
+    page = [str((await vacancy_factory(channel=channel))["id"]) for _ in range(2)]
+    rest = str((await vacancy_factory(channel=channel))["id"])
+    foreign = (await vacancy_factory())["id"]
+
+    async with await client(email, password) as auth_cl:
+        async def get_ids(**params: str | bool) -> set[str]:
+            response = await auth_cl.get(f"{TEST_PATH}", params=params)
+            assert response.status_code == 200, response.text
+            return {vacancy["id"] for vacancy in response.json()["data"]}
+
+        # The vacancies of other users are skipped
+        response = await auth_cl.patch(
+            f"{TEST_PATH}/bulk",
+            json={"ids": [*page, str(foreign)], "state": {"is_viewed": True}},
+        )
+        assert response.status_code == 200, response.text
+        assert set(response.json()["data"]["ids"]) == set(page)
+        assert await get_ids(is_viewed=False) == {rest}
+
+        # The flags not given are kept
+        response = await auth_cl.patch(
+            f"{TEST_PATH}/bulk", json={"filters": {}, "state": {"is_opportunity": True}}
+        )
+        assert response.status_code == 200, response.text
+        assert set(response.json()["data"]["ids"]) == {*page, rest}
+        assert await get_ids(is_viewed=True, is_opportunity=True) == set(page)
+
+        response = await auth_cl.patch(f"{TEST_PATH}/bulk", json={"state": {"is_viewed": True}})
+        assert response.status_code == 422, response.text
+
+    state = await session.scalar(select(VacancyORM.state).where(VacancyORM.id == foreign))
+    assert state == 0
+
+
 async def test_delete_vacancy(
     client: Callable,
     user_factory: Callable,
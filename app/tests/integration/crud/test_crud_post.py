@@ -0,0 +1,67 @@
+from uuid import UUID
+
+import pytest
+from faker import Faker
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.post import post_crud
+from crud.source import source_crud
+from db import PostBodyORM, PostORM
+from schemas.post import PostCreate
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_bulk_upsert(
+    session: AsyncSession,
+    fake: Faker,
+) -> None:
+    source_1 = await source_crud.get_or_create_id(session, telegram_id="first_channel")
+    source_2 = await source_crud.get_or_create_id(session, telegram_id="second_channel")
+
+    def posts(source_id: UUID, *message_ids: int) -> list[PostCreate]:
+        return [
+            PostCreate(message_id=str(message_id), content=fake.text(), source_id=source_id)
+            for message_id in message_ids
+        ]
+
+    result = await post_crud.bulk_upsert(session, objs_in=posts(source_1, 1, 2, 3))
+    assert result.inserted == 3
+    assert result.skipped == 0
+    assert len(result.ids) == 3
+
+    # Message IDs are unique per source only, duplicates within a batch are skipped as well
+    result = await post_crud.bulk_upsert(
+        session,
+        objs_in=posts(source_1, 2, 3, 4, 4) + posts(source_2, 1),
+    )
+    assert result.inserted == 2
+    assert result.skipped == 3
+
+    count = await session.scalar(select(func.count()).select_from(PostORM))
+    assert count == 5
+    # Every post has its body
+    count = await session.scalar(
+        select(func.count()).select_from(PostORM).join(PostBodyORM, PostBodyORM.id == PostORM.id)
+    )
+    assert count == 5
+
+    result = await post_crud.bulk_upsert(session, objs_in=[])
+    assert result.inserted == result.skipped == 0
+
+
+async def test_get_or_create_returns_the_stored_post(session: AsyncSession) -> None:
+    source_id = await source_crud.get_or_create_id(session, telegram_id="python_jobs")
+    post = await post_crud.get_or_create(
+        session, obj_in=PostCreate(message_id="1", content="Python developer", source_id=source_id)
+    )
+    assert post.body.content == "Python developer"
+    assert post.created_at is not None
+
+    # The same message again: the stored post, with the stored text
+    again = await post_crud.get_or_create(
+        session, obj_in=PostCreate(message_id="1", content="Edited", source_id=source_id)
+    )
+    assert again.id == post.id
+    assert again.body.content == "Python developer"
@@ -0,0 +1,80 @@
+import logging
+from collections.abc import Callable
+from datetime import datetime, UTC
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.vacancy import vacancy_crud
+from db import PostORM, VacancyORM
+from db.models import VacancyState
+from schemas.vacancy import VacancyUpdate
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_flags_are_packed_into_state(
+    session: AsyncSession,
+    vacancy_factory: Callable,
+) -> None:
+    vacancy = await vacancy_crud.get(session, (await vacancy_factory())["id"])
+    assert vacancy.state == 0
+
+    vacancy = await vacancy_crud.update(
+        session, db_obj=vacancy, obj_in=VacancyUpdate(is_viewed=True, is_applied=True)
+    )
+    assert vacancy.state == VacancyState.VIEWED | VacancyState.APPLIED
+
+    # Only the given flags change
+    vacancy = await vacancy_crud.update(
+        session, db_obj=vacancy, obj_in={"is_applied": False, "is_rejected": True}
+    )
+    assert vacancy.state == VacancyState.VIEWED | VacancyState.REJECTED
+    assert (vacancy.is_viewed, vacancy.is_opportunity) == (True, False)
+
+    # The flags are queryable as well
+    result = await session.execute(
+        select(VacancyORM.id).where(VacancyORM.is_rejected, ~VacancyORM.is_opportunity)
+    )
+    assert result.scalars().all() == [vacancy.id]
+
+
+async def test_posts_beyond_the_retention_horizon_are_not_delivered(
+    session: AsyncSession,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    channel = await channel_factory()
+    old, recent = [
+        await session.scalar(
+            select(VacancyORM.post_id).where(
+                VacancyORM.id == (await vacancy_factory(channel=channel))["id"]
+            )
+        )
+        for _ in range(2)
+    ]
+    await session.execute(
+        update(PostORM)
+        .where(PostORM.id == old)
+        .values(created_at=datetime(2020, 1, 1, tzinfo=UTC))
+    )
+    late_channel = await channel_factory(telegram_id=channel["telegram_id"])
+
+    monkeypatch.setattr(settings, "PARTITION_RETENTION_MONTHS", 12)
+    with caplog.at_level(logging.WARNING, logger="crud.vacancy"):
+        delivered = await vacancy_crud.fan_out(session, channel_ids=[late_channel["id"]])
+
+    assert delivered == 1
+    assert "Skipped 1 deliveries" in caplog.text
+    result = await session.execute(
+        select(VacancyORM.post_id).where(VacancyORM.channel_id == late_channel["id"])
+    )
+    assert result.scalars().all() == [recent]
+
+    # Without a retention horizon all posts are delivered
+    monkeypatch.setattr(settings, "PARTITION_RETENTION_MONTHS", 0)
+    assert await vacancy_crud.fan_out(session, channel_ids=[late_channel["id"]]) == 1
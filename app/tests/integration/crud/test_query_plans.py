@@ -0,0 +1,122 @@
+"""
+Every hot query must be served by an index. The test tables are tiny, so the planner
+is told to avoid sequential scans and sorts whenever it can: a Seq Scan left in the plan
+means there is no index for the query at all, a Sort means no index gives its order.
+
+Partitions of vacancies name their copies of the indexes after themselves, e.g.
+`vacancies_default_channel_id_created_at_id_idx` for `ix_vacancies_channel_id_created_at_id`.
+"""
+import json
+from collections.abc import Callable
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, Executable, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.vacancy import vacancy_crud
+from db import ChannelORM, PostORM, VacancyORM
+from schemas.vacancy import VacancyFilter
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def explain(session: AsyncSession, stmt: Executable) -> str:
+    connection = await session.connection()
+    await connection.execute(text("SET LOCAL enable_seqscan = off"))
+    await connection.execute(text("SET LOCAL enable_sort = off"))
+    compiled = stmt.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    return json.dumps(result.scalar())
+
+
+async def test_listings_seek_over_indexes(
+    session: AsyncSession,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+
+    # A keyset page of the vacancies of a channel
+    plan = await explain(
+        session,
+        select(VacancyORM)
+        .where(VacancyORM.channel_id == channel["id"])
+        .order_by(VacancyORM.created_at.desc(), VacancyORM.id.desc())
+        .limit(101),
+    )
+    assert "channel_id_created_at_id" in plan
+    assert '"Node Type": "Sort"' not in plan
+
+    # A keyset page of the channels of a user
+    plan = await explain(
+        session,
+        select(ChannelORM)
+        .where(ChannelORM.user_id == channel["user_id"])
+        .order_by(ChannelORM.created_at.desc(), ChannelORM.id.desc())
+        .limit(101),
+    )
+    assert "ix_channels_user_id_created_at_id" in plan
+    assert '"Node Type": "Sort"' not in plan
+
+    # The latest posts of a source
+    plan = await explain(
+        session,
+        select(PostORM.message_id)
+        .where(PostORM.source_id == uuid4())
+        .order_by(PostORM.created_at.desc())
+        .limit(1000),
+    )
+    assert "ix_posts_source_id_created_at" in plan
+
+
+@pytest.mark.parametrize(
+    ("filters", "index"),
+    [
+        (VacancyFilter(is_viewed=False), "unviewed"),
+        (VacancyFilter(is_opportunity=True), "opportunities"),
+        (VacancyFilter(is_applied=True, is_rejected=False), "applied"),
+    ],
+)
+async def test_state_screens_read_their_partial_indexes(
+    session: AsyncSession,
+    filters: VacancyFilter,
+    index: str,
+) -> None:
+    stmt = select(VacancyORM).where(VacancyORM.channel_id == uuid4())
+    plan = await explain(
+        session,
+        vacancy_crud._filter(stmt, filters)
+        .order_by(VacancyORM.created_at.desc(), VacancyORM.id.desc())
+        .limit(101),
+    )
+    copies = await session.scalars(
+        text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = CAST(:index AS regclass)"
+        ),
+        {"index": f"ix_vacancies_{index}"},
+    )
+    assert any(f'"{copy}"' in plan for copy in copies)
+    assert '"Node Type": "Sort"' not in plan
+
+
+@pytest.mark.parametrize(
+    ("stmt", "table"),
+    [
+        # What the foreign key cascades run for every deleted user and channel
+        (delete(ChannelORM).where(ChannelORM.user_id == uuid4()), "channels"),
+        (delete(VacancyORM).where(VacancyORM.channel_id == uuid4()), "vacancies"),
+        (delete(VacancyORM).where(VacancyORM.post_id == uuid4()), "vacancies"),
+        (delete(PostORM).where(PostORM.source_id == uuid4()), "posts"),
+    ],
+)
+async def test_cascades_do_not_scan_child_tables(
+    session: AsyncSession,
+    stmt: Executable,
+    table: str,
+) -> None:
+    plan = await explain(session, stmt)
+    assert '"Node Type": "Seq Scan"' not in plan, f"{table} is scanned: {plan}"
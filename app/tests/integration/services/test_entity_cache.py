@@ -0,0 +1,31 @@
+from collections.abc import Callable
+
+import pytest
+from telethon.tl.types import InputPeerChannel, InputPeerChat
+
+from services.entity_cache import EntityCache
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_resolved_peers_survive_restarts(
+    session_factory: Callable,
+    user_factory: Callable,
+) -> None:
+    user = await user_factory()
+    channel_peer = InputPeerChannel(channel_id=1234567890, access_hash=-987654321)
+    chat_peer = InputPeerChat(chat_id=4242)
+
+    cache = EntityCache(session_factory)
+    await cache.put(user["id"], "jobs_channel", channel_peer)
+    await cache.put(user["id"], "-4242", chat_peer)
+
+    # A new process starts with a cold in-memory cache
+    cold_cache = EntityCache(session_factory)
+    assert await cold_cache.get(user["id"], "jobs_channel") == channel_peer
+    assert await cold_cache.get(user["id"], "-4242") == chat_peer
+    assert await cold_cache.get(user["id"], "unknown_channel") is None
+
+    await cold_cache.invalidate(user["id"], "jobs_channel")
+    assert await EntityCache(session_factory).get(user["id"], "jobs_channel") is None
+
@@ -0,0 +1,38 @@
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import VacancyORM
+from services.listener import TelegramListener
+from services.message_source import FakeMessageSource
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_listener_writes_pushed_messages(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    inactive_channel = await channel_factory(is_active=False)
+
+    source = FakeMessageSource()
+    listener = TelegramListener(source, session_factory, flush_interval=0.01)
+    await listener.subscribe()
+
+    await source.push(channel["telegram_id"], "Go developer wanted, @go_hr")
+    await source.push(channel["telegram_id"], "Rust developer wanted, @rust_hr")
+    await source.push(inactive_channel["telegram_id"], "Not subscribed")
+
+    await listener.write_batch(await listener.next_batch())
+
+    assert listener.stats.received == 2
+    assert listener.stats.stored == 2
+    assert listener.stats.batches == 1
+
+    vacancies = (await session.scalars(select(VacancyORM))).all()
+    assert {vacancy.channel_id for vacancy in vacancies} == {channel["id"]}
+    assert {vacancy.contact for vacancy in vacancies} == {"@go_hr", "@rust_hr"}
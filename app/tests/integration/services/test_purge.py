@@ -0,0 +1,44 @@
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import ChannelORM, VacancyORM
+from services.purge import ChannelPurge
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_deleted_channels_are_purged_in_chunks(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+    vacancy_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    kept_channel = await channel_factory()
+    for _ in range(3):
+        await vacancy_factory(channel=channel)
+    await vacancy_factory(channel=kept_channel)
+    await session.execute(
+        update(ChannelORM).where(ChannelORM.id == channel["id"]).values(deleted_at=func.now())
+    )
+    purge = ChannelPurge(session_factory, chunk_size=2)
+
+    async def count(channel_id: str) -> int:
+        return await session.scalar(
+            select(func.count()).select_from(VacancyORM).where(VacancyORM.channel_id == channel_id)
+        )
+
+    # A full chunk, the channel has to wait for the next one
+    assert await purge.purge_chunk() == (channel["id"], False)
+    assert await count(channel["id"]) == 1
+
+    assert await purge.purge_chunk() == (channel["id"], True)
+    assert await count(channel["id"]) == 0
+    assert await session.scalar(select(ChannelORM.id).where(ChannelORM.id == channel["id"])) is None
+
+    # Nothing left, the other channels are untouched
+    assert await purge.purge() == 0
+    assert await count(kept_channel["id"]) == 1
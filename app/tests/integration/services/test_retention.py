@@ -0,0 +1,85 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import ChannelORM, VacancyORM
+from services.retention import month_start, VacancyRetention
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_old_partitions_are_archived_and_restored(
+    session: AsyncSession,
+    session_factory: Callable,
+    vacancy_factory: Callable,
+    tmp_path: Path,
+) -> None:
+    vacancy = await vacancy_factory()
+    old_month = datetime(2020, 1, 1, tzinfo=UTC)
+    # Out of the range of the partitions, the row moves to the default one
+    await session.execute(
+        update(VacancyORM)
+        .where(VacancyORM.id == vacancy["id"])
+        .values(created_at=old_month + timedelta(days=3))
+    )
+    retention = VacancyRetention(
+        session_factory, months_ahead=1, retention_months=12, archive_dir=tmp_path
+    )
+
+    async def count() -> int:
+        return await session.scalar(
+            select(func.count()).select_from(VacancyORM).where(VacancyORM.id == vacancy["id"])
+        )
+
+    # The rows of the month are moved out of the default partition
+    assert await retention.create_partition(old_month)
+    assert not await retention.create_partition(old_month)
+    assert await session.scalar(text("SELECT count(*) FROM vacancies_2020_01")) == 1
+
+    archives = await retention.maintain()
+    assert archives == [tmp_path / "vacancies_2020_01.csv.gz"]
+    assert await count() == 0
+    months = [month for month, _ in await retention.get_partitions()]
+    assert month_start(datetime.now(UTC)) in months
+    assert old_month not in months
+
+    assert await retention.restore(archives[0]) == "vacancies_2020_01"
+    assert await count() == 1
+    # Until archived explicitly
+    assert await retention.maintain() == []
+    assert await retention.get_partitions() == [
+        (old_month, True),
+        *[(month, False) for month in months],
+    ]
+
+
+async def test_restore_skips_the_rows_of_deleted_channels(
+    session: AsyncSession,
+    session_factory: Callable,
+    vacancy_factory: Callable,
+    tmp_path: Path,
+) -> None:
+    kept, orphaned = await vacancy_factory(), await vacancy_factory()
+    old_month = datetime(2020, 1, 1, tzinfo=UTC)
+    await session.execute(
+        update(VacancyORM)
+        .where(VacancyORM.id.in_([kept["id"], orphaned["id"]]))
+        .values(created_at=old_month + timedelta(days=3))
+    )
+    retention = VacancyRetention(
+        session_factory, months_ahead=1, retention_months=12, archive_dir=tmp_path
+    )
+    assert await retention.create_partition(old_month)
+    [archive] = await retention.maintain()
+
+    await session.execute(delete(ChannelORM).where(ChannelORM.id == orphaned["channel_id"]))
+    assert await retention.restore(archive) == "vacancies_2020_01"
+
+    restored = await session.scalars(
+        select(VacancyORM.id).where(VacancyORM.id.in_([kept["id"], orphaned["id"]]))
+    )
+    assert restored.all() == [kept["id"]]
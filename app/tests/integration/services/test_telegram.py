@@ -0,0 +1,203 @@
+import asyncio
+import contextlib
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import PostORM, SourceORM, VacancyORM
+from crud.vacancy import vacancy_crud
+from schemas.vacancy import VacancyUpdate
+from services.listener import TelegramListener
+from services.message_source import FakeMessageSource
+from services.scheduler import PollingScheduler
+from services.seen_filter import SeenMessages
+from services.telegram import extract_contact, TelegramService
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def get_source(session: AsyncSession, telegram_id: str) -> SourceORM:
+    return await session.scalar(
+        select(SourceORM)
+        .where(SourceORM.telegram_id == telegram_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def test_ingest_active_channels(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    inactive_channel = await channel_factory(is_active=False)
+
+    source = FakeMessageSource()
+    source.publish(channel["telegram_id"], "Python developer. Contact: @hr_manager")
+    source.publish(channel["telegram_id"], "QA engineer, write to jobs@example.com")
+    source.publish(inactive_channel["telegram_id"], "Must not be collected")
+
+    stats = await TelegramService(source, session_factory, concurrency=1).run_once()
+
+    assert stats.channels == 1
+    assert stats.fetched == 2
+    assert stats.stored == 2
+    assert stats.failed_channels == 0
+
+    vacancies = (
+        await session.scalars(select(VacancyORM).join(VacancyORM.post).order_by(PostORM.message_id))
+    ).all()
+    assert [vacancy.channel_id for vacancy in vacancies] == [channel["id"], channel["id"]]
+    assert [vacancy.contact for vacancy in vacancies] == ["@hr_manager", "jobs@example.com"]
+
+
+async def test_ingest_in_batches_is_idempotent(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    source = FakeMessageSource(synthetic_messages=7)
+    engine = TelegramService(source, session_factory, batch_size=3, concurrency=1)
+
+    stats = await engine.run_once()
+    assert stats.stored == 7
+
+    # The cursor is at the last message, so nothing is fetched on the second cycle
+    stats = await engine.run_once()
+    assert stats.fetched == 0
+    assert stats.stored == 0
+
+    vacancies = (await session.scalars(select(VacancyORM))).all()
+    assert len(vacancies) == 7
+    assert {vacancy.channel_id for vacancy in vacancies} == {channel["id"]}
+
+
+async def test_backfill_in_checkpointed_chunks(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    source = FakeMessageSource(synthetic_messages=10)
+    engine = TelegramService(source, session_factory, batch_size=3, backfill_chunk=4)
+
+    for expected_cursor in (4, 8, 10):
+        await engine.run_once()
+
+        db_source = await get_source(session, channel["telegram_id"])
+        assert db_source.last_message_id == expected_cursor
+        assert db_source.last_message_at is not None
+
+    published = source.publish(channel["telegram_id"], "A fresh vacancy @recruiter")
+    stats = await engine.run_once()
+    assert stats.fetched == 1
+    assert stats.stored == 1
+
+    db_source = await get_source(session, channel["telegram_id"])
+    assert db_source.last_message_id == published.id
+
+
+async def test_shared_source_is_fetched_once(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    first = await channel_factory(telegram_id="python_jobs")
+    second = await channel_factory(telegram_id="python_jobs")
+    source = FakeMessageSource(synthetic_messages=5)
+
+    stats = await TelegramService(source, session_factory, concurrency=1).run_once()
+
+    # One fetch and one copy of every message, one vacancy per message for each subscriber
+    assert stats.channels == 1
+    assert stats.fetched == stats.stored == 5
+    assert stats.delivered == 10
+    assert len((await session.scalars(select(PostORM))).all()) == 5
+    vacancies = (await session.scalars(select(VacancyORM))).all()
+    assert sorted(vacancy.channel_id for vacancy in vacancies) == sorted(
+        [first["id"]] * 5 + [second["id"]] * 5
+    )
+
+    # A new subscriber gets the history of the source right away
+    late_channel = await channel_factory(telegram_id="python_jobs")
+    delivered = await vacancy_crud.fan_out(session, channel_ids=[late_channel["id"]])
+    assert delivered == 5
+
+    # The vacancy state stays per subscriber
+    await vacancy_crud.update(session, db_obj=vacancies[0], obj_in=VacancyUpdate(is_viewed=True))
+    post_views = await session.scalars(
+        select(VacancyORM.is_viewed).where(VacancyORM.post_id == vacancies[0].post_id)
+    )
+    assert sorted(post_views) == [False, False, True]
+
+
+async def test_extract_contact() -> None:
+    assert extract_contact("Send CV to t.me/hr_bot or @fallback") == "t.me/hr_bot"
+    assert extract_contact("Mail: job.offer+py@example.com") == "job.offer+py@example.com"
+    assert extract_contact("No contacts here") is None
+
+
+async def test_seen_messages_skip_the_upsert(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    source = FakeMessageSource(synthetic_messages=4)
+    seen = SeenMessages()
+
+    # The listener has already stored two of the messages, the cursor has not moved
+    listener = TelegramListener(source, session_factory, seen=seen)
+    await listener.subscribe()
+    await source.push(channel["telegram_id"], "Pushed vacancy @first_hr")
+    await source.push(channel["telegram_id"], "Pushed vacancy @second_hr")
+    await listener.write_batch(await listener.next_batch())
+    await session.execute(delete(PostORM).where(PostORM.message_id == "5"))
+
+    stats = await TelegramService(source, session_factory, seen=seen).run_once()
+
+    # The pushed messages 5 and 6 are in the filter, but 5 has been deleted in between
+    assert stats.fetched == 6
+    assert stats.stored == 5
+    assert stats.skipped == 1
+    assert seen.stats.hits == 1
+    assert seen.stats.false_positives == 1
+    assert len((await session.scalars(select(PostORM))).all()) == 6
+
+
+async def test_polling_survives_database_errors(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel = await channel_factory()
+    source = FakeMessageSource()
+    source.publish(channel["telegram_id"], "Python developer. Contact: @hr_manager")
+
+    calls = 0
+
+    def flaky_session_factory() -> AsyncSession:
+        # The first sync and the first load of the due sources fail
+        nonlocal calls
+        calls += 1
+        if calls in (1, 3):
+            raise OperationalError("SELECT 1", {}, ConnectionError("Connection lost"))
+        return session_factory()
+
+    scheduler = PollingScheduler(initial_interval=0.01, min_interval=0.01, jitter=0)
+    service = TelegramService(
+        source, flaky_session_factory, scheduler=scheduler, sync_interval=0.05
+    )
+    task = asyncio.create_task(service.run_forever())
+    await asyncio.sleep(1)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    source_row = await get_source(session, channel["telegram_id"])
+    assert source_row.id in scheduler
+    assert source_row.last_message_id == 1
@@ -0,0 +1,99 @@
+import asyncio
+from collections.abc import Callable
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from db import ChannelORM, SourceORM
+from services.message_source import FakeMessageSource
+from services.worker import IngestionWorker
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+def make_worker(session_factory: Callable, worker_id: str, max_sources: int) -> IngestionWorker:
+    return IngestionWorker(
+        FakeMessageSource(),
+        session_factory,
+        worker_id=worker_id,
+        lease_ttl=60,
+        heartbeat_interval=30,
+        max_sources=max_sources,
+    )
+
+
+async def test_workers_claim_disjoint_sources(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    channel_ids = [(await channel_factory())["id"] for _ in range(3)]
+    await channel_factory(is_active=False)
+    source_ids = set(
+        await session.scalars(select(ChannelORM.source_id).where(ChannelORM.id.in_(channel_ids)))
+    )
+    first = make_worker(session_factory, "first", max_sources=2)
+    second = make_worker(session_factory, "second", max_sources=10)
+
+    await first.sync_schedule()
+    await second.sync_schedule()
+
+    first_ids = {source_id for source_id in source_ids if source_id in first.scheduler}
+    second_ids = {source_id for source_id in source_ids if source_id in second.scheduler}
+    assert len(first_ids) == 2
+    assert first_ids | second_ids == source_ids
+    assert not first_ids & second_ids
+    assert len(first.scheduler) + len(second.scheduler) == 3
+
+    # A heartbeat renews the leases and keeps the sources of the worker
+    await first.sync_schedule()
+    assert len(first.scheduler) == 2
+
+
+async def test_expired_leases_are_taken_over(
+    session: AsyncSession,
+    session_factory: Callable,
+    channel_factory: Callable,
+) -> None:
+    for _ in range(2):
+        await channel_factory()
+    dead = make_worker(session_factory, "dead", max_sources=10)
+    alive = make_worker(session_factory, "alive", max_sources=10)
+
+    await dead.sync_schedule()
+    await alive.sync_schedule()
+    assert len(dead.scheduler) == 2
+    assert len(alive.scheduler) == 0
+
+    # The dead worker stops sending heartbeats
+    await session.execute(
+        update(SourceORM).values(lease_expires_at=func.now() - timedelta(minutes=1))
+    )
+    await alive.sync_schedule()
+    assert len(alive.scheduler) == 2
+
+    # The worker which lost its leases stops polling the sources
+    await dead.sync_schedule()
+    assert len(dead.scheduler) == 0
+
+    await alive.release()
+    leases = (await session.execute(select(SourceORM.leased_by))).scalars().all()
+    assert leases == [None, None]
+
+
+async def test_failed_release_does_not_mask_the_shutdown(session_factory: Callable) -> None:
+    worker = make_worker(session_factory, "stopping", max_sources=10)
+
+    async def release() -> None:
+        raise OperationalError("UPDATE sources", {}, ConnectionError("Connection lost"))
+
+    worker.release = release
+    task = asyncio.create_task(worker.run_forever())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
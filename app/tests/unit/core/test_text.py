@@ -0,0 +1,43 @@
+import pytest
+
+from core.text import make_snippet, make_title, SNIPPET_LENGTH, TITLE_LENGTH
+
+POST = """#вакансия #python #remote
+
+🔥 **Senior Python Developer** в fintech-стартап
+
+Мы ищем опытного разработчика. Стек: FastAPI, PostgreSQL.
+— Зарплата: от 300к
+"""
+
+
+@pytest.mark.parametrize(
+    ("content", "title", "snippet"),
+    [
+        (
+            POST,
+            "Senior Python Developer в fintech-стартап",
+            "Мы ищем опытного разработчика. Стек: FastAPI, PostgreSQL. Зарплата: от 300к",
+        ),
+        ("Python developer", "Python developer", "Python developer"),
+        ("#python #django", "#python #django", "#python #django"),
+        ("", "", ""),
+    ],
+)
+def test_title_and_snippet(content: str, title: str, snippet: str) -> None:
+    assert make_title(content) == title
+    assert make_snippet(content) == snippet
+
+
+def test_long_posts_are_cut_at_words() -> None:
+    content = "Python developer " * 10 + "\n" + "FastAPI PostgreSQL " * 50
+
+    title = make_title(content)
+    assert len(title) <= TITLE_LENGTH
+    assert title.endswith("…")
+    assert content.startswith(f"{title[:-1]} ")
+
+    snippet = make_snippet(content)
+    assert len(snippet) <= SNIPPET_LENGTH
+    assert snippet.startswith("FastAPI")
+    assert snippet.endswith("…")
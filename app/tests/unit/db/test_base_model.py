@@ -0,0 +1,23 @@
+import time
+
+from db.base_model import uuid7
+
+
+def test_uuid7_is_ordered_by_time() -> None:
+    before = time.time_ns() // 1_000_000
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert first.version == 7
+    assert first.variant == "specified in RFC 4122"
+    assert before <= first.int >> 80 <= second.int >> 80 <= after
+    assert first < second
+
+
+def test_uuid7_increases_within_a_millisecond() -> None:
+    ids = [uuid7() for _ in range(10000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
@@ -0,0 +1,39 @@
+import pytest
+
+from db.connect import unit_of_work
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.calls.append("close")
+
+    async def commit(self) -> None:
+        self.calls.append("commit")
+
+    async def rollback(self) -> None:
+        self.calls.append("rollback")
+
+
+async def test_unit_of_work_commits_once() -> None:
+    session = FakeSession()
+    async with unit_of_work(lambda: session) as db_session:
+        assert db_session is session
+
+    assert session.calls == ["commit", "close"]
+
+
+async def test_unit_of_work_rolls_back_on_exception() -> None:
+    session = FakeSession()
+    with pytest.raises(ValueError):
+        async with unit_of_work(lambda: session):
+            raise ValueError
+
+    assert session.calls == ["rollback", "close"]
@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from services.client_pool import TelegramClientPool
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.connects = 0
+        self.connected = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def connect(self) -> None:
+        self.connects += 1
+        self.connected = True
+
+    async def is_user_authorized(self) -> bool:
+        return True
+
+    async def disconnect(self) -> None:
+        self.connected = False
+
+
+def make_user() -> SimpleNamespace:
+    return SimpleNamespace(id=uuid.uuid4())
+
+
+async def test_one_long_lived_client_per_account() -> None:
+    pool = TelegramClientPool(lambda _user: FakeClient(), session_factory=None)
+    user_1, user_2 = make_user(), make_user()
+
+    async with pool.acquire(user_1) as client_1:
+        pass
+    async with pool.acquire(user_1) as client_1_again:
+        pass
+    async with pool.acquire(user_2) as client_2:
+        pass
+
+    assert client_1 is client_1_again
+    assert client_1 is not client_2
+    assert client_1.connects == 1
+
+    await pool.close()
+    assert not client_1.is_connected()
+
+
+async def test_flood_wait_parks_only_the_affected_account() -> None:
+    pool = TelegramClientPool(lambda _user: FakeClient(), session_factory=None)
+    flooded, other = make_user(), make_user()
+    loop = asyncio.get_running_loop()
+
+    with pytest.raises(FloodWaitError):
+        async with pool.acquire(flooded):
+            raise FloodWaitError(request=None, capture=1)
+
+    started = loop.time()
+    async with pool.acquire(other):
+        assert loop.time() - started < 0.5
+
+    async with pool.acquire(flooded):
+        assert loop.time() - started >= 0.9
+
+
+async def test_concurrency_is_bounded_per_account_and_globally() -> None:
+    pool = TelegramClientPool(
+        lambda _user: FakeClient(),
+        session_factory=None,
+        account_concurrency=1,
+        global_concurrency=2,
+    )
+    users = [make_user() for _ in range(3)]
+    in_flight: dict[str, int] = {"total": 0, "max_total": 0}
+    per_account: dict[uuid.UUID, int] = {}
+
+    async def fetch(user: SimpleNamespace) -> None:
+        async with pool.acquire(user):
+            in_flight["total"] += 1
+            per_account[user.id] = per_account.get(user.id, 0) + 1
+            in_flight["max_total"] = max(in_flight["max_total"], in_flight["total"])
+            assert per_account[user.id] == 1
+            await asyncio.sleep(0.01)
+            per_account[user.id] -= 1
+            in_flight["total"] -= 1
+
+    await asyncio.gather(*(fetch(user) for user in users for _ in range(3)))
+
+    assert in_flight["max_total"] == 2
@@ -0,0 +1,26 @@
+import uuid
+
+import pytest
+from telethon.tl.types import InputPeerChannel, InputPeerSelf
+
+from services.entity_cache import EntityCache
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_least_recently_used_peers_are_evicted() -> None:
+    cache = EntityCache(session_factory=None, maxsize=2)
+    peers = [InputPeerChannel(channel_id=channel_id, access_hash=1) for channel_id in range(3)]
+    user_id = uuid.uuid4()
+
+    await cache.put(user_id, "first", peers[0])
+    await cache.put(user_id, "second", peers[1])
+    await cache.get(user_id, "first")
+    await cache.put(user_id, "third", peers[2])
+
+    assert await cache.get(user_id, "first") == peers[0]
+    assert await cache.get(user_id, "second") is None
+    assert await cache.get(user_id, "third") == peers[2]
+
+    await cache.put(user_id, "me", InputPeerSelf())
+    assert await cache.get(user_id, "me") is None
@@ -0,0 +1,78 @@
+import asyncio
+import uuid
+from datetime import datetime, UTC
+from types import SimpleNamespace
+
+import pytest
+
+from schemas.telegram import TelegramMessage
+from services.listener import TelegramListener
+from services.message_source import FakeMessageSource
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+def make_message(message_id: int) -> TelegramMessage:
+    return TelegramMessage(id=message_id, date=datetime.now(UTC), text=f"Vacancy {message_id}")
+
+
+async def test_full_queue_drops_messages() -> None:
+    listener = TelegramListener(FakeMessageSource(), queue_size=2, put_timeout=0.01)
+    channel = SimpleNamespace(id=uuid.uuid4(), source_id=uuid.uuid4())
+
+    for message_id in range(1, 4):
+        await listener.on_message(channel, make_message(message_id))
+
+    assert listener.stats.received == 2
+    assert listener.stats.dropped == 1
+    assert listener.stats.queue_high_watermark == 2
+
+
+async def test_batches_are_bounded_by_size_and_time() -> None:
+    listener = TelegramListener(FakeMessageSource(), batch_size=3, flush_interval=0.05)
+    channel = SimpleNamespace(id=uuid.uuid4(), source_id=uuid.uuid4())
+    loop = asyncio.get_running_loop()
+
+    for message_id in range(1, 6):
+        await listener.on_message(channel, make_message(message_id))
+
+    batch = await listener.next_batch()
+    assert [post.message_id for post in batch] == ["1", "2", "3"]
+
+    started = loop.time()
+    batch = await listener.next_batch()
+    assert [post.message_id for post in batch] == ["4", "5"]
+    assert loop.time() - started >= 0.04
+
+
+class FakeSession:
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+
+async def test_batch_which_cannot_be_stored_is_skipped(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts = 0
+
+    async def store_posts(*args: object) -> None:  # NOQA: ARG001
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("Not a transient error")
+
+    monkeypatch.setattr("services.listener.store_posts", store_posts)
+    listener = TelegramListener(FakeMessageSource(), FakeSession, batch_size=2, flush_interval=0)
+    channel = SimpleNamespace(id=uuid.uuid4(), source_id=uuid.uuid4())
+    for message_id in range(1, 4):
+        await listener.on_message(channel, make_message(message_id))
+
+    # Not retried, and the writer moves on to the next batch
+    await listener.write_batch(await listener.next_batch())
+    assert attempts == 1
+    assert listener.stats.failed == 1
+    assert listener.stats.batches == 0
+    assert [post.message_id for post in await listener.next_batch()] == ["3"]
@@ -0,0 +1,100 @@
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, UTC
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import ChannelInvalidError, FloodWaitError
+from telethon.tl.types import InputPeerChannel
+
+from schemas.telegram import TelegramMessage
+from services.client_pool import TelegramClientPool
+from services.entity_cache import EntityCache
+from services.message_source import BaseMessageSource, TelethonMessageSource
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FloodingClient:
+    """Serves a history of 5 messages, failing with a FloodWait once after the 2nd message."""
+
+    def __init__(self) -> None:
+        self.flooded = False
+        self.resolved = 0
+        self.peer = InputPeerChannel(channel_id=1001, access_hash=42)
+
+    def is_connected(self) -> bool:
+        return True
+
+    async def get_input_entity(self, entity: str) -> InputPeerChannel:
+        assert entity == "jobs_channel"
+        self.resolved += 1
+        return self.peer
+
+    async def iter_messages(  # NOQA: ANN201
+        self, entity: InputPeerChannel, *, min_id: int, limit: int, reverse: bool
+    ):
+        if entity != self.peer:
+            raise ChannelInvalidError(request=None)
+        assert reverse
+        for message_id in range(min_id + 1, 6)[:limit]:
+            if message_id == 3 and not self.flooded:
+                self.flooded = True
+                raise FloodWaitError(request=None, capture=0)
+            text = "" if message_id == 4 else f"Vacancy {message_id}"
+            yield SimpleNamespace(id=message_id, date=datetime.now(UTC), message=text)
+
+    async def disconnect(self) -> None:
+        pass
+
+
+def make_source(client: FloodingClient) -> TelethonMessageSource:
+    return TelethonMessageSource(
+        TelegramClientPool(lambda _user: client, session_factory=None),
+        EntityCache(session_factory=None),
+    )
+
+
+async def test_iteration_resumes_after_flood_wait() -> None:
+    client = FloodingClient()
+    source = make_source(client)
+    channel = SimpleNamespace(user=SimpleNamespace(id=uuid.uuid4()), telegram_id="jobs_channel")
+
+    messages = [message async for message in source.iter_messages(channel, min_id=0)]
+
+    assert client.flooded
+    # Message 4 has no text and is skipped
+    assert [message.id for message in messages] == [1, 2, 3, 5]
+
+    messages = [message async for message in source.iter_messages(channel, min_id=0, limit=3)]
+    assert [message.id for message in messages] == [1, 2, 3]
+
+
+async def test_channel_is_resolved_once_and_stale_peers_are_invalidated() -> None:
+    client = FloodingClient()
+    client.flooded = True
+    source = make_source(client)
+    channel = SimpleNamespace(user=SimpleNamespace(id=uuid.uuid4()), telegram_id="jobs_channel")
+
+    for _ in range(2):
+        messages = [message async for message in source.iter_messages(channel, limit=1)]
+        assert [message.id for message in messages] == [1]
+    assert client.resolved == 1
+
+    # The channel has been recreated under the same username, the cached hash is rejected
+    client.peer = InputPeerChannel(channel_id=2002, access_hash=7)
+    messages = [message async for message in source.iter_messages(channel, limit=1)]
+    assert [message.id for message in messages] == [1]
+    assert client.resolved == 2
+
+
+async def test_incomplete_source_cannot_be_created() -> None:
+    class HistoryOnlySource(BaseMessageSource):
+        async def iter_messages(
+            self, channel: object, *, min_id: int = 0, limit: int | None = None
+        ) -> AsyncIterator[TelegramMessage]:
+            return
+            yield
+
+    with pytest.raises(TypeError, match="subscribe"):
+        HistoryOnlySource()
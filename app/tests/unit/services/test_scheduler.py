@@ -0,0 +1,109 @@
+import uuid
+
+import pytest
+
+from services.scheduler import PollingScheduler
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_scheduler(clock: FakeClock) -> PollingScheduler:
+    return PollingScheduler(
+        initial_interval=60,
+        min_interval=10,
+        max_interval=3600,
+        jitter=0,
+        clock=clock,
+    )
+
+
+def poll(
+    scheduler: PollingScheduler,
+    clock: FakeClock,
+    channel_id: uuid.UUID,
+    new_messages: int,
+) -> float:
+    """Poll the channel when it is due and return the interval until the next poll."""
+    clock.now += scheduler.next_due_in()
+    assert scheduler.pop_due() == [channel_id]
+    scheduler.record(channel_id, new_messages)
+    return scheduler.next_due_in()
+
+
+async def test_busy_channels_are_polled_more_often_than_quiet_ones() -> None:
+    clock = FakeClock()
+    busy, quiet = make_scheduler(clock), make_scheduler(clock)
+    channel_id = uuid.uuid4()
+    busy.add(channel_id)
+    quiet.add(channel_id)
+
+    busy_intervals = [poll(busy, clock, channel_id, 30) for _ in range(5)]
+    quiet_intervals = [poll(quiet, clock, channel_id, 0) for _ in range(10)]
+
+    assert busy_intervals[-1] == 10
+    # Quiet channels back off up to the longest interval
+    assert quiet_intervals[:3] == [60, 120, 240]
+    assert quiet_intervals[-1] == 3600
+
+
+async def test_failures_back_off_exponentially() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    channel_id = uuid.uuid4()
+    scheduler.add(channel_id)
+
+    intervals = []
+    for _ in range(3):
+        assert scheduler.pop_due() == [channel_id]
+        scheduler.record(channel_id, 0, failed=True)
+        intervals.append(scheduler.next_due_in())
+        clock.now += intervals[-1]
+    assert intervals == [120, 240, 480]
+
+    # A channel stopped by the backfill chunk is polled again right away
+    assert scheduler.pop_due() == [channel_id]
+    scheduler.record(channel_id, 5000, behind=True)
+    assert scheduler.next_due_in() == 10
+
+
+async def test_pop_due_takes_overdue_channels_once() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    for channel_id in (first, second, third):
+        scheduler.add(channel_id)
+        scheduler.pop_due()
+        scheduler.record(channel_id, 0)
+        clock.now += 1
+
+    clock.now += 60
+    assert scheduler.pop_due(limit=2) == [first, second]
+    assert scheduler.pop_due() == [third]
+    # Taken channels are not due again until their poll is recorded
+    clock.now += 3600
+    assert scheduler.pop_due() == []
+    assert scheduler.next_due_in() is None
+
+
+async def test_sync_drops_removed_channels() -> None:
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    kept, removed, added = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    scheduler.sync([kept, removed])
+
+    scheduler.sync([kept, added])
+
+    assert removed not in scheduler
+    assert len(scheduler) == 2
+    assert set(scheduler.pop_due()) == {kept, added}
+    # Recording a poll of a dropped channel does not bring it back
+    scheduler.record(removed, 3)
+    assert removed not in scheduler
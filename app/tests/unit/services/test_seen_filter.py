@@ -0,0 +1,34 @@
+import uuid
+
+import pytest
+
+from services.seen_filter import BloomFilter, SeenMessages
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(memory_bytes=16 * 1024, error_rate=0.01)
+    keys = [f"{uuid.uuid4()}:{message_id}" for message_id in range(bloom.capacity)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+
+    # At full capacity the false positive rate stays close to the configured one
+    unknown = [f"{uuid.uuid4()}:{message_id}" for message_id in range(10000)]
+    false_positives = sum(key in bloom for key in unknown)
+    assert false_positives / len(unknown) < 0.02
+
+
+async def test_full_filter_starts_over() -> None:
+    seen = SeenMessages(memory_mb=1)
+    seen._filter.capacity = 100
+    source_id = uuid.uuid4()
+
+    seen.add([(source_id, str(message_id)) for message_id in range(100)])
+    assert seen.stats.resets == 0
+
+    seen.add([(source_id, "one more")])
+    assert seen.stats.resets == 1
+    assert seen._filter.count == 1
@@ -0,0 +1,127 @@
+"""
+Latency of the write endpoints, p50 and p99, measured against a running API.
+
+    python benchmark.py --requests 1000 --output before.json
+    git checkout <change> && (restart the API)
+    python benchmark.py --requests 1000 --output after.json --compare before.json
+
+Every run registers a throwaway user, so point it at a development database.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+
+from core.config import settings
+
+WARMUP_REQUESTS = 20
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    """The p50 and p99 of the latencies, in milliseconds."""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50": cuts[49] * 1000, "p99": cuts[98] * 1000}
+
+
+async def measure(
+    send: Callable[[int], Awaitable[httpx.Response]], requests: int
+) -> dict[str, float]:
+    for number in range(WARMUP_REQUESTS):
+        (await send(-number - 1)).raise_for_status()
+
+    latencies = []
+    for number in range(requests):
+        start = time.perf_counter()
+        response = await send(number)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return percentiles(latencies)
+
+
+async def login(client: httpx.AsyncClient) -> None:
+    email = f"benchmark-{uuid.uuid4().hex[:12]}@example.com"
+    password = uuid.uuid4().hex
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/register",
+        json={"email": email, "password": password, "api_id": "api_id", "api_hash": "api_hash"},
+    )
+    response.raise_for_status()
+    response = await client.post(
+        f"{settings.API_V1_STR}/auth/token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['data']['access_token']}"
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    run_id = uuid.uuid4().hex[:8]
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        await login(client)
+
+        channel_ids = []
+
+        async def create_channel(number: int) -> httpx.Response:
+            response = await client.post(
+                f"{settings.API_V1_STR}/channels",
+                json={
+                    "title": f"Benchmark {number}",
+                    "description": None,
+                    "telegram_id": f"benchmark_{run_id}_{number}",
+                    "user_id": str(uuid.uuid4()),  # Replaced by the current user
+                },
+            )
+            if response.is_success:
+                channel_ids.append(response.json()["data"]["id"])
+            return response
+
+        async def create_vacancy(number: int) -> httpx.Response:
+            return await client.post(
+                f"{settings.API_V1_STR}/vacancies",
+                json={
+                    "message_id": f"{run_id}_{number}",
+                    "content": f"Python developer {number}\nRemote, full time, {run_id}",
+                    "channel_id": channel_ids[0],
+                },
+            )
+
+        results = {
+            "POST /channels": await measure(create_channel, args.requests),
+            "POST /vacancies": await measure(create_vacancy, args.requests),
+        }
+
+        # The vacancies go along with the channels
+        for channel_id in channel_ids:
+            await client.delete(f"{settings.API_V1_STR}/channels/{channel_id}")
+    return results
+
+
+def report(results: dict[str, dict[str, float]], baseline: dict | None) -> None:
+    for endpoint, latency in results.items():
+        line = f"{endpoint:<18}" + "".join(
+            f"  {name} {value:8.2f} ms" for name, value in latency.items()
+        )
+        if baseline and endpoint in baseline:
+            line += "  (was " + ", ".join(
+                f"{name} {baseline[endpoint][name]:.2f} ms" for name in latency
+            ) + ")"
+        print(line)  # NOQA: T201
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=str(settings.BASE_HOST), help="The API to measure")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--output", type=Path, help="Save the results as JSON")
+    parser.add_argument("--compare", type=Path, help="The saved results of a previous run")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report(results, json.loads(args.compare.read_text()) if args.compare else None)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
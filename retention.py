@@ -0,0 +1,48 @@
+"""
+Maintenance of the monthly partitions of the vacancies, which worker.py runs periodically.
+
+    python retention.py list
+    python retention.py maintain
+    python retention.py archive 2025-01
+    python retention.py restore .archive/vacancies_2025_01.csv.gz
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, UTC
+from pathlib import Path
+
+from core.config import settings
+from services.retention import partition_name, VacancyRetention
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+
+def month(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m").replace(tzinfo=UTC)
+
+
+async def run(args: argparse.Namespace) -> None:
+    retention = VacancyRetention()
+    if args.command == "list":
+        for partition_month, restored in await retention.get_partitions():
+            print(partition_name(partition_month) + (" (restored)" if restored else ""))  # NOQA: T201
+    elif args.command == "maintain":
+        await retention.maintain()
+    elif args.command == "archive":
+        await retention.archive(args.month)
+    elif args.command == "restore":
+        await retention.restore(args.path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the attached monthly partitions")
+    commands.add_parser("maintain", help="Create the coming partitions, archive the old ones")
+    archive = commands.add_parser("archive", help="Archive the partition of a month")
+    archive.add_argument("month", type=month, help="YYYY-MM")
+    restore = commands.add_parser("restore", help="Attach an archived partition again")
+    restore.add_argument("path", type=Path)
+
+    asyncio.run(run(parser.parse_args()))
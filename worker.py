@@ -0,0 +1,45 @@
+import asyncio
+import contextlib
+import logging
+import signal
+
+from core.config import settings
+from services.listener import TelegramListener
+from services.message_source import get_message_source
+from services.purge import ChannelPurge
+from services.retention import VacancyRetention
+from services.seen_filter import SeenMessages
+from services.worker import IngestionWorker
+
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+
+async def run_worker() -> None:
+    # Polling and push mode share the message source, so an account has a single connection
+    source = get_message_source()
+    # They share the seen messages filter too, so posts stored by the listener skip the upsert
+    seen = SeenMessages()
+    worker = IngestionWorker(source, seen=seen)
+
+    # Stop gracefully on SIGTERM as well, so the leases are released right away
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(worker.run_forever())
+        # Keeps the monthly partitions of the vacancies ready and archives the old ones
+        tg.create_task(VacancyRetention().run_forever())
+        # Removes the vacancies of the channels deleted in the background, chunk by chunk
+        tg.create_task(ChannelPurge().run_forever())
+        if settings.TELEGRAM_LISTENER_ENABLED:
+            # Each worker listens only to the sources it polls
+            listener = TelegramListener(
+                source,
+                channel_filter=lambda channel: channel.source_id in worker.scheduler,
+                seen=seen,
+            )
+            tg.create_task(listener.run())
+
+
+if __name__ == "__main__":
+    with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
+        asyncio.run(run_worker())